@@ -0,0 +1,20 @@
+"""
+Ledu benchmarks
+===============
+
+Seeded synthetic corpus + timing harness for the conversion hot path.
+
+    $ python -m benchmarks run --output bench.json            # measure
+    $ python -m benchmarks compare baseline.json bench.json   # gate
+
+`corpus` generates one document per *shape* (wide tables, deep lists,
+equation-dense prose, huge code fences, thousands of headings); `runner`
+times `MarkdownParser.parse`, `PageBuilder.convert`,
+`RichTextSegmenter.segment` and JSON serialisation on each and reports
+throughput and peak memory.  `compare` exits non-zero when a stage got
+slower (or hungrier) than the baseline by more than the tolerance.
+"""
+from .corpus import SHAPES, generate
+from .runner import compare, run_suite
+
+__all__ = ["SHAPES", "generate", "run_suite", "compare"]
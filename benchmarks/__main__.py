@@ -0,0 +1,56 @@
+"""
+`python -m benchmarks run|compare` – see the package docstring.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import sys
+
+from .corpus import SHAPES
+from .runner import compare, format_report, run_suite
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Benchmark the corpus shapes")
+    run.add_argument("--shape", action="append", choices=sorted(SHAPES),
+                     help="Only this shape (repeatable; default: all)")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--scale", type=float, default=1.0,
+                     help="Corpus size factor (1.0 ≈ a few hundred KiB per shape)")
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--output", "-o", type=pathlib.Path,
+                     help="Write the JSON results here")
+
+    cmp = sub.add_parser("compare", help="Flag regressions against a baseline")
+    cmp.add_argument("baseline", type=pathlib.Path)
+    cmp.add_argument("current", type=pathlib.Path)
+    cmp.add_argument("--tolerance", type=float, default=0.15,
+                     help="Allowed slowdown as a fraction (default 0.15)")
+    cmp.add_argument("--memory-tolerance", type=float, default=0.25)
+
+    args = p.parse_args(argv)
+    if args.command == "run":
+        report = run_suite(args.shape, seed=args.seed, scale=args.scale,
+                           repeat=args.repeat)
+        print(format_report(report))
+        if args.output:
+            args.output.write_text(json.dumps(report, indent=2), encoding="utf8")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf8"))
+    current = json.loads(args.current.read_text(encoding="utf8"))
+    regressions = compare(baseline, current, tolerance=args.tolerance,
+                          memory_tolerance=args.memory_tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r}")
+    print(f"{len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
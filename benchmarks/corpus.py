@@ -0,0 +1,93 @@
+"""
+corpus.py
+=========
+
+Deterministic Markdown generators, one per document *shape*.
+
+Every generator takes a seeded `random.Random` and a *scale* factor
+(1.0 ≈ a few hundred KiB) so runs are reproducible across machines and a
+quick smoke run can use a tiny scale.
+"""
+from __future__ import annotations
+
+import random
+from typing import Callable, Dict
+
+_WORDS = ("notion markdown block token parser converter segment rich text "
+          "annotation equation policy state reward agent value page child "
+          "request limit cache stream upload").split()
+_MATH = (r"\pi", r"S_t", r"\alpha + \beta", r"\sum_{i=0}^{n} x_i", r"V(s)",
+         r"\mathbb{E}[R]", r"\gamma^k", r"Q(s, a)")
+
+
+def _sentence(rng: random.Random, n: int = 12) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize() + "."
+
+
+def wide_tables(rng: random.Random, scale: float) -> str:
+    out = []
+    for _ in range(max(1, int(20 * scale))):
+        cols = rng.randint(12, 24)
+        out.append("| " + " | ".join(f"col {c}" for c in range(cols)) + " |")
+        out.append("|" + "---|" * cols)
+        for _ in range(50):
+            cells = [rng.choice(("Yes", "No", "*N/A*", "**42**", "`x`",
+                                 rng.choice(_WORDS))) for _ in range(cols)]
+            out.append("| " + " | ".join(cells) + " |")
+        out.append("")
+    return "\n".join(out)
+
+
+def nested_lists(rng: random.Random, scale: float, depth: int = 10) -> str:
+    out = []
+    for _ in range(max(1, int(60 * scale))):
+        for level in range(depth):
+            marker = "1." if level % 2 else "-"
+            out.append(f"{'    ' * level}{marker} {_sentence(rng, 6)}")
+        out.append("")
+    return "\n".join(out)
+
+
+def equation_prose(rng: random.Random, scale: float) -> str:
+    out = []
+    for _ in range(max(1, int(400 * scale))):
+        parts = []
+        for _ in range(8):
+            parts.append(" ".join(rng.choice(_WORDS) for _ in range(4)))
+            expr = f"${rng.choice(_MATH)}$"
+            parts.append(f"**{expr}**" if rng.random() < 0.3 else expr)
+        out.append(" ".join(parts))
+        out.append("")
+        if rng.random() < 0.1:
+            out.append(f"$$\n{rng.choice(_MATH)}\n$$\n")
+    return "\n".join(out)
+
+
+def huge_code(rng: random.Random, scale: float) -> str:
+    lines = [f"    value_{i} = compute({rng.randint(0, 10**6)})  # {rng.choice(_WORDS)}"
+             for i in range(max(1, int(8000 * scale)))]
+    return "# Listing\n\n```python\ndef main():\n" + "\n".join(lines) + "\n```\n"
+
+
+def many_headings(rng: random.Random, scale: float) -> str:
+    out = []
+    for i in range(max(1, int(3000 * scale))):
+        out.append(f"{'#' * (1 + i % 3)} Section {i}: {rng.choice(_WORDS)}\n")
+        if i % 4 == 0:
+            out.append(_sentence(rng) + "\n")
+    return "\n".join(out)
+
+
+#: shape name → generator(rng, scale) -> Markdown
+SHAPES: Dict[str, Callable[[random.Random, float], str]] = {
+    "wide_tables": wide_tables,
+    "nested_lists": nested_lists,
+    "equation_prose": equation_prose,
+    "huge_code": huge_code,
+    "many_headings": many_headings,
+}
+
+
+def generate(shape: str, *, seed: int = 0, scale: float = 1.0) -> str:
+    """Markdown document of the given *shape* (same seed → same text)."""
+    return SHAPES[shape](random.Random(f"{shape}:{seed}"), scale)
@@ -0,0 +1,167 @@
+"""
+runner.py
+=========
+
+Time each pipeline stage on each corpus shape and compare against a baseline.
+
+Stages
+------
+parse      `MarkdownParser.parse`
+convert    `PageBuilder.convert` (one warm builder, as the batch workers use)
+segment    `RichTextSegmenter.segment` over every inline source in the doc
+serialize  `json.dumps` of the converted block list
+
+Each stage is timed `repeat` times and the best run is kept (least noise);
+peak memory comes from one extra run under `tracemalloc`, so tracing never
+skews the timings.
+"""
+from __future__ import annotations
+
+import json
+import platform
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List
+
+from ledu.builder import PageBuilder
+from ledu.parser import MarkdownParser, RichTextSegmenter
+from ledu.utils.tree import count_blocks
+
+from .corpus import SHAPES, generate
+
+STAGES = ("parse", "convert", "segment", "serialize")
+
+
+@dataclass(frozen=True)
+class Regression:
+    """A stage whose metric grew beyond the tolerance."""
+    shape: str
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def __str__(self) -> str:
+        return (f"{self.shape}/{self.stage}: {self.metric} "
+                f"{self.baseline:.4g} → {self.current:.4g} ({self.ratio - 1:+.0%})")
+
+
+def _best(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_kib(fn: Callable[[], object]) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+# ---------------------------------------------------------------------- #
+# Public API                                                             #
+# ---------------------------------------------------------------------- #
+
+def bench_document(markdown: str, *, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """Measure every stage on one document; returns stage → metrics."""
+    parser = MarkdownParser()
+    builder = PageBuilder(parser)
+    tokens = parser.parse(markdown)
+    blocks = builder.convert(markdown)
+    inline = [t.content for t in tokens if t.type == "inline"]
+    size_mb = len(markdown.encode("utf8")) / 1e6
+    n_blocks = count_blocks(blocks)
+
+    def segment() -> None:
+        seg = RichTextSegmenter(parser)  # fresh memo, like a new conversion
+        for text in inline:
+            seg.segment(text)
+
+    stages: Dict[str, Callable[[], object]] = {
+        "parse": lambda: parser.parse(markdown),
+        "convert": lambda: builder.convert(markdown),
+        "segment": segment,
+        "serialize": lambda: json.dumps(blocks),
+    }
+    results: Dict[str, Dict[str, float]] = {}
+    for stage, fn in stages.items():
+        seconds = _best(fn, repeat)
+        results[stage] = {
+            "seconds": seconds,
+            "mb_per_s": size_mb / seconds if seconds else 0.0,
+            "blocks_per_s": n_blocks / seconds if seconds else 0.0,
+            "peak_kib": _peak_kib(fn),
+        }
+    return results
+
+
+def run_suite(shapes: Iterable[str] | None = None, *, seed: int = 0,
+              scale: float = 1.0, repeat: int = 5) -> dict:
+    """Benchmark each corpus shape; JSON-serialisable result document."""
+    from ledu import __version__
+
+    shapes = list(shapes or SHAPES)
+    results = {}
+    for shape in shapes:
+        markdown = generate(shape, seed=seed, scale=scale)
+        results[shape] = {"bytes": len(markdown.encode("utf8")),
+                          "stages": bench_document(markdown, repeat=repeat)}
+    return {
+        "meta": {"ledu": __version__, "python": platform.python_version(),
+                 "machine": platform.machine(), "seed": seed, "scale": scale,
+                 "repeat": repeat},
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, *, tolerance: float = 0.15,
+            memory_tolerance: float = 0.25,
+            min_seconds: float = 1e-3) -> List[Regression]:
+    """
+    Stages of *current* that are slower / use more memory than *baseline*.
+
+    Time is flagged when it grew by more than *tolerance* (fraction) and
+    the baseline is above *min_seconds* (sub-millisecond stages are noise);
+    peak memory uses *memory_tolerance*.  Shapes or stages missing from
+    either side are ignored.
+    """
+    found: List[Regression] = []
+    for shape, entry in current["results"].items():
+        base_entry = baseline["results"].get(shape)
+        if base_entry is None:
+            continue
+        for stage, metrics in entry["stages"].items():
+            base = base_entry["stages"].get(stage)
+            if base is None:
+                continue
+            if (base["seconds"] >= min_seconds
+                    and metrics["seconds"] > base["seconds"] * (1 + tolerance)):
+                found.append(Regression(shape, stage, "seconds",
+                                        base["seconds"], metrics["seconds"]))
+            if metrics["peak_kib"] > base["peak_kib"] * (1 + memory_tolerance):
+                found.append(Regression(shape, stage, "peak_kib",
+                                        base["peak_kib"], metrics["peak_kib"]))
+    return found
+
+
+def format_report(report: dict) -> str:
+    """Human-readable table of a `run_suite` result."""
+    lines = [f"{'shape':<16}{'stage':<11}{'ms':>10}{'MB/s':>10}"
+             f"{'blocks/s':>12}{'peak KiB':>11}"]
+    for shape, entry in report["results"].items():
+        for stage, m in entry["stages"].items():
+            lines.append(f"{shape:<16}{stage:<11}{m['seconds'] * 1000:>10.2f}"
+                         f"{m['mb_per_s']:>10.1f}{m['blocks_per_s']:>12.0f}"
+                         f"{m['peak_kib']:>11.0f}")
+    return "\n".join(lines)
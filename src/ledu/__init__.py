@@ -4,9 +4,16 @@ Ledu
 
 Markdown ⇨ Notion converter skeleton.
 
-Nothing is executed at import-time except attaching the package version.
+Nothing is executed at import-time: `__version__` is resolved from the
+installed metadata on first access (PEP 562), so `import ledu` stays cheap.
 """
-from importlib.metadata import version as _v
-
 __all__ = ["__version__"]
-__version__: str = _v("ledu")  # resolved from pyproject.toml
+
+
+def __getattr__(name: str):
+    if name == "__version__":
+        from importlib.metadata import version
+
+        value = globals()["__version__"] = version("ledu")  # from pyproject.toml
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,226 @@
+"""
+batch.py
+========
+
+Multi-file conversion for `ledu sync <dir|glob>`.
+
+Pipeline
+--------
+1. `collect_sources` expands directories (recursive `*.md`) and glob patterns.
+2. `convert_files` fans the files out to a `ProcessPoolExecutor`; every
+   worker builds one `PageBuilder` (and thus one `MarkdownParser`) in its
+   initializer and reuses it for all files it receives.  With *cache_dir*
+   every worker opens the shared `ConversionCache` (entries are written
+   atomically, so concurrent workers are safe).
+3. `sync_files` feeds finished conversions into a single upload queue
+   drained by one thread, so all pages share one `NotionClient` and hence
+   one rate limiter.  Local images are handed to an `AssetUploader` the
+   moment a file's conversion arrives, so they upload while other files
+   are still converting; the drain thread swaps in the hosted sources.
+
+Conversion errors are captured per file (`FileResult.error`) instead of
+aborting the run; the CLI prints a summary at the end.
+"""
+from __future__ import annotations
+
+import glob
+import os
+import pathlib
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List
+
+from ledu.builder.page_builder import PageBuilder
+from ledu.utils.tree import count_blocks
+from ledu.utils.typing import JSONDict
+
+
+@dataclass
+class FileResult:
+    """Outcome of converting (and optionally uploading) one file."""
+    path: pathlib.Path
+    blocks: List[JSONDict] | None = None
+    seconds: float = 0.0
+    block_count: int = 0
+    error: str | None = None
+    page_id: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# ---------------------------------------------------------------------- #
+# Worker side                                                            #
+# ---------------------------------------------------------------------- #
+
+#: per-process warm builder, created by `_init_worker`
+_builder: PageBuilder | None = None
+
+
+def _init_worker(cache_dir: str | None = None) -> None:
+    global _builder
+    cache = None
+    if cache_dir:
+        from ledu.cache import ConversionCache
+        from ledu.config import settings
+        cache = ConversionCache(cache_dir, max_bytes=settings.cache_max_bytes)
+    _builder = PageBuilder(cache=cache)
+
+
+def _convert_file(path: pathlib.Path) -> FileResult:
+    """Convert one file with the worker's warm builder."""
+    builder = _builder or PageBuilder()
+    start = time.perf_counter()
+    try:
+        markdown = path.read_text(encoding="utf8")
+        blocks = builder.convert(markdown)
+    except Exception as exc:  # reported in the summary, never fatal
+        return FileResult(path, seconds=time.perf_counter() - start,
+                          error=f"{type(exc).__name__}: {exc}")
+    return FileResult(path, blocks, time.perf_counter() - start,
+                      block_count=count_blocks(blocks))
+
+
+# ---------------------------------------------------------------------- #
+# Public API                                                             #
+# ---------------------------------------------------------------------- #
+
+def collect_sources(targets: Iterable[str | os.PathLike]) -> List[pathlib.Path]:
+    """Expand files, directories and glob patterns into a sorted file list."""
+    found: set[pathlib.Path] = set()
+    for target in targets:
+        path = pathlib.Path(target)
+        if path.is_dir():
+            found.update(p for p in path.rglob("*.md") if p.is_file())
+        elif path.is_file():
+            found.add(path)
+        else:
+            found.update(pathlib.Path(p) for p in glob.glob(str(target), recursive=True)
+                         if os.path.isfile(p))
+    return sorted(found)
+
+
+def convert_files(paths: Iterable[pathlib.Path], *, jobs: int | None = None,
+                  cache_dir: str | None = None) -> Iterator[FileResult]:
+    """
+    Convert *paths*, yielding results in completion order.
+
+    `jobs=1` converts in-process (no pool); `None` uses `os.cpu_count()`.
+    *cache_dir* enables the on-disk conversion cache in every worker.
+    """
+    paths = list(paths)
+    if jobs == 1 or len(paths) <= 1:
+        _init_worker(cache_dir)
+        for path in paths:
+            yield _convert_file(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(cache_dir,)) as pool:
+        futures = [pool.submit(_convert_file, path) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def sync_files(paths: Iterable[pathlib.Path], *, parent_id: str | None = None,
+               jobs: int | None = None, client=None,
+               cache_dir: str | None = None, assets=None,
+               synced=None) -> List[FileResult]:
+    """
+    Convert *paths* in parallel and upload each as a page under *parent_id*.
+
+    Without *parent_id* this is a dry run that only converts.  *client*
+    defaults to one `NotionClient` shared by every upload; *assets* to an
+    `AssetUploader` on that client (see `ledu.notion.assets`).
+
+    With a *synced* `SyncedDeduper` (see `ledu.notion.synced`) content
+    repeated across files is shared through synced blocks; uploads then
+    start once every file is converted, since dedupe needs the whole batch.
+    """
+    results: List[FileResult] = []
+    if parent_id is None:
+        results.extend(convert_files(paths, jobs=jobs, cache_dir=cache_dir))
+        return results
+
+    if client is None:
+        from ledu.config import settings
+        from ledu.notion.client import NotionClient
+        client = NotionClient(settings.notion_api_token)
+    own_assets = assets is None
+    if own_assets:
+        from ledu.notion.assets import open_uploader
+        assets = open_uploader(client)
+
+    uploads: queue.Queue[FileResult | None] = queue.Queue()
+    uploader = threading.Thread(
+        target=_drain_uploads, args=(uploads, client, parent_id, assets), daemon=True
+    )
+    uploader.start()
+    try:
+        for result in convert_files(paths, jobs=jobs, cache_dir=cache_dir):
+            results.append(result)
+            if result.ok:
+                _preflight(result)
+            if result.ok:  # valid: its local media may now be uploaded
+                assets.prefetch(result.blocks or [], result.path.parent)
+                if synced is None:
+                    uploads.put(result)
+        if synced is not None:
+            _dedupe(results, synced, assets, uploads)
+    finally:
+        uploads.put(None)
+        uploader.join()
+        if own_assets:
+            assets.close()
+    return results
+
+
+def _preflight(result: FileResult) -> None:
+    """Validate one converted file in place; a failure becomes its `error`."""
+    from ledu.notion.validate import PreflightError, preflight
+
+    try:
+        result.blocks = preflight(result.blocks or [], local_media=True)
+    except PreflightError as exc:
+        result.error = f"preflight failed – {exc}"
+        result.blocks = None
+
+
+def _dedupe(results: List[FileResult], synced, assets,
+            uploads: "queue.Queue[FileResult | None]") -> None:
+    """Share repeated content of the converted files, then queue their uploads."""
+    for result in results:  # originals must hold hosted media, like the pages
+        if not result.ok:
+            continue
+        try:
+            result.blocks = assets.resolve(result.blocks or [], result.path.parent)
+        except Exception as exc:  # this file only, as in `_drain_uploads`
+            result.error = f"upload failed – {type(exc).__name__}: {exc}"
+            result.blocks = None
+    ok = [r for r in results if r.ok]
+    for result, blocks in zip(ok, synced.apply([r.blocks for r in ok])):
+        result.blocks = blocks
+        uploads.put(result)
+
+
+def _drain_uploads(uploads: "queue.Queue[FileResult | None]", client,
+                   parent_id: str, assets) -> None:
+    """Upload queued conversions one page at a time (shared rate limiter)."""
+    from ledu.notion.planner import RequestPlanner
+    from ledu.notion.upload import execute_plan
+
+    planner = RequestPlanner()
+    while (result := uploads.get()) is not None:
+        try:
+            blocks = assets.resolve(result.blocks or [], result.path.parent)
+            result.page_id = execute_plan(
+                client, planner.plan(blocks), {"page_id": parent_id},
+                title=result.path.stem,
+            )
+        except Exception as exc:
+            result.error = f"upload failed – {type(exc).__name__}: {exc}"
+        result.blocks = None  # release memory once uploaded
@@ -4,29 +4,34 @@ ledu.blocks
 
 Package that hosts one *BlockConverter* subclass per Notion block type.
 
-Side-effect import
-------------------
-Importing *this package* automatically brings all individual converter modules
-into memory so their subclasses register themselves in `config.BLOCK_REGISTRY`.
-You may comment-out imports that you are not ready to implement yet.
+Lazy registration
+-----------------
+Converter modules are **not** imported with this package: `BLOCK_REGISTRY`
+knows them by "module:Class" path (`registry.BUILTIN_CONVERTERS`) and
+imports each one the first time its token type shows up.  The names below
+still resolve on attribute access (PEP 562).
 
-When you add a new converter file, **remember to list it here**.
+When you add a new converter file, **remember to list it** in
+`BUILTIN_CONVERTERS` and in `_EXPORTS`.
 """
+import importlib
+
 # Keep alphabetic order so merge conflicts stay small
-from .paragraph import ParagraphConverter  # noqa: F401
-from .heading import HeadingConverter      # noqa: F401
-from .list_item import ListItemConverter   # noqa: F401
-from .code import CodeBlockConverter       # noqa: F401
-from .table import TableConverter          # noqa: F401
-from .media import MediaConverter          # noqa: F401
-from .advanced import AdvancedBlockConverter  # noqa: F401
+_EXPORTS = {
+    "AdvancedBlockConverter": "advanced",
+    "CodeBlockConverter": "code",
+    "HeadingConverter": "heading",
+    "ListItemConverter": "list_item",
+    "MediaConverter": "media",
+    "ParagraphConverter": "paragraph",
+    "TableConverter": "table",
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    "ParagraphConverter",
-    "HeadingConverter",
-    "ListItemConverter",
-    "CodeBlockConverter",
-    "TableConverter",
-    "MediaConverter",
-    "AdvancedBlockConverter",
-]
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
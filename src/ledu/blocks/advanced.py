@@ -10,6 +10,8 @@ Approach
 * Start with **toggle** (`details` HTML or `???`) because markdown-it can emit
   a custom token via a plugin.
 * Each advanced block might deserve its own helper method.
+* Containers (toggle, column, callout) open a scope with
+  `context.open_scope(block, token)`; nested content fills their children.
 
 Until then this stub simply returns [] to avoid crashes.
 """
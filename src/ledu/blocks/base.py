@@ -4,18 +4,58 @@ Abstract base classes for block converters.
 Every concrete converter subclass **must**:
 
 * list the markdown-it token types it consumes (`token_types` tuple)
-* implement `.to_notion(...)` returning **List[JSONDict]**
+* implement `.to_notion(...)` returning **List[JSONDict]** or a
+  `ConversionResult` that also says where the walk continues; the "dicts"
+  may be typed IR blocks (`ledu.blocks.ir`), which is what the built-in
+  converters produce
 * rely on `ConversionContext` for shared state (list depth, numbering, …)
 
+Single-pass contract
+--------------------
+PageBuilder instantiates each converter class **once** and reuses it for
+every token, so converters must keep per-document state on the context,
+never on `self`.
+
+Leaf converters (paragraph, code, table, …) may consume a whole token range
+and return `ConversionResult(blocks, next_idx)` so nothing is walked twice.
+
+Container converters (list items, toggles, columns, …) do *not* scan ahead:
+they call `context.open_scope(block, token)` and return no blocks.  The
+tokens up to the matching `_close` are converted by the normal walk and
+land in the block's `children`; PageBuilder closes the scope when it meets
+the `_close` token.  Arbitrary nesting therefore costs one linear pass.
+
 You rarely need to modify this file after initial implementation.
 """
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, NamedTuple
 from ledu.utils.typing import JSONDict
 
 
+class ConversionResult(NamedTuple):
+    """Blocks produced by a converter plus the index the walk resumes at."""
+    blocks: List[JSONDict]
+    next_idx: int
+
+
+class Scope:
+    """An open container block collecting the children converted inside it."""
+    __slots__ = ("block", "close_type", "level", "children", "map")
+
+    def __init__(self, block: JSONDict, close_type: str, level: int,
+                 map: list | None = None) -> None:
+        self.block = block
+        self.close_type = close_type
+        self.level = level
+        self.children: List[JSONDict] = []
+        self.map = map  # source lines of the opening token
+
+    def closes_on(self, token) -> bool:
+        return token.type == self.close_type and token.level == self.level
+
+
 class ConversionContext:
     """
     Mutable context carried throughout the PageBuilder walk.
@@ -23,14 +63,44 @@ class ConversionContext:
     Attributes
     ----------
     depth : int
-        Current list / column depth.
+        Current list / column depth (number of open scopes).
     number_stack : list[int]
         Keeps track of numbering for ordered lists at each depth.
+    scopes : list[Scope]
+        Open container blocks, innermost last.
+    segmenter : RichTextSegmenter
+        The builder's shared segmenter — converters should use this one
+        (warm memo; timed when profiling) rather than creating their own.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, segmenter=None) -> None:
         self.depth: int = 0
         self.number_stack: list[int] = []
+        self.scopes: list[Scope] = []
+        self.segmenter = segmenter
+
+    # ---------------------------  Scopes  ----------------------------- #
+
+    def open_scope(self, block: JSONDict, token) -> None:
+        """
+        Make *block* the parent of everything converted until the `_close`
+        token matching *token* (an `*_open` token).
+        """
+        close_type = token.type[:-len("_open")] + "_close" \
+            if token.type.endswith("_open") else token.type + "_close"
+        self.scopes.append(Scope(block, close_type, token.level, token.map))
+        self.depth += 1
+
+    def close_scope(self) -> JSONDict:
+        """Pop the innermost scope and return its block with children attached."""
+        scope = self.scopes.pop()
+        self.depth -= 1
+        if not scope.children:
+            return scope.block
+        if not isinstance(scope.block, dict):  # immutable IR block
+            return scope.block.with_children(scope.children)
+        scope.block[scope.block["type"]]["children"] = scope.children
+        return scope.block
 
 
 class BlockConverter(ABC):
@@ -38,7 +108,7 @@ class BlockConverter(ABC):
     Strategy base class — one subclass per Notion block type.
 
     Subclasses register themselves into the global `BLOCK_REGISTRY` via
-    `__init_subclass__`.
+    `__init_subclass__`.  One instance serves a whole conversion.
     """
 
     #: markdown-it token types handled by this converter
@@ -56,7 +126,7 @@ class BlockConverter(ABC):
 
     @abstractmethod
     def to_notion(self, token, tokens, idx: int,
-                  context: ConversionContext) -> List[JSONDict]:
+                  context: ConversionContext) -> List[JSONDict] | ConversionResult:
         """
         Convert *token* (and possibly its siblings/children) into Notion blocks.
 
@@ -73,12 +143,14 @@ class BlockConverter(ABC):
 
         Returns
         -------
-        list[JSONDict]
-            One or more Notion block dicts ready for upload.
+        list[JSONDict] | ConversionResult
+            One or more Notion block dicts ready for upload.  A plain list
+            means "continue at idx + 1"; a `ConversionResult` carries the
+            index of the first token *not* consumed.
 
         Side effects
         ------------
-        Subclass **may** advance `context.depth` or mutate `context.number_stack`.
-        PageBuilder takes care of advancing *idx* after return.
+        Subclass **may** open a scope (`context.open_scope`) or mutate
+        `context.number_stack`.
         """
         raise NotImplementedError  # implemented by subclass
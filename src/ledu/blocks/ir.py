@@ -0,0 +1,322 @@
+"""
+ir.py
+=====
+
+Compact, typed intermediate representation (IR) of Notion blocks.
+
+Why
+---
+A Notion block as JSON is a small tree of dicts — `object`, `type`, the
+type payload, one dict per rich-text run, one per `text`, one per
+`annotations`… — each key repeated in every block.  For a 100k-block
+document that is gigabytes.  An IR block is a single `__slots__` object
+whose rich text is a tuple of the segmenter's flyweight `RichTextRun`s
+(interned `Annotations`, shared runs for repeated text), so it costs a
+small fraction of its JSON form.
+
+Converters return IR blocks (plain dicts still work: third-party
+converters and anything without an IR class pass through unchanged).
+
+Lowering
+--------
+`Block.to_notion()` builds the JSON dict; `lower(blocks)` does it for a
+list.  The upload path never lowers a whole document: `RequestPlanner`
+packs IR blocks (`ledu.utils.tree` helpers understand both forms) and the
+clients lower each request's blocks right before sending it.
+`PageBuilder.convert` / `iter_convert` stay the list-of-dicts API by
+lowering what the walk produces; `convert_ir` / `iter_convert_ir` return the
+IR itself.
+
+Value semantics
+---------------
+IR blocks are immutable.  `==` and `hash` are structural and cheap —
+runs are tuples whose annotations compare by identity — so blocks can be
+diffed, deduplicated and used as dict keys without lowering them.
+`with_children` returns a copy with other children.
+"""
+from __future__ import annotations
+
+import json
+from typing import ClassVar, Iterable, List, Sequence, Tuple
+
+from ledu.parser.rich_text import RichTextRun
+from ledu.utils.tree import LazyChildren, json_default
+from ledu.utils.typing import JSONDict
+
+Runs = Tuple[RichTextRun, ...]
+
+
+class Block:
+    """
+    Base class of IR blocks.
+
+    Subclasses declare their payload fields in `__slots__` (after
+    `children` for containers) and implement `_payload()`.
+    """
+    __slots__ = ()
+
+    #: Notion block type
+    type: ClassVar[str] = ""
+    #: whether the block may hold children
+    container: ClassVar[bool] = False
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _init(self, **values: object) -> None:
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    # ------------------------------------------------------------------ #
+    # Tree                                                               #
+    # ------------------------------------------------------------------ #
+
+    @property
+    def children(self) -> Sequence:
+        return ()
+
+    def with_children(self, children: Sequence) -> "Block":
+        """Copy of this block whose children are *children*."""
+        if not self.container:
+            if not children:
+                return self
+            raise TypeError(f"{self.type} blocks cannot have children")
+        clone = object.__new__(type(self))
+        for name in _slots(type(self)):
+            object.__setattr__(clone, name, getattr(self, name))
+        object.__setattr__(clone, "_children", tuple(children))  # lazy slices too
+        return clone
+
+    # ------------------------------------------------------------------ #
+    # Lowering                                                           #
+    # ------------------------------------------------------------------ #
+
+    def _payload(self) -> JSONDict:
+        return {}
+
+    def to_notion(self) -> JSONDict:
+        """Fresh Notion JSON dict for this block (children lowered too)."""
+        payload = self._payload()
+        children = self.children
+        if isinstance(children, LazyChildren):
+            payload["children"] = children  # stays lazy, like TableRows in dicts
+        elif children:
+            payload["children"] = [lower_block(c) for c in children]
+        return {"object": "block", "type": self.type, self.type: payload}
+
+    # ------------------------------------------------------------------ #
+    # Value semantics                                                    #
+    # ------------------------------------------------------------------ #
+
+    def _key(self) -> tuple:
+        return (self.type, *(_freeze(getattr(self, n)) for n in _slots(type(self))))
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Block):
+            return NotImplemented
+        return type(self) is type(other) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in _slots(type(self))
+                           if n != "_children")
+        kids = len(self.children)
+        return f"{type(self).__name__}({fields}{f', +{kids} children' if kids else ''})"
+
+    def __reduce__(self):
+        return (_rebuild, (type(self), tuple(getattr(self, n) for n in _slots(type(self)))))
+
+
+def _slots(cls: type) -> Tuple[str, ...]:
+    names = cls.__dict__.get("_all_slots")
+    if names is None:
+        names = tuple(n for c in reversed(cls.__mro__) for n in c.__dict__.get("__slots__", ()))
+        cls._all_slots = names  # class attribute, not an instance slot
+    return names
+
+
+def _rebuild(cls: type, values: tuple) -> Block:
+    block = object.__new__(cls)
+    for name, value in zip(_slots(cls), values):
+        object.__setattr__(block, name, value)
+    return block
+
+
+def _freeze(value: object) -> object:
+    """Hashable stand-in for a field value (dict children come from lowering)."""
+    if isinstance(value, dict):
+        return json.dumps(value, sort_keys=True, default=json_default)
+    if isinstance(value, (list, tuple, LazyChildren)) and not isinstance(value, RichTextRun):
+        return tuple(map(_freeze, value))
+    return value
+
+
+def _rich_text(runs: Runs) -> List[JSONDict]:
+    return [run.to_notion() for run in runs]
+
+
+# ---------------------------------------------------------------------- #
+# Block kinds                                                            #
+# ---------------------------------------------------------------------- #
+
+class TextBlock(Block):
+    """Rich text + color (+ children): paragraph, quote, list items, toggle."""
+    __slots__ = ("rich_text", "color", "_children")
+    container = True
+
+    def __init__(self, rich_text: Iterable[RichTextRun] = (), *, color: str = "default",
+                 children: Sequence = ()) -> None:
+        self._init(rich_text=tuple(rich_text), color=color, _children=tuple(children))
+
+    @property
+    def children(self) -> Sequence:
+        return self._children
+
+    def _payload(self) -> JSONDict:
+        return {"rich_text": _rich_text(self.rich_text), "color": self.color}
+
+
+class Paragraph(TextBlock):
+    __slots__ = ()
+    type = "paragraph"
+
+
+class Quote(TextBlock):
+    __slots__ = ()
+    type = "quote"
+
+
+class Toggle(TextBlock):
+    __slots__ = ()
+    type = "toggle"
+
+
+class BulletedListItem(TextBlock):
+    __slots__ = ()
+    type = "bulleted_list_item"
+
+
+class NumberedListItem(TextBlock):
+    __slots__ = ()
+    type = "numbered_list_item"
+
+
+class Heading(TextBlock):
+    """`heading_1` … `heading_3`; children only when toggleable."""
+    __slots__ = ("level", "is_toggleable")
+
+    def __init__(self, level: int, rich_text: Iterable[RichTextRun] = (), *,
+                 color: str = "default", is_toggleable: bool = False,
+                 children: Sequence = ()) -> None:
+        super().__init__(rich_text, color=color, children=children)
+        self._init(level=level, is_toggleable=is_toggleable)
+
+    @property
+    def type(self) -> str:  # type: ignore[override]
+        return f"heading_{self.level}"
+
+    def _payload(self) -> JSONDict:
+        payload = super()._payload()
+        payload["is_toggleable"] = self.is_toggleable
+        return payload
+
+
+class Code(Block):
+    __slots__ = ("rich_text", "language", "caption")
+    type = "code"
+
+    def __init__(self, rich_text: Iterable[RichTextRun], language: str = "plain text", *,
+                 caption: Iterable[RichTextRun] = ()) -> None:
+        self._init(rich_text=tuple(rich_text), language=language, caption=tuple(caption))
+
+    def _payload(self) -> JSONDict:
+        return {"rich_text": _rich_text(self.rich_text), "language": self.language,
+                "caption": _rich_text(self.caption)}
+
+
+class Equation(Block):
+    __slots__ = ("expression",)
+    type = "equation"
+
+    def __init__(self, expression: str) -> None:
+        self._init(expression=expression)
+
+    def _payload(self) -> JSONDict:
+        return {"expression": self.expression}
+
+
+class Divider(Block):
+    __slots__ = ()
+    type = "divider"
+
+
+class Media(Block):
+    """image / video / audio / file / pdf with an external source."""
+    __slots__ = ("kind", "url", "caption")
+
+    def __init__(self, kind: str, url: str, caption: str = "") -> None:
+        self._init(kind=kind, url=url, caption=caption)
+
+    @property
+    def type(self) -> str:  # type: ignore[override]
+        return self.kind
+
+    def _payload(self) -> JSONDict:
+        payload: JSONDict = {"type": "external", "external": {"url": self.url}}
+        if self.caption:
+            payload["caption"] = [{"type": "text", "text": {"content": self.caption}}]
+        return payload
+
+
+class Table(Block):
+    """
+    Table over segmented columns; its rows are a `TableRows` until
+    `with_children` (the planner) replaces them with one request's rows.
+    """
+    __slots__ = ("columns", "has_column_header", "has_row_header", "_children")
+    type = "table"
+    container = True
+
+    def __init__(self, columns: Sequence[Sequence[Runs]], *, has_column_header: bool = True,
+                 has_row_header: bool = False) -> None:
+        from ledu.blocks.table import TableRows
+        columns = list(columns)
+        self._init(columns=columns, has_column_header=has_column_header,
+                   has_row_header=has_row_header, _children=TableRows(columns))
+
+    @property
+    def children(self) -> Sequence:
+        return self._children
+
+    def _key(self) -> tuple:
+        from ledu.blocks.table import TableRows
+        rows = self._children
+        rows = (rows.start, rows.stop) if isinstance(rows, TableRows) else _freeze(rows)
+        return (self.type, _freeze(self.columns), self.has_column_header,
+                self.has_row_header, rows)
+
+    def __repr__(self) -> str:
+        return f"Table({len(self.columns)} columns, {len(self._children)} rows)"
+
+    def _payload(self) -> JSONDict:
+        return {"table_width": len(self.columns),
+                "has_column_header": self.has_column_header,
+                "has_row_header": self.has_row_header}
+
+
+# ---------------------------------------------------------------------- #
+# Lowering                                                               #
+# ---------------------------------------------------------------------- #
+
+def lower_block(block: Block | JSONDict) -> JSONDict:
+    """JSON dict for one IR block; dicts are returned unchanged."""
+    return block.to_notion() if isinstance(block, Block) else block
+
+
+def lower(blocks: Iterable[Block | JSONDict]) -> List[JSONDict]:
+    """JSON dicts for *blocks* (IR or dicts, lazy slices too)."""
+    return [lower_block(b) for b in blocks]
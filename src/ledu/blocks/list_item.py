@@ -9,7 +9,9 @@ Algorithm sketch (to implement later)
 -------------------------------------
 1. Detect list type by inspecting `token.markup` on `list_item_open`.
 2. For ordered lists maintain `context.number_stack`; bump on each new item.
-3. Recursively convert child tokens (they appear between `_open` and `_close`).
+3. Build the item block and `context.open_scope(block, token)`; PageBuilder
+   converts the child tokens (up to `list_item_close`) straight into the
+   item's children — no look-ahead needed.
 
 Edge case: nested lists inside toggle or callout are handled higher up.
 """
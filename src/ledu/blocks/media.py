@@ -9,18 +9,80 @@ For images/videos/audio:
 For bookmark/file:
     Accept custom Markdown syntax or HTML fallback, e.g. `[bookmark](url)`.
 
-For now, create **one stub class** that does nothing but keep API symmetry.
+Local assets
+------------
+`![x](./img/a.png)` becomes a media block whose `external.url` is still the
+*relative* source.  Conversion stays offline and cacheable; the upload path
+(`ledu.notion.assets.AssetUploader`) finds these blocks with
+`is_local_src`, uploads the files and swaps in the hosted source.
+
+A paragraph consisting only of images (the usual way to place a figure) is
+handed to `media_blocks` by `ParagraphConverter`.
 """
+from __future__ import annotations
+
+import posixpath
+import re
 from typing import List
+from urllib.parse import urlsplit
+
 from ledu.blocks.base import BlockConverter, ConversionContext
-from ledu.utils.typing import JSONDict
+from ledu.blocks.ir import Media
+
+#: Notion block types that carry a file source (`external` / `file_upload`)
+MEDIA_TYPES = ("image", "video", "audio", "file", "pdf")
+
+_EXT_TYPES = {
+    **dict.fromkeys(("mp4", "mov", "webm", "m4v", "ogv"), "video"),
+    **dict.fromkeys(("mp3", "wav", "ogg", "oga", "m4a", "flac", "aac"), "audio"),
+    "pdf": "pdf",
+}
+
+_SCHEME = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+
+
+def is_local_src(src: str) -> bool:
+    """True for relative/absolute paths and `file:` URLs (not web or data URLs)."""
+    if not src or src.startswith(("//", "#")):
+        return False
+    if _SCHEME.match(src) and not re.match(r"^[A-Za-z]:[\\/]", src):  # C:\ is a path
+        return urlsplit(src).scheme.lower() == "file"
+    return True
+
+
+def media_type(src: str) -> str:
+    """Notion block type for *src*, judged by its extension (default image)."""
+    ext = posixpath.splitext(urlsplit(src).path)[1].lower().lstrip(".")
+    return _EXT_TYPES.get(ext, "image")
+
+
+def media_block(token) -> Media:
+    """Media IR block for one markdown-it `image` token."""
+    src = token.attrGet("src") or ""
+    caption = "".join(child.content for child in token.children or []) or token.content
+    return Media(media_type(src), src, caption)
+
+
+def media_blocks(inline) -> List[Media] | None:
+    """
+    Media blocks for an `inline` token made only of images (and line
+    breaks / blank text between them); `None` if it contains anything else.
+    """
+    blocks = []
+    for child in inline.children or []:
+        if child.type == "image":
+            blocks.append(media_block(child))
+        elif child.type not in ("softbreak", "hardbreak") and \
+                not (child.type == "text" and not child.content.strip()):
+            return None
+    return blocks or None
 
 
 class MediaConverter(BlockConverter):
-    """Placeholder; real implementation will register multiple token types."""
-    token_types = ("image",)  # extend later
+    """`image` tokens → Notion image / video / audio / pdf blocks."""
+    token_types = ("image",)
 
     def to_notion(
         self, token, tokens, idx: int, context: ConversionContext
-    ) -> List[JSONDict]:
-        return []
+    ) -> List[Media]:
+        return [media_block(token)]
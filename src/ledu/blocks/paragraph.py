@@ -8,7 +8,7 @@ Steps to implement
 ------------------
 1. Collect inline tokens until you hit `paragraph_close`.
 2. Concatenate their `.content` into a raw string.
-3. Pass raw string to `RichTextSegmenter.segment`.
+3. Pass raw string to `context.segmenter.segment`.
 4. Build a single Notion **paragraph block**.
 
 Unit test
@@ -19,7 +19,8 @@ Expect :  paragraph.block.rich_text == [\"Hello \", \"world\"(bold), \"!\"]
 Once this file is stable, use it as a template for headings & list items.
 """
 from typing import List
-from ledu.blocks.base import BlockConverter, ConversionContext
+from ledu.blocks.base import BlockConverter, ConversionContext, ConversionResult
+from ledu.blocks.media import media_blocks
 from ledu.parser.rich_text import RichTextSegmenter
 from ledu.utils.typing import JSONDict
 
@@ -30,11 +31,16 @@ class ParagraphConverter(BlockConverter):
     token_types = ("paragraph_open",)
 
     def to_notion(self, token, tokens, idx: int,
-                  context: ConversionContext) -> List[JSONDict]:
+                  context: ConversionContext) -> List[JSONDict] | ConversionResult:
         """
         Convert a markdown paragraph into one Notion paragraph block.
 
+        Image-only paragraphs become media blocks (`ledu.blocks.media`).
+
         TODO → Real implementation.  Current placeholder returns empty list
         so PageBuilder will effectively drop paragraphs until you write code.
         """
+        media = media_blocks(tokens[idx + 1])
+        if media is not None:  # paragraph_open, inline, paragraph_close
+            return ConversionResult(media, idx + 3)
         return []
@@ -0,0 +1,109 @@
+"""
+registry.py
+===========
+
+Lazy *token type → BlockConverter* registry behind `config.BLOCK_REGISTRY`.
+
+Why lazy?
+---------
+`ledu --dry` runs from editor hooks and pre-commit thousands of times a
+day; importing every converter module up front is paid on each run.  The
+registry therefore starts out holding `LazyConverter` placeholders
+("module:Class" strings) and imports a converter module only the first
+time a document contains its token type.
+
+Sources, in order (later wins)
+------------------------------
+1. `BUILTIN_CONVERTERS` below.
+2. Entry points in the `ledu.converters` group, discovered once per process
+   on the first conversion — the entry point *name* is the markdown-it
+   token type, its *value* the converter class::
+
+       [project.entry-points."ledu.converters"]
+       mermaid_fence = "ledu_mermaid:MermaidConverter"
+
+3. Classes defined (imported) at runtime: `BlockConverter.__init_subclass__`
+   assigns their `token_types` directly, exactly like before.
+
+Hot path
+--------
+The registry is a plain `dict` subclass, so `PageBuilder`'s per-token
+`.get()` stays a C call; only a `LazyConverter` hit goes through `resolve`.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import Dict, List, Tuple
+
+#: entry-point group third-party converters register under
+ENTRY_POINT_GROUP = "ledu.converters"
+
+#: token type → "module:Class" for the converters shipped with ledu
+BUILTIN_CONVERTERS: Dict[str, str] = {
+    "details_open": "ledu.blocks.advanced:AdvancedBlockConverter",
+    "fence": "ledu.blocks.code:CodeBlockConverter",
+    "heading_open": "ledu.blocks.heading:HeadingConverter",
+    "image": "ledu.blocks.media:MediaConverter",
+    "list_item_open": "ledu.blocks.list_item:ListItemConverter",
+    "paragraph_open": "ledu.blocks.paragraph:ParagraphConverter",
+    "table_open": "ledu.blocks.table:TableConverter",
+}
+
+
+class LazyConverter:
+    """Placeholder for a converter class that has not been imported yet."""
+    __slots__ = ("path",)
+
+    def __init__(self, path: str) -> None:
+        self.path = path  # "package.module:Class"
+
+    def load(self):
+        module, _, attr = self.path.partition(":")
+        return getattr(importlib.import_module(module), attr)
+
+    def __repr__(self) -> str:
+        return f"LazyConverter({self.path!r})"
+
+
+class ConverterRegistry(dict):
+    """`dict` of token type → converter class *or* `LazyConverter`."""
+
+    def __init__(self, lazy: Dict[str, str] | None = None) -> None:
+        super().__init__((t, LazyConverter(p)) for t, p in (lazy or {}).items())
+        self._plugins_loaded = False
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def resolve(self, token_type: str):
+        """Converter class for *token_type* (importing it if needed) or None."""
+        entry = self.get(token_type)
+        if isinstance(entry, LazyConverter):
+            entry = self[token_type] = entry.load()
+        return entry
+
+    def register_lazy(self, token_type: str, path: str) -> None:
+        """Map *token_type* to "module:Class" without importing it."""
+        self[token_type] = LazyConverter(path)
+
+    def load_plugins(self) -> None:
+        """Add `ledu.converters` entry points (once per process)."""
+        if self._plugins_loaded:
+            return
+        self._plugins_loaded = True
+        from importlib.metadata import entry_points
+
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            self.register_lazy(ep.name, ep.value)
+
+    def describe(self) -> List[Tuple[str, str]]:
+        """Sorted (token type, "module.Class") pairs — nothing is imported."""
+        out = []
+        for token_type, entry in self.items():
+            if isinstance(entry, LazyConverter):
+                path = entry.path.replace(":", ".")
+            else:
+                path = f"{entry.__module__}.{entry.__qualname__}"
+            out.append((token_type, path))
+        return sorted(out)
@@ -4,25 +4,154 @@ table.py
 
 Converts Markdown tables into Notion `table`, `table_row` blocks.
 
-Implementation suggestion
--------------------------
+Implementation
+--------------
 markdown-it emits a nested sequence of `thead` / `tbody` / `tr` / `td_open`
-tokens – iterate until the matching `_close` while building row children.
+tokens.  `TableConverter` walks them once up to the matching `table_close`,
+collecting each cell's `inline` token into its **column**, then returns
+`ConversionResult(blocks, close_idx + 1)` so PageBuilder resumes after the
+table instead of re-walking its tokens.
 
-Start small: **headerless 2×2 table** fixture first, then add alignment.
+Columnar pipeline
+-----------------
+Generated tables run to tens of thousands of rows, and one dict per cell,
+run, text and annotation set adds up fast.  Instead:
+
+1. each column's cells go through `RichTextSegmenter.segment_column` in one
+   batch — repeated values ("Yes", "N/A", IDs in a join column) are
+   segmented once and share one immutable runs tuple;
+2. the converter returns a `ledu.blocks.ir.Table` whose children are a
+   `TableRows` (`LazyChildren`): it only holds the columns, and builds a
+   `table_row` dict when one is accessed (lowering keeps it lazy);
+3. `RequestPlanner` sends the rows in 100-row `blocks.children.append`
+   chunks, materializing one chunk at a time.
+
+`table_from_rows` / `read_table` build the same block from CSV/TSV data
+(`ledu table data.csv`) as a JSON dict, without going through Markdown
+at all.
+
+Notion has no column alignment, so `:---:` markers are ignored.
 """
-from typing import List
-from ledu.blocks.base import BlockConverter, ConversionContext
+from __future__ import annotations
+
+import csv
+import os
+from typing import Iterable, List, Sequence, Tuple
+
+from ledu.blocks.base import BlockConverter, ConversionContext, ConversionResult
+from ledu.blocks.ir import Table
+from ledu.parser.rich_text import RichTextRun
+from ledu.utils.tree import LazyChildren
 from ledu.utils.typing import JSONDict
 
+Column = List[Tuple[RichTextRun, ...]]
+
+
+class TableRows(LazyChildren):
+    """`table_row` blocks over segmented columns, built on access."""
+    __slots__ = ("columns", "start", "stop")
+
+    def __init__(self, columns: Sequence[Column], start: int = 0,
+                 stop: int | None = None) -> None:
+        self.columns = columns
+        self.start = start
+        self.stop = len(columns[0]) if stop is None else stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def _item(self, index: int) -> JSONDict:
+        i = self.start + index
+        return {"object": "block", "type": "table_row", "table_row": {
+            "cells": [[run.to_notion() for run in column[i]] for column in self.columns]}}
+
+    def _view(self, start: int, stop: int) -> "TableRows":
+        return TableRows(self.columns, self.start + start, self.start + stop)
+
+    def __reduce__(self):  # pickle a view as just its own rows
+        if self.start or self.stop != len(self.columns[0]):
+            return (TableRows, ([c[self.start:self.stop] for c in self.columns],))
+        return (TableRows, (self.columns,))
+
+
+def table_block(columns: Sequence[Column], *, has_column_header: bool = True,
+                has_row_header: bool = False) -> JSONDict:
+    """Notion `table` block over segmented *columns* (equal lengths)."""
+    return {"object": "block", "type": "table", "table": {
+        "table_width": len(columns),
+        "has_column_header": has_column_header,
+        "has_row_header": has_row_header,
+        "children": TableRows(list(columns)),
+    }}
+
+
+def _pad(columns: List[list], rows: int) -> None:
+    for column in columns:
+        column.extend([""] * (rows - len(column)))
+
+
+def table_from_rows(rows: Iterable[Sequence[str]], segmenter, *,
+                    has_column_header: bool = True, plain: bool = True) -> JSONDict | None:
+    """
+    Table block from rows of cell strings (`None` if there are no rows).
+
+    *plain* keeps cell text literal; otherwise cells are inline Markdown.
+    """
+    columns: List[list] = []
+    count = 0
+    for row in rows:
+        if len(row) > len(columns):
+            columns.extend([""] * count for _ in range(len(row) - len(columns)))
+        for column, cell in zip(columns, row):
+            column.append(cell)
+        count += 1
+        if len(row) < len(columns):
+            _pad(columns, count)
+    if not count:
+        return None
+    segmented = []
+    while columns:  # release each raw column as soon as it is segmented
+        segmented.append(segmenter.segment_column(columns.pop(0), plain=plain))
+    return table_block(segmented, has_column_header=has_column_header)
+
+
+def read_table(path: str | os.PathLike, segmenter, *, delimiter: str | None = None,
+               has_column_header: bool = True, plain: bool = True,
+               encoding: str = "utf-8-sig") -> JSONDict | None:
+    """Table block from a CSV / TSV file (tab-separated for `.tsv` / `.tab`)."""
+    if delimiter is None:
+        delimiter = "\t" if os.fspath(path).lower().endswith((".tsv", ".tab")) else ","
+    with open(path, newline="", encoding=encoding) as fh:
+        return table_from_rows(csv.reader(fh, delimiter=delimiter), segmenter,
+                               has_column_header=has_column_header, plain=plain)
+
 
 class TableConverter(BlockConverter):
+    """`table_open` … `table_close` → one Notion `table` block."""
     token_types = ("table_open",)
 
     def to_notion(
         self, token, tokens, idx: int, context: ConversionContext
-    ) -> List[JSONDict]:
-        """
-        TODO – implement real table conversion.
-        """
-        return []
+    ) -> ConversionResult:
+        columns: List[list] = []
+        rows = 0
+        end = idx + 1
+        while end < len(tokens):
+            tok = tokens[end]
+            if tok.type == "table_close" and tok.level == token.level:
+                break
+            if tok.type == "tr_open":
+                col = 0
+            elif tok.type == "inline":
+                if col == len(columns):
+                    columns.append([""] * rows)
+                columns[col].append(tok)
+                col += 1
+            elif tok.type == "tr_close":
+                rows += 1
+                _pad(columns, rows)
+            end += 1
+        if not rows:
+            return ConversionResult([], end + 1)
+        segmented = [context.segmenter.segment_column(c) for c in columns]
+        return ConversionResult([Table(segmented)], end + 1)
@@ -7,5 +7,6 @@ Expose `PageBuilder` at package level for convenient imports:
     >>> from ledu.builder import PageBuilder
 """
 from .page_builder import PageBuilder
+from .stats import ConversionStats
 
-__all__ = ["PageBuilder"]
+__all__ = ["PageBuilder", "ConversionStats"]
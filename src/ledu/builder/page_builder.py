@@ -8,11 +8,57 @@ You will revisit this module when:
 * performance becomes an issue (large documents)
 
 For now, keep it *simple & readable*.
+
+Streaming
+---------
+`iter_convert` is the primitive: it yields each top-level block (children
+included) the moment its converter returns, so uploaders can start sending
+while the rest of the document is still being converted.  `convert` just
+collects the same walk into a list.  The markdown-it token list itself is still
+built in one go by `MarkdownParser.parse`.
+
+Single pass
+-----------
+Each token is visited once.  Converters are cached per builder (one
+instance per class), may skip ahead by returning a `ConversionResult`, and
+nest containers through `ConversionContext`'s scope stack instead of
+scanning for their `_close` token (see `ledu.blocks.base`).
+
+Typed IR
+--------
+Converters produce the compact blocks of `ledu.blocks.ir` (dicts from
+plugins mix in freely).  `convert_ir` / `iter_convert_ir` return them as
+they are — the upload path keeps them until each request is sent —
+while `convert`, `iter_convert` and `convert_tokens` lower every top-level
+block to its Notion JSON dict as it leaves the walk.
+
+Caching
+-------
+With a `ConversionCache` (see `ledu.cache`) `convert` returns the stored
+block list for unchanged input and stores fresh results; `iter_convert`
+serves hits but never writes (a partially consumed stream is not a result).
+
+Profiling
+---------
+Pass `stats=ConversionStats()` to `convert` / `iter_convert`, or give the
+builder an `on_stats` callback to receive one per conversion (see
+`ledu.builder.stats`).  Profiled conversions bypass the cache.  Without
+stats the walk only pays an `is None` check per token.
 """
-from typing import List
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Type
 from ledu.parser.markdown_parser import MarkdownParser
-from ledu.blocks.base import ConversionContext
+from ledu.parser.rich_text import RichTextSegmenter
+from ledu.blocks.base import BlockConverter, ConversionContext, ConversionResult
+from ledu.builder.stats import ConversionStats, TimedSegmenter
 from ledu.config import BLOCK_REGISTRY
+from ledu.utils.errors import ConversionFailedError
+
+if TYPE_CHECKING:
+    from ledu.blocks.ir import Block
+    from ledu.cache import ConversionCache
 
 
 class PageBuilder:
@@ -23,37 +69,192 @@ class PageBuilder:
     -------
     convert(markdown: str) -> list[dict]
         Run full pipeline; no network calls.
+    iter_convert(markdown: str) -> Iterator[dict]
+        Same pipeline, yielding finished top-level blocks one at a time.
+    convert_tokens(tokens) -> list[dict]
+        Convert pre-parsed tokens (used for section-level re-conversion).
+    convert_ir(markdown: str) -> list[Block | dict]
+    iter_convert_ir(markdown: str) -> Iterator[Block | dict]
+        Same, returning typed IR blocks instead of dicts.
     """
 
-    def __init__(self, parser: MarkdownParser | None = None) -> None:
+    def __init__(self, parser: MarkdownParser | None = None,
+                 cache: "ConversionCache | None" = None, *,
+                 on_stats: Callable[[ConversionStats], None] | None = None) -> None:
         self.parser = parser or MarkdownParser()
+        self.segmenter = RichTextSegmenter(self.parser)
+        self.cache = cache
+        self.on_stats = on_stats
+        self._converters: Dict[Type[BlockConverter], BlockConverter] = {}
 
     # ------------------------------------------------------------------ #
     # Public API                                                         #
     # ------------------------------------------------------------------ #
 
-    def convert(self, markdown: str) -> List[dict]:
+    def convert(self, markdown: str, *, stats: ConversionStats | None = None,
+                lines: List[int] | None = None) -> List[dict]:
         """
-        Parse Markdown and yield Notion block list.
+        Parse Markdown and return the Notion block list.
+
+        A *lines* list is filled with the 1-based source line of every
+        top-level block (for error reports); the cache is bypassed then.
 
         TODO → deepen list/column handling once basic converters work.
         """
-        tokens = self.parser.parse(markdown)
-        context = ConversionContext()
-        blocks: List[dict] = []
+        stats = self._stats_for(stats)
+        if self.cache is None or stats is not None or lines is not None:
+            return list(self._walk(markdown, stats, lines))
+        blocks = self.cache.get(markdown)
+        if blocks is None:
+            blocks = list(self._walk(markdown))
+            self.cache.put(markdown, blocks)
+        return blocks
+
+    def iter_convert(self, markdown: str, *,
+                     stats: ConversionStats | None = None) -> Iterator[dict]:
+        """Parse Markdown and yield top-level Notion blocks as they complete."""
+        stats = self._stats_for(stats)
+        if self.cache is not None and stats is None:
+            cached = self.cache.get(markdown)
+            if cached is not None:
+                return iter(cached)
+        return self._walk(markdown, stats)
+
+    def convert_tokens(self, tokens: List, *,
+                       stats: ConversionStats | None = None) -> List[dict]:
+        """
+        Convert an already parsed token list (or a self-contained slice of
+        one, e.g. a single top-level section).  Never cached.
+        """
+        stats = self._stats_for(stats)
+        started = time.perf_counter() if stats is not None else 0.0
+        from ledu.blocks.ir import lower_block  # with the first converter, not at import
+        return list(map(lower_block, self._walk_tokens(tokens, stats, started)))
+
+    def convert_ir(self, markdown: str, *, stats: ConversionStats | None = None,
+                   lines: List[int] | None = None) -> List["Block | dict"]:
+        """Like `convert`, but the blocks stay typed IR (never cached)."""
+        return list(self._walk_ir(markdown, self._stats_for(stats), lines))
+
+    def iter_convert_ir(self, markdown: str, *, stats: ConversionStats | None = None,
+                        lines: List[int] | None = None) -> Iterator["Block | dict"]:
+        """
+        Like `iter_convert`, but yields typed IR blocks.  Cache hits are
+        served as the stored dicts.  *lines* grows with the stream (see
+        `convert`).
+        """
+        stats = self._stats_for(stats)
+        if self.cache is not None and stats is None and lines is None:
+            cached = self.cache.get(markdown)
+            if cached is not None:
+                return iter(cached)
+        return self._walk_ir(markdown, stats, lines)
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _stats_for(self, stats: ConversionStats | None) -> ConversionStats | None:
+        if stats is None and self.on_stats is not None:
+            return ConversionStats()
+        return stats
+
+    def _walk(self, markdown: str, stats: ConversionStats | None = None,
+              lines: List[int] | None = None) -> Iterator[dict]:
+        from ledu.blocks.ir import lower_block
+        for block in self._walk_ir(markdown, stats, lines):
+            yield lower_block(block)
+
+    def _walk_ir(self, markdown: str, stats: ConversionStats | None = None,
+                 lines: List[int] | None = None) -> Iterator["Block | dict"]:
+        started = time.perf_counter() if stats is not None else 0.0
+        yield from self._walk_tokens(self.parser.parse(markdown), stats, started, lines)
+
+    def _walk_tokens(self, tokens: List, stats: ConversionStats | None = None,
+                     started: float = 0.0,
+                     lines: List[int] | None = None) -> Iterator[dict]:
+        BLOCK_REGISTRY.load_plugins()
+        context = ConversionContext(
+            self.segmenter if stats is None else TimedSegmenter(self.segmenter, stats)
+        )
         idx = 0
 
+        scopes = context.scopes
+        converters = self._converters
+
         while idx < len(tokens):
             tok = tokens[idx]
+            if stats is not None:
+                stats.tokens[tok.type] += 1
+            if scopes and scopes[-1].closes_on(tok):
+                opened = scopes[-1].map
+                block = context.close_scope()
+                if stats is not None:
+                    stats.blocks_emitted += 1
+                if scopes:
+                    scopes[-1].children.append(block)
+                else:
+                    if lines is not None:
+                        lines.append(opened[0] + 1 if opened else _last(lines))
+                    yield block
+                idx += 1
+                continue
+
             converter_cls = BLOCK_REGISTRY.get(tok.type)
             if converter_cls is None:
                 # Unknown token — skip quietly for now (later: log warning)
+                if stats is not None:
+                    stats.skipped[tok.type] += 1
                 idx += 1
                 continue
 
-            converter = converter_cls()
-            new_blocks = converter.to_notion(tok, tokens, idx, context)
-            blocks.extend(new_blocks)
-            idx += 1  # subclasses may require smarter increment later
+            converter = converters.get(converter_cls)
+            if converter is None:  # first use (may import a lazy converter)
+                converter_cls = BLOCK_REGISTRY.resolve(tok.type)
+                converter = converters[converter_cls] = converter_cls()
+            if stats is None:
+                result = converter.to_notion(tok, tokens, idx, context)
+            else:
+                t0 = time.perf_counter()
+                result = converter.to_notion(tok, tokens, idx, context)
+                stats.record_converter(converter_cls.__name__, time.perf_counter() - t0)
+            if isinstance(result, ConversionResult):
+                new_blocks, next_idx = result
+                if next_idx <= idx:  # a plugin bug would otherwise loop forever
+                    raise ConversionFailedError(
+                        f"{converter_cls.__name__} returned next_idx={next_idx} for "
+                        f"{tok.type!r} at token {idx}; it must move past the token")
+                idx = next_idx
+            else:
+                new_blocks, idx = result, idx + 1
+            if stats is not None:
+                stats.blocks_emitted += len(new_blocks)
 
-        return blocks
+            if scopes:
+                scopes[-1].children.extend(new_blocks)
+            else:
+                if lines is not None:
+                    lines.extend([tok.map[0] + 1 if tok.map else _last(lines)]
+                                 * len(new_blocks))
+                yield from new_blocks
+
+        while scopes:  # unbalanced input: flush whatever is still open
+            opened = scopes[-1].map
+            block = context.close_scope()
+            if stats is not None:
+                stats.blocks_emitted += 1
+            if scopes:
+                scopes[-1].children.append(block)
+            else:
+                if lines is not None:
+                    lines.append(opened[0] + 1 if opened else _last(lines))
+                yield block
+
+        if stats is not None:
+            stats.total_seconds += time.perf_counter() - started
+            if self.on_stats is not None:
+                self.on_stats(stats)
+
+
+def _last(lines: List[int]) -> int:
+    return lines[-1] if lines else 1
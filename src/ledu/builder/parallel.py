@@ -0,0 +1,255 @@
+"""
+parallel.py
+===========
+
+Parse + convert one very large document on several cores.
+
+`PageBuilder.convert` is single-threaded end to end; for a 100 MB generated
+file that is minutes on one core.  `convert_parallel` instead:
+
+1. pre-scans the text for **safe split points** (`split_points`);
+2. cuts it into roughly equal chunks at those points (`split_markdown`);
+3. parses and converts the chunks in a `ProcessPoolExecutor`;
+4. stitches the block lists back together in document order.
+
+The result is identical to the serial path (tests/test_parallel.py checks
+this on every benchmark corpus shape, down to the token stream).
+
+Safe split points
+-----------------
+A split falls just before a line that
+
+* follows a blank line,
+* starts in column 0 and does not continue an open list, and
+* is not inside a fenced code block, an HTML block (types 1–5, which may
+  contain blank lines) or a `:::` container.
+
+Such a line always starts a new top-level block: lists, block quotes,
+indented code and tables all end at it.  So every chunk begins with the
+`ConversionContext` at rest — no open scopes, an empty `number_stack` —
+exactly as the serial walk is at that point, and no converter state has to
+be carried from one chunk to the next.  A list is never split, even a long
+loose one: its items share numbering (`ordered_list_open`'s `start`) and
+tight/loose rendering, which a chunk boundary would reset — so instead of
+repairing that state afterwards, the list stays in a single chunk.
+
+If the scanner cannot tell whether a fence-like line belongs to the
+current list item or starts a top-level fence, it stops proposing splits
+for the rest of the document (the remainder becomes one chunk).
+
+Link references
+---------------
+`[text][label]` resolves against definitions anywhere in the document.
+When the text contains any `]:` the workers first run a block-level pass
+over their chunks (`MarkdownParser.references`); the definitions are
+merged in document order (first one wins, as in markdown-it) and seed
+every chunk's parse.
+
+Workers use a default `PageBuilder`.  Conversions without enough text for
+two chunks, or with `jobs=1`, run in-process on the serial path.
+"""
+from __future__ import annotations
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List
+
+from ledu.builder.page_builder import PageBuilder
+from ledu.utils.typing import JSONDict
+
+#: chunks smaller than this are not worth a round trip to a worker
+MIN_CHUNK_BYTES: int = 256 * 1024
+
+#: chunks per worker (smooths out uneven chunk cost)
+CHUNKS_PER_JOB: int = 4
+
+_NEWLINES = re.compile(r"\r\n?")
+_FENCE = re.compile(r"( {0,3})(`{3,}|~{3,})(.*)")
+_LIST_MARKER = re.compile(r" {0,3}(?:[-+*]|\d{1,9}[.)])(?:[ \t]|$)")
+_CONTAINER = re.compile(r" {0,3}:{3,}(.*)")
+# CommonMark HTML block start conditions 1–5 (the ones that span blank lines)
+_HTML_OPEN = re.compile(
+    r" {0,3}<(?:(?:script|pre|style|textarea)(?=[\s>]|$)|!--|\?|![A-Za-z]|!\[CDATA\[)",
+    re.IGNORECASE)
+_HTML_CLOSE = (
+    (re.compile(r" {0,3}<(?:script|pre|style|textarea)", re.I),
+     re.compile(r"</(?:script|pre|style|textarea)>", re.I)),
+    (re.compile(r" {0,3}<!--"), re.compile(r"-->")),
+    (re.compile(r" {0,3}<\?"), re.compile(r"\?>")),
+    (re.compile(r" {0,3}<!\[CDATA\["), re.compile(r"\]\]>")),
+    (re.compile(r" {0,3}<![A-Za-z]"), re.compile(r">")),
+)
+
+
+# ---------------------------------------------------------------------- #
+# Splitting                                                              #
+# ---------------------------------------------------------------------- #
+
+def _html_closer(line: str) -> re.Pattern | None:
+    """Closing pattern of the HTML block *line* opens, `None` if it ends on it."""
+    for opener, closer in _HTML_CLOSE:
+        m = opener.match(line)
+        if m:
+            return None if closer.search(line, m.end()) else closer
+    return None
+
+
+def split_points(markdown: str) -> List[int]:
+    """
+    Offsets in *markdown* (newline-normalised) where a chunk may start.
+
+    See "Safe split points" above; `0` is never included.
+    """
+    points: List[int] = []
+    fence: tuple | None = None      # (char, length) of the open fence
+    html: re.Pattern | None = None  # closer of the open HTML block
+    containers = 0                  # open ::: containers
+    in_list = False                 # a top-level list may still be open
+    blank = False
+    offset = 0
+    for line in markdown.split("\n"):
+        start, offset = offset, offset + len(line) + 1
+        if fence is not None:
+            m = _FENCE.match(line)
+            if m and m.group(2)[0] == fence[0] and len(m.group(2)) >= fence[1] \
+                    and not m.group(3).strip(" \t"):
+                fence = None
+            continue
+        if html is not None:
+            if html.search(line):
+                html = None
+            continue
+        if not line.strip(" \t"):
+            blank = True
+            continue
+
+        column0 = line[0] not in " \t"
+        marker = _LIST_MARKER.match(line) is not None
+        if blank and column0 and not (marker and in_list):
+            if not containers and start:
+                points.append(start)
+            in_list = False
+        blank = False
+        if marker:
+            in_list = True
+
+        first = line.lstrip(" ")[:1]
+        if first in "`~":
+            m = _FENCE.match(line)
+            if m and not (m.group(2)[0] == "`" and "`" in m.group(3)):
+                if not column0 and in_list:
+                    break  # list item content or top level? can't tell cheaply
+                fence = (m.group(2)[0], len(m.group(2)))
+                in_list = False
+        elif first == "<" and _HTML_OPEN.match(line):
+            if not column0 and in_list:
+                break
+            html = _html_closer(line)
+            in_list = in_list and not column0
+        elif first == ":":
+            m = _CONTAINER.match(line)
+            if m:
+                if m.group(1).strip(" \t"):
+                    containers += 1
+                elif containers:
+                    containers -= 1
+    return points
+
+
+def split_markdown(markdown: str, parts: int, *,
+                   min_chunk_bytes: int = MIN_CHUNK_BYTES) -> List[str]:
+    """
+    Cut *markdown* into at most about *parts* chunks at safe split points.
+
+    Chunks are at least *min_chunk_bytes* long (except possibly the last);
+    `"".join(chunks)` is the newline-normalised input.
+    """
+    markdown = _NEWLINES.sub("\n", markdown)
+    target = max(min_chunk_bytes, len(markdown) // max(parts, 1), 1)
+    chunks: List[str] = []
+    cut = 0
+    for point in split_points(markdown):
+        if point - cut >= target and len(markdown) - point >= min_chunk_bytes:
+            chunks.append(markdown[cut:point])
+            cut = point
+    chunks.append(markdown[cut:])
+    return chunks
+
+
+# ---------------------------------------------------------------------- #
+# Worker side                                                            #
+# ---------------------------------------------------------------------- #
+
+#: per-process builder, created on first use
+_builder: PageBuilder | None = None
+
+
+def _worker_builder() -> PageBuilder:
+    global _builder
+    if _builder is None:
+        _builder = PageBuilder()
+    return _builder
+
+
+def _chunk_references(chunk: str) -> dict:
+    return _worker_builder().parser.references(chunk)
+
+
+def _convert_chunk(chunk: str, references: dict) -> List[JSONDict]:
+    builder = _worker_builder()
+    env = {"references": dict(references)} if references else None
+    return builder.convert_tokens(builder.parser.parse(chunk, env))
+
+
+def merge_references(found: List[dict]) -> dict:
+    """Per-chunk definitions, in document order → one map (first wins)."""
+    merged: dict = {}
+    for refs in found:
+        for label, ref in refs.items():
+            merged.setdefault(label, ref)
+    return merged
+
+
+# ---------------------------------------------------------------------- #
+# Public API                                                             #
+# ---------------------------------------------------------------------- #
+
+def convert_parallel(markdown: str, *, jobs: int | None = None, cache=None,
+                     min_chunk_bytes: int = MIN_CHUNK_BYTES) -> List[JSONDict]:
+    """
+    `PageBuilder().convert(markdown)`, with the work spread over processes.
+
+    Parameters
+    ----------
+    markdown : str
+        The whole document.
+    jobs : int, optional
+        Worker processes (`os.cpu_count()` by default); `1` converts serially.
+    cache : ConversionCache, optional
+        Consulted before and filled after the conversion, like
+        `PageBuilder(cache=...)`.
+    min_chunk_bytes : int
+        Smallest chunk worth sending to a worker.
+    """
+    if cache is not None:
+        blocks = cache.get(markdown)
+        if blocks is not None:
+            return blocks
+    jobs = jobs or os.cpu_count() or 1
+    chunks = split_markdown(markdown, jobs * CHUNKS_PER_JOB,
+                            min_chunk_bytes=min_chunk_bytes) if jobs > 1 else [markdown]
+    if len(chunks) < 2:
+        return PageBuilder(cache=cache).convert(markdown)
+
+    blocks: List[JSONDict] = []
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+        references = {}
+        if "]:" in markdown:
+            references = merge_references(list(pool.map(_chunk_references, chunks)))
+        for chunk_blocks in pool.map(_convert_chunk, chunks, repeat(references)):
+            blocks.extend(chunk_blocks)
+    if cache is not None:
+        cache.put(markdown, blocks)
+    return blocks
@@ -0,0 +1,142 @@
+"""
+stats.py
+========
+
+`ConversionStats` — what a single `PageBuilder` conversion spent its time on.
+
+Collected only when asked for (`PageBuilder.convert(md, stats=...)`, the
+builder's `on_stats` hook, or `ledu --profile`); a conversion without
+stats pays one `is None` check per token.
+
+Recorded
+--------
+* tokens seen, per markdown-it token type
+* calls and cumulative wall time per `BlockConverter` subclass (inclusive:
+  segmentation done inside a converter counts towards it as well)
+* rich-text segmentation calls / time (via `TimedSegmenter`)
+* blocks emitted (converter output plus closed container scopes)
+* tokens skipped because no converter is registered for their type
+* total wall time of the walk (for `iter_convert` this includes whatever
+  the consumer does between blocks)
+"""
+from __future__ import annotations
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+@dataclass
+class ConverterStats:
+    calls: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class ConversionStats:
+    """Counters for one (or, after `merge`, several) conversions."""
+    tokens: Counter = field(default_factory=Counter)
+    converters: Dict[str, ConverterStats] = field(default_factory=dict)
+    skipped: Counter = field(default_factory=Counter)
+    blocks_emitted: int = 0
+    segment_calls: int = 0
+    segment_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Recording (called by PageBuilder)                                  #
+    # ------------------------------------------------------------------ #
+
+    def record_converter(self, name: str, seconds: float) -> None:
+        entry = self.converters.get(name)
+        if entry is None:
+            entry = self.converters[name] = ConverterStats()
+        entry.calls += 1
+        entry.seconds += seconds
+
+    # ------------------------------------------------------------------ #
+    # Reporting                                                          #
+    # ------------------------------------------------------------------ #
+
+    def merge(self, other: "ConversionStats") -> "ConversionStats":
+        """Add *other*'s counters into this object (e.g. across files)."""
+        self.tokens.update(other.tokens)
+        self.skipped.update(other.skipped)
+        for name, entry in other.converters.items():
+            mine = self.converters.setdefault(name, ConverterStats())
+            mine.calls += entry.calls
+            mine.seconds += entry.seconds
+        self.blocks_emitted += other.blocks_emitted
+        self.segment_calls += other.segment_calls
+        self.segment_seconds += other.segment_seconds
+        self.total_seconds += other.total_seconds
+        return self
+
+    def to_dict(self) -> dict:
+        """Plain JSON-serialisable form for metrics pipelines."""
+        return {
+            "tokens": dict(self.tokens),
+            "converters": {n: {"calls": e.calls, "seconds": e.seconds}
+                           for n, e in self.converters.items()},
+            "skipped": dict(self.skipped),
+            "blocks_emitted": self.blocks_emitted,
+            "segment_calls": self.segment_calls,
+            "segment_seconds": self.segment_seconds,
+            "total_seconds": self.total_seconds,
+        }
+
+    def format_table(self) -> str:
+        """Converters sorted by cumulative time, then the totals."""
+        total = self.total_seconds or 1e-12
+        rows = sorted(self.converters.items(), key=lambda kv: -kv[1].seconds)
+        lines: List[str] = [f"{'converter':<28}{'calls':>8}{'ms':>10}{'%':>7}"]
+        for name, e in rows:
+            lines.append(f"{name:<28}{e.calls:>8}{e.seconds * 1000:>10.2f}"
+                         f"{e.seconds / total:>7.1%}")
+        lines.append(f"{'rich-text segmentation':<28}{self.segment_calls:>8}"
+                     f"{self.segment_seconds * 1000:>10.2f}"
+                     f"{self.segment_seconds / total:>7.1%}")
+        lines.append(f"{'total':<28}{sum(self.tokens.values()):>8}"
+                     f"{self.total_seconds * 1000:>10.2f}")
+        lines.append(f"blocks emitted: {self.blocks_emitted}")
+        if self.skipped:
+            top = ", ".join(f"{t}×{n}" for t, n in self.skipped.most_common(8))
+            lines.append(f"tokens skipped: {sum(self.skipped.values())} ({top})")
+        return "\n".join(lines)
+
+
+class TimedSegmenter:
+    """
+    Stand-in for a `RichTextSegmenter` that times every segmentation call.
+
+    Put on `ConversionContext.segmenter` while profiling; any attribute it
+    does not wrap is forwarded to the real segmenter.
+    """
+
+    def __init__(self, segmenter, stats: ConversionStats) -> None:
+        self._segmenter = segmenter
+        self._stats = stats
+
+    def __getattr__(self, name: str):
+        return getattr(self._segmenter, name)
+
+    def _timed(self, fn, arg):
+        start = time.perf_counter()
+        try:
+            return fn(arg)
+        finally:
+            self._stats.segment_calls += 1
+            self._stats.segment_seconds += time.perf_counter() - start
+
+    def segment(self, text):
+        return self._timed(self._segmenter.segment, text)
+
+    def segment_inline(self, token):
+        return self._timed(self._segmenter.segment_inline, token)
+
+    def segment_tokens(self, children):
+        return self._timed(self._segmenter.segment_tokens, children)
+
+    def segment_column(self, cells, *, plain=False):
+        return self._timed(lambda c: self._segmenter.segment_column(c, plain=plain), cells)
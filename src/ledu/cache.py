@@ -0,0 +1,176 @@
+"""
+cache.py
+========
+
+Opt-in persistent conversion cache: Markdown → block list, on disk.
+
+Cache key
+---------
+BLAKE2b over
+
+* the Markdown source,
+* the ledu version and the Python version (entry format is `marshal`),
+* the `Settings` fields that influence conversion (`CONVERSION_SETTINGS`),
+* the registered converter set (token type → converter class path).
+
+Anything else changing (e.g. editing a converter in a dev checkout) needs
+`ledu cache clear`.
+
+Storage
+-------
+One file per entry, `<dir>/<key[:2]>/<key>.bin`, holding the block list as
+zlib-compressed `marshal` data — compact and much faster to load than JSON.
+Writes are atomic (temp file + `os.replace`) so several worker processes
+can share a directory.  A hit refreshes the entry's mtime; when the total
+size passes `max_bytes` the least recently used entries are deleted.
+"""
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+import pathlib
+import sys
+import tempfile
+import zlib
+from dataclasses import dataclass
+from typing import List
+
+from ledu.utils.tree import materialize
+from ledu.utils.typing import JSONDict
+
+#: `Settings` fields that change conversion output (and so the cache key).
+CONVERSION_SETTINGS: tuple[str, ...] = ("default_color", "enable_equation_blocks")
+
+#: bump when the entry layout changes
+_FORMAT = 1
+
+
+@dataclass
+class CacheStats:
+    """Snapshot reported by `ledu cache stats`."""
+    directory: pathlib.Path
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int = 0
+    misses: int = 0
+
+
+class ConversionCache:
+    """Size-bounded LRU directory of converted block lists."""
+
+    def __init__(self, directory: str | os.PathLike, *,
+                 max_bytes: int = 256 * 2**20) -> None:
+        self.directory = pathlib.Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self._size: int | None = None  # lazily scanned running total
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def key(self, markdown: str) -> str:
+        """Cache key for *markdown* under the current settings & converters."""
+        from ledu import __version__
+        from ledu.config import BLOCK_REGISTRY, settings
+
+        BLOCK_REGISTRY.load_plugins()
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{_FORMAT}|{__version__}|{sys.version_info[:2]}".encode())
+        for name in CONVERSION_SETTINGS:
+            h.update(f"|{name}={getattr(settings, name)!r}".encode())
+        for token_type, path in BLOCK_REGISTRY.describe():
+            h.update(f"|{token_type}:{path}".encode())
+        h.update(b"\0")
+        h.update(markdown.encode("utf8"))
+        return h.hexdigest()
+
+    def get(self, markdown: str) -> List[JSONDict] | None:
+        """Cached blocks for *markdown*, or `None` on a miss."""
+        path = self._path(self.key(markdown))
+        try:
+            data = path.read_bytes()
+            blocks = marshal.loads(zlib.decompress(data))
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # LRU bookkeeping
+        except OSError:
+            pass
+        self.hits += 1
+        return blocks
+
+    def put(self, markdown: str, blocks: List[JSONDict]) -> None:
+        """Store *blocks* for *markdown*, evicting old entries if needed."""
+        try:
+            try:
+                raw = marshal.dumps(blocks)
+            except ValueError:  # lazy children (large tables)
+                raw = marshal.dumps(materialize(blocks))
+            data = zlib.compress(raw, 6)
+        except ValueError:  # non-primitive payload – simply do not cache
+            return
+        path = self._path(self.key(markdown))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+
+        self._size = self._scan_size() if self._size is None else self._size + len(data) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self, target: int | None = None) -> int:
+        """Delete least-recently-used entries until size ≤ *target*; return count."""
+        target = self.max_bytes * 9 // 10 if target is None else target
+        entries = sorted(self._entries(), key=lambda e: e[1].st_mtime)
+        total = sum(st.st_size for _, st in entries)
+        removed = 0
+        for path, st in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= st.st_size
+            removed += 1
+        self._size = total
+        return removed
+
+    def clear(self) -> int:
+        """Remove every entry; return how many were deleted."""
+        return self.evict(target=0)
+
+    def stats(self) -> CacheStats:
+        entries = list(self._entries())
+        return CacheStats(self.directory, len(entries),
+                          sum(st.st_size for _, st in entries), self.max_bytes,
+                          self.hits, self.misses)
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / key[:2] / f"{key}.bin"
+
+    def _entries(self):
+        if not self.directory.is_dir():
+            return
+        for path in self.directory.glob("??/*.bin"):
+            try:
+                yield path, path.stat()
+            except OSError:
+                continue
+
+    def _scan_size(self) -> int:
+        return sum(st.st_size for _, st in self._entries())
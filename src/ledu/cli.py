@@ -4,7 +4,20 @@ Command-line entry point.
 Usage examples
 --------------
 $ ledu README.md --dry                 # print JSON to stdout
+$ ledu README.md --dry --profile       # + per-converter timings on stderr
+$ ledu big.md --dry --format ndjson -o big.ndjson   # streamed, one block per line
+$ ledu huge.md --dry --jobs 16         # one large file, parsed on 16 processes
 $ ledu README.md --parent-id=<page>    # upload new page
+$ ledu README.md --parent-id=<page> --resume  # finish an interrupted upload
+$ ledu README.md --sync --parent-id=<page>     # patch the page from last run
+$ ledu sync docs/ --jobs 8 --parent-id=<page>   # many files, process pool
+$ ledu sync docs/ --cache-dir .ledu/cache       # reuse unchanged conversions
+$ ledu sync docs/ --synced --parent-id=<page>   # shared boilerplate → synced blocks
+$ ledu cache stats --cache-dir .ledu/cache      # or: ledu cache clear
+$ ledu export <page-id> -o page.md              # Notion → Markdown
+$ ledu export <id> <id> -o backup/ --recursive  # many pages + child pages
+$ ledu watch docs/ --parent-id=<page>           # re-sync edited sections on save
+$ ledu table data.csv --parent-id=<page>        # CSV/TSV → Notion table page
 $ ledu -h                              # help
 
 Integration steps
@@ -15,35 +28,388 @@ Integration steps
 from __future__ import annotations
 
 import argparse
-import json
 import pathlib
+import sys
 from ledu.builder.page_builder import PageBuilder
-from ledu.notion.client import NotionClient
 from ledu.config import settings
 
+# Network code (notion_client → httpx) is imported inside the upload paths
+# only; `ledu --dry` never pays for it.  tests/test_startup.py guards this.
+
 
 def _build_arg_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Ledu – Markdown ➜ Notion converter")
     p.add_argument("file", type=pathlib.Path, help="Markdown file to convert")
     p.add_argument("--parent-id", help="Notion parent page/database ID")
     p.add_argument("--dry", action="store_true", help="Print JSON instead of uploading")
+    p.add_argument("--format", choices=["pretty", "json", "ndjson"], default="pretty",
+                   help="--dry output: indented array, compact array or one block per line")
+    p.add_argument("--output", "-o", type=pathlib.Path,
+                   help="--dry output file (default: stdout)")
+    p.add_argument("--concurrency", type=int, default=settings.upload_concurrency,
+                   help="Maximum Notion requests in flight during upload")
+    p.add_argument("--sync", action="store_true",
+                   help="Patch the page uploaded last time instead of creating a new one")
+    p.add_argument("--validate", choices=["fix", "check", "off"],
+                   default=settings.validate_uploads,
+                   help="Preflight the blocks against Notion's limits before uploading")
+    p.add_argument("--resume", action="store_true",
+                   help="Continue the interrupted upload of this file instead of starting over")
+    p.add_argument("--manifest", type=pathlib.Path,
+                   help=f"Sync manifest path (default: under {settings.manifest_dir})")
+    p.add_argument("--profile", action="store_true",
+                   help="Print per-converter timings to stderr (bypasses the cache)")
+    p.add_argument("--jobs", "-j", type=int, default=1,
+                   help="Split a large file and convert the parts on N processes (0: one per CPU)")
+    _add_cache_option(p)
+    return p
+
+
+def _add_cache_option(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--cache-dir", default=settings.cache_dir or None,
+                   help="Reuse conversions stored in this directory (opt-in)")
+
+
+def _open_cache(cache_dir: str | None):
+    if not cache_dir:
+        return None
+    from ledu.cache import ConversionCache
+    return ConversionCache(cache_dir, max_bytes=settings.cache_max_bytes)
+
+
+def _build_sync_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="ledu sync",
+                                description="Convert many Markdown files in parallel")
+    p.add_argument("targets", nargs="+",
+                   help="Markdown files, directories (recursive *.md) or glob patterns")
+    p.add_argument("--parent-id", help="Upload each file as a page under this parent")
+    p.add_argument("--jobs", "-j", type=int, default=None,
+                   help="Worker processes (default: CPU count)")
+    p.add_argument("--synced", action="store_true",
+                   help="Upload content repeated across files once, as synced blocks")
+    _add_cache_option(p)
     return p
 
 
+def _sync(argv: list[str]) -> None:
+    """`ledu sync` – process-pool conversion feeding one upload queue."""
+    from ledu.batch import collect_sources, sync_files
+
+    args = _build_sync_parser().parse_args(argv)
+    paths = collect_sources(args.targets)
+    client = synced = None
+    if args.synced and args.parent_id:
+        from ledu.notion.client import NotionClient
+        from ledu.notion.synced import open_deduper
+
+        client = NotionClient(settings.notion_api_token)
+        synced = open_deduper(client, args.parent_id)
+    results = sync_files(paths, parent_id=args.parent_id, jobs=args.jobs,
+                         cache_dir=args.cache_dir, client=client, synced=synced)
+    if synced is not None:
+        synced.close()
+        s = synced.stats
+        print(f"synced blocks: {s.originals} uploaded, {s.reused} reused, "
+              f"{s.references} references ({s.blocks_saved} blocks saved)")
+        if s.error:
+            print(f"synced blocks skipped: {s.error}", file=sys.stderr)
+
+    width = max((len(str(r.path)) for r in results), default=4)
+    for r in sorted(results, key=lambda r: str(r.path)):
+        status = r.error or r.page_id or "ok"
+        print(f"{str(r.path):<{width}}  {r.block_count:>7} blocks  "
+              f"{r.seconds * 1000:>8.1f} ms  {status}")
+    failed = sum(not r.ok for r in results)
+    print(f"{len(results)} files, {failed} failed")
+    if failed:
+        raise SystemExit(1)
+
+
+def _cache(argv: list[str]) -> None:
+    """`ledu cache stats|clear` – inspect or empty the conversion cache."""
+    p = argparse.ArgumentParser(prog="ledu cache",
+                                description="Manage the on-disk conversion cache")
+    p.add_argument("action", choices=["stats", "clear"])
+    _add_cache_option(p)
+    args = p.parse_args(argv)
+    cache = _open_cache(args.cache_dir)
+    if cache is None:
+        p.error("no cache directory (pass --cache-dir)")
+
+    if args.action == "clear":
+        print(f"removed {cache.clear()} entries from {cache.directory}")
+        return
+    stats = cache.stats()
+    print(f"{stats.directory}: {stats.entries} entries, "
+          f"{stats.bytes / 2**20:.1f} MiB of {stats.max_bytes / 2**20:.0f} MiB")
+
+
+def _export(argv: list[str]) -> None:
+    """`ledu export` – Notion pages → Markdown files."""
+    p = argparse.ArgumentParser(prog="ledu export",
+                                description="Export Notion pages as Markdown")
+    p.add_argument("page_ids", nargs="+", help="Notion page IDs")
+    p.add_argument("--output", "-o", type=pathlib.Path, default=pathlib.Path("."),
+                   help="Directory (default: .), or a .md file for a single page")
+    p.add_argument("--recursive", "-r", action="store_true",
+                   help="Also export child pages and link them")
+    p.add_argument("--jobs", "-j", type=int, default=4, help="Pages exported at once")
+    p.add_argument("--concurrency", type=int, default=settings.upload_concurrency * 2,
+                   help="Maximum Notion requests in flight")
+    args = p.parse_args(argv)
+
+    import asyncio
+
+    results = asyncio.run(_export_async(args))
+    for r in sorted(results, key=lambda r: str(r.path)):
+        status = r.error or "ok"
+        print(f"{str(r.path or r.page_id)}  {r.block_count:>7} blocks  "
+              f"{r.seconds:>7.1f} s  {status}")
+    failed = sum(not r.ok for r in results)
+    print(f"{len(results)} pages, {failed} failed")
+    if failed:
+        raise SystemExit(1)
+
+
+async def _export_async(args: argparse.Namespace):
+    from ledu.notion.client import AsyncNotionClient
+    from ledu.notion.export import TreeFetcher, export_page, export_pages
+
+    client = AsyncNotionClient(settings.notion_api_token)
+    try:
+        single = len(args.page_ids) == 1 and not args.recursive
+        if single and args.output.suffix == ".md":
+            fetcher = TreeFetcher(client, concurrency=args.concurrency)
+            return [await export_page(client, args.page_ids[0], args.output,
+                                      fetcher=fetcher)]
+        return await export_pages(client, args.page_ids, args.output, jobs=args.jobs,
+                                  concurrency=args.concurrency, recursive=args.recursive)
+    finally:
+        await client.aclose()
+
+
+def _watch(argv: list[str]) -> None:
+    """`ledu watch` – re-sync Markdown files to Notion whenever they are saved."""
+    p = argparse.ArgumentParser(prog="ledu watch",
+                                description="Watch Markdown files and sync changes to Notion")
+    p.add_argument("targets", nargs="+", help="Markdown files or directories (recursive)")
+    p.add_argument("--parent-id", help="Parent for files that have no page yet")
+    p.add_argument("--debounce", type=float, default=0.3,
+                   help="Quiet period in seconds before a burst of saves is synced")
+    p.add_argument("--poll", action="store_true",
+                   help="Poll modification times instead of using inotify")
+    args = p.parse_args(argv)
+
+    from ledu.watch import watch
+
+    def report(event) -> None:
+        if event.error:
+            print(f"{event.path}: {event.error}", file=sys.stderr)
+            return
+        r = event.report
+        print(f"{event.path}: {event.reconverted} sections converted, "
+              f"{event.reused} reused; {r.updated} updated, {r.deleted} deleted, "
+              f"{r.inserted} append calls ({event.seconds * 1000:.0f} ms)")
+
+    try:
+        watch(args.targets, parent_id=args.parent_id, debounce=args.debounce,
+              backend="poll" if args.poll else "auto", on_sync=report)
+    except KeyboardInterrupt:
+        pass
+
+
+def _table(argv: list[str]) -> None:
+    """`ledu table` – CSV/TSV straight to a Notion table (no Markdown step)."""
+    p = argparse.ArgumentParser(prog="ledu table",
+                                description="Upload a CSV/TSV file as a Notion table")
+    p.add_argument("file", type=pathlib.Path, help="CSV or TSV file (.tsv/.tab → tabs)")
+    p.add_argument("--parent-id", help="Notion parent page ID")
+    p.add_argument("--title", help="Page title (default: file name)")
+    p.add_argument("--delimiter", help="Field delimiter (default: by extension)")
+    p.add_argument("--no-header", action="store_true",
+                   help="First row is data, not column names")
+    p.add_argument("--markdown", action="store_true",
+                   help="Treat cells as inline Markdown instead of literal text")
+    p.add_argument("--dry", action="store_true", help="Print JSON instead of uploading")
+    p.add_argument("--format", choices=["pretty", "json", "ndjson"], default="pretty")
+    p.add_argument("--output", "-o", type=pathlib.Path,
+                   help="--dry output file (default: stdout)")
+    args = p.parse_args(argv)
+
+    from ledu.blocks.table import read_table
+
+    block = read_table(args.file, PageBuilder().segmenter, delimiter=args.delimiter,
+                       has_column_header=not args.no_header, plain=not args.markdown)
+    blocks = [block] if block is not None else []
+    if args.dry:
+        from ledu.output import write_blocks
+        write_blocks(blocks, args.output, args.format)
+        return
+    if not args.parent_id:
+        p.error("--parent-id is required unless --dry is given")
+
+    from ledu.notion.client import NotionClient
+    from ledu.notion.upload import upload_stream
+
+    page_id = upload_stream(NotionClient(settings.notion_api_token), blocks,
+                            {"page_id": args.parent_id},
+                            title=args.title or args.file.stem, prefetch=0)
+    rows = len(block["table"]["children"]) if block else 0
+    print(f"{page_id}: {rows} rows")
+
+
+#: sub-commands dispatched on the first positional argument
+_COMMANDS = {"sync": _sync, "cache": _cache, "export": _export, "watch": _watch,
+             "table": _table}
+
+
 def main(argv: list[str] | None = None) -> None:
     """
     Main entry; designed so that it can be called programmatically.
 
     TODO → Add `--token` option to override config.notion_api_token.
     """
-    args = _build_arg_parser().parse_args(argv)
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in _COMMANDS:
+        return _COMMANDS[argv[0]](argv[1:])
+
+    parser = _build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.sync and not args.dry and not args.parent_id:
+        from ledu.notion.sync import Manifest, default_manifest_path
+
+        args.manifest = args.manifest or default_manifest_path(args.file,
+                                                               settings.manifest_dir)
+        if Manifest.load(args.manifest) is None:
+            parser.error("--parent-id is required for the first --sync of a file")
 
     markdown = args.file.read_text(encoding="utf8")
-    blocks = PageBuilder().convert(markdown)
+    builder = PageBuilder(cache=_open_cache(args.cache_dir))
+    stats = None
+    if args.profile:
+        from ledu.builder.stats import ConversionStats
+        stats = ConversionStats()
+
+    parallel = args.jobs != 1 and stats is None
+    if parallel:
+        from ledu.builder.parallel import convert_parallel
+        blocks = convert_parallel(markdown, jobs=args.jobs, cache=builder.cache)
 
     if args.dry:
-        print(json.dumps(blocks, indent=2))
+        from ledu.output import write_blocks
+
+        # stream straight from the generator: no full list, no giant string
+        write_blocks(iter(blocks) if parallel else builder.iter_convert(markdown, stats=stats),
+                     args.output, args.format)
+        if stats is not None:
+            print(stats.format_table(), file=sys.stderr)
+        return
+
+    if not parallel:
+        blocks = builder.convert(markdown, stats=stats)
+    if stats is not None:
+        print(stats.format_table(), file=sys.stderr)
+    blocks = _preflight(blocks, args, markdown, builder)
+    blocks = _resolve_assets(blocks, args)
+
+    if args.sync:
+        from ledu.notion.sync import default_manifest_path, sync_blocks
+
+        manifest = args.manifest or default_manifest_path(args.file, settings.manifest_dir)
+        report = sync_blocks(blocks, manifest, parent_id=args.parent_id,
+                             title=args.file.stem)
+        print(f"{'created' if report.created else 'patched'}: "
+              f"{report.updated} updated, {report.deleted} deleted, "
+              f"{report.inserted} append calls, {report.listed} listings")
         return
 
-    client = NotionClient(settings.notion_api_token)
-    client.create_page({"page_id": args.parent_id}, blocks)
+    import asyncio
+
+    asyncio.run(_upload(blocks, args, markdown))
+
+
+def _resolve_assets(blocks: list[dict], args: argparse.Namespace) -> list[dict]:
+    """Upload the local images *blocks* reference (no-op if there are none)."""
+    from ledu.notion.assets import iter_local_media, open_uploader
+    from ledu.utils.errors import LeduError
+
+    base_dir = args.file.parent
+
+    if next(iter_local_media(blocks), None) is None:
+        return blocks
+    with open_uploader() as assets:
+        try:
+            blocks = assets.resolve(blocks, base_dir)
+        except LeduError as exc:
+            raise SystemExit(f"ledu: {args.file}: {exc}") from None
+    s = assets.stats
+    print(f"assets: {s.uploaded} uploaded ({s.bytes / 2**20:.1f} MiB), "
+          f"{s.cached} already hosted, {s.deduped} duplicates", file=sys.stderr)
+    return blocks
+
+
+def _preflight(blocks: list[dict], args: argparse.Namespace, markdown: str,
+               builder: PageBuilder) -> list[dict]:
+    """Fix / check *blocks* against the API limits; exit with line numbers if invalid."""
+    from ledu.notion.validate import PreflightError, preflight
+
+    try:
+        return preflight(blocks, mode=args.validate, local_media=True)
+    except PreflightError:
+        lines: list[int] = []  # only now worth a second walk for source lines
+        builder.convert(markdown, lines=lines)
+        try:
+            preflight(blocks, mode=args.validate, lines=lines, local_media=True)
+        except PreflightError as exc:
+            raise SystemExit(f"ledu: {args.file}: {exc}") from None
+        raise
+
+
+async def _upload(blocks: list[dict], args: argparse.Namespace, markdown: str) -> str:
+    from ledu.notion.client import AsyncNotionClient
+    from ledu.notion.planner import RequestPlanner
+    from ledu.notion.upload import execute_plan_async
+
+    plan = RequestPlanner().plan(blocks)
+    parent = {"page_id": args.parent_id}
+    journal = _open_journal(plan, parent, args, markdown)
+    if journal is not None and journal.finished:
+        print(f"{journal.page}: already uploaded", file=sys.stderr)
+        return journal.page
+
+    client = AsyncNotionClient(settings.notion_api_token)
+    try:
+        page_id = await execute_plan_async(client, plan, parent, title=args.file.stem,
+                                           concurrency=args.concurrency, journal=journal)
+        if journal is not None:
+            journal.finish(page_id)
+        return page_id
+    finally:
+        await client.aclose()
+        if journal is not None:
+            journal.close()
+
+
+def _open_journal(plan, parent: dict, args: argparse.Namespace, markdown: str):
+    """Checkpoint journal of this upload (resumed with --resume), or None."""
+    if not settings.journal_dir:
+        if args.resume:
+            raise SystemExit("ledu: --resume needs a journal directory (settings.journal_dir)")
+        return None
+    from ledu.notion.journal import (JournalError, UploadJournal, content_hash,
+                                     default_journal_path)
+
+    journal = UploadJournal(default_journal_path(args.file, settings.journal_dir))
+    try:
+        journal.start(plan, content_hash=content_hash(markdown), parent=parent,
+                      title=args.file.stem, source=str(args.file), resume=args.resume)
+        if journal.pending and not journal.finished:
+            from ledu.notion.client import NotionClient
+            journal.reconcile(NotionClient(settings.notion_api_token), plan)
+    except JournalError as exc:
+        journal.close()
+        raise SystemExit(f"ledu: {exc}") from None
+    if journal.done and not journal.finished:
+        print(f"resuming {journal.page}: {len(journal.done)} of {len(plan)} requests "
+              f"already done", file=sys.stderr)
+    return journal
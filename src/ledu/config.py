@@ -12,8 +12,7 @@ Things to implement later
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Type
-from ledu.blocks.base import BlockConverter
+from ledu.blocks.registry import BUILTIN_CONVERTERS, ConverterRegistry
 
 
 @dataclass
@@ -26,11 +25,26 @@ class Settings:
     notion_api_token: str = ""
     default_color: str = "default"
     enable_equation_blocks: bool = True
+    upload_concurrency: int = 4
+    manifest_dir: str = ".ledu/manifests"
+    journal_dir: str = ".ledu/journals"  # empty → uploads are not checkpointed
+    validate_uploads: str = "fix"  # preflight before uploads: fix | check | off
+    cache_dir: str = ""  # empty → conversion cache disabled
+    cache_max_bytes: int = 256 * 2**20
+    asset_cache: str = ".ledu/assets.json"  # empty → uploads deduped per run only
+    asset_workers: int = 4
+    http_max_connections: int = 16  # shared pool, see ledu.notion.session
+    http_keepalive_expiry: float = 60.0
+    http2: bool = False  # needs the optional `h2` package
+    synced_registry: str = ".ledu/synced.json"  # `ledu sync --synced` originals
+    synced_min_blocks: int = 8
 
 
 #: singleton instance imported everywhere
 settings = Settings()
 
 #: Registry mapping *markdown-it token type* → *BlockConverter subclass*.
-#   Filled automatically by BlockConverter.__init_subclass__.
-BLOCK_REGISTRY: Dict[str, Type[BlockConverter]] = {}
+#   Built-ins and entry points are imported on first use (see
+#   `ledu.blocks.registry`); classes defined at runtime register themselves
+#   via BlockConverter.__init_subclass__.
+BLOCK_REGISTRY = ConverterRegistry(BUILTIN_CONVERTERS)
@@ -0,0 +1,360 @@
+"""
+assets.py
+=========
+
+Concurrent, deduplicated upload of local media (`![x](./img/a.png)`).
+
+Flow
+----
+Conversion leaves local references in media blocks as relative
+`external.url`s (see `ledu.blocks.media`).  Before a page is uploaded:
+
+1. `AssetUploader.prefetch(blocks, base_dir)` submits every local reference
+   to a bounded thread pool — the batch pipeline calls it as soon as a
+   file's conversion arrives, so uploads overlap the remaining conversions;
+2. `AssetUploader.resolve(blocks, base_dir)` waits for those uploads and
+   returns the blocks with hosted sources swapped in.
+
+Dedupe
+------
+* Same unchanged path twice (in one page or across pages) → one job.
+* Same *content* under different paths → one upload: files are keyed by
+  SHA-256, and concurrent jobs for one digest wait on the first.
+* `AssetCache` persists digest → hosted source (a JSON file), so assets
+  unchanged since an earlier run are never uploaded again.  It also keeps
+  path → (mtime, size, digest) so unchanged files are not even re-hashed.
+
+Expiry
+------
+Notion expires a file upload that no block uses within an hour, and
+`resolve` runs before the blocks are sent — which may never happen (an
+error, a failed upload).  The cache therefore records when each Notion
+upload was made.  Entries younger than `TRUST_SECONDS` are reused as they
+are; older ones are checked once (`verify`, the File Upload API's status)
+and kept for good only if a block has attached them, otherwise the asset
+is uploaded again.
+
+The upload function is pluggable: `NotionClient.upload_file` (Notion's File
+Upload API) by default, or anything returning a media source such as
+`{"type": "external", "external": {"url": "https://cdn/…"}}`.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List
+from urllib.parse import unquote, urlsplit
+
+from ledu.blocks.media import MEDIA_TYPES, is_local_src
+from ledu.utils.errors import LeduError
+from ledu.utils.tree import LazyChildren, get_children, with_children
+from ledu.utils.typing import JSONDict
+
+#: bump when the cache file layout changes
+_FORMAT = 2
+
+#: age (s) up to which an unconfirmed Notion upload is reused without a check
+#: (Notion expires unattached uploads after an hour)
+TRUST_SECONDS = 30 * 60
+
+
+class AssetError(LeduError):
+    """A local asset is missing or could not be uploaded."""
+
+
+@dataclass
+class AssetStats:
+    """What an `AssetUploader` did with the references it was given."""
+    uploaded: int = 0
+    cached: int = 0      # content already hosted (earlier run or this one)
+    deduped: int = 0     # waited on a concurrent upload of the same content
+    bytes: int = 0
+
+
+def asset_path(src: str, base_dir: str | os.PathLike = ".") -> pathlib.Path:
+    """Absolute path of a local *src* (relative to *base_dir*)."""
+    parts = urlsplit(src)
+    raw = unquote(parts.path if parts.scheme.lower() == "file" else src.split("#")[0])
+    return (pathlib.Path(base_dir) / raw).resolve()
+
+
+def local_src(block: JSONDict) -> str | None:
+    """Source of a media *block* (dict or typed IR) if it is a local path."""
+    if not isinstance(block, dict):  # typed IR block (`ledu.blocks.ir`)
+        src = getattr(block, "url", None) if block.type in MEDIA_TYPES else None
+    else:
+        btype = block.get("type")
+        data = block[btype] if btype in MEDIA_TYPES else None
+        src = data["external"]["url"] if data and data.get("type") == "external" else None
+    return src if src and is_local_src(src) else None
+
+
+def iter_local_media(blocks: List[JSONDict]) -> Iterator[JSONDict]:
+    """Every media block (at any depth) whose source is a local path."""
+    for block in blocks:
+        if local_src(block) is not None:
+            yield block
+        children = get_children(block)
+        if not isinstance(children, LazyChildren):  # table rows hold no media
+            yield from iter_local_media(children)
+
+
+class AssetCache:
+    """
+    Persistent digest → hosted source map (plus a stat cache for hashing).
+
+    *path* `None` keeps everything in memory.  `save` writes atomically;
+    call it after a run (`AssetUploader.close` does).
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None) -> None:
+        self.path = pathlib.Path(path) if path else None
+        self.sources: Dict[str, JSONDict] = {}
+        self.files: Dict[str, list] = {}
+        self.uploaded: Dict[str, float] = {}  # digest → time, until seen attached
+        self._lock = threading.Lock()
+        self._dirty = False
+        if self.path is not None and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf8"))
+            except (OSError, ValueError):
+                data = {}
+            if data.get("format") == _FORMAT:
+                self.sources = data.get("sources", {})
+                self.files = data.get("files", {})
+                self.uploaded = data.get("uploaded", {})
+
+    def digest(self, path: pathlib.Path) -> str:
+        """SHA-256 of *path*, reusing the stored one if mtime and size match."""
+        st = path.stat()
+        key = str(path)
+        with self._lock:
+            known = self.files.get(key)
+        if known and known[0] == st.st_mtime_ns and known[1] == st.st_size:
+            return known[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self.files[key] = [st.st_mtime_ns, st.st_size, digest]
+            self._dirty = True
+        return digest
+
+    def get(self, digest: str) -> JSONDict | None:
+        with self._lock:
+            return self.sources.get(digest)
+
+    def put(self, digest: str, source: JSONDict, *, unconfirmed: bool = False) -> None:
+        """Record *source*; *unconfirmed* ones may expire (see `uploaded_at`)."""
+        with self._lock:
+            self.sources[digest] = source
+            if unconfirmed:
+                self.uploaded[digest] = time.time()
+            else:
+                self.uploaded.pop(digest, None)
+            self._dirty = True
+
+    def uploaded_at(self, digest: str) -> float | None:
+        """When an unconfirmed upload was made; `None` once it cannot expire."""
+        with self._lock:
+            return self.uploaded.get(digest)
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        with self._lock:
+            text = json.dumps({"format": _FORMAT, "sources": self.sources,
+                               "files": self.files, "uploaded": self.uploaded},
+                              separators=(",", ":"))
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf8") as fh:
+                fh.write(text)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+class AssetUploader:
+    """
+    Upload local assets on *workers* threads, each distinct content once.
+
+    Parameters
+    ----------
+    upload : callable
+        `path → media source` (e.g. `NotionClient.upload_file`).
+    cache : AssetCache, optional
+        Persistent digest → source map; in-memory when omitted.
+    workers : int
+        Maximum uploads in flight.
+    verify : callable, optional
+        `source → bool`: whether a Notion upload older than `TRUST_SECONDS`
+        is attached to a block (so it never expires).  Without it such
+        entries are uploaded again.
+    """
+
+    def __init__(self, upload: Callable[[pathlib.Path], JSONDict],
+                 cache: AssetCache | None = None, *, workers: int = 4,
+                 verify: Callable[[JSONDict], bool] | None = None) -> None:
+        self.upload = upload
+        self.verify = verify
+        self.cache = cache or AssetCache()
+        self.stats = AssetStats()
+        self._pool = ThreadPoolExecutor(max_workers=workers,
+                                        thread_name_prefix="ledu-asset")
+        self._by_path: Dict[tuple, Future] = {}
+        self._by_digest: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def submit(self, src: str, base_dir: str | os.PathLike = ".") -> Future:
+        """Start (or join) the upload of one local *src*; future → source."""
+        path = asset_path(src, base_dir)
+        try:  # an edited file (e.g. under `ledu watch`) is a new job
+            st = path.stat()
+            key = (path, st.st_mtime_ns, st.st_size)
+        except OSError:
+            key = (path, None, None)
+        with self._lock:
+            future = self._by_path.get(key)
+            if future is None:
+                future = self._by_path[key] = self._pool.submit(self._process, path)
+        return future
+
+    def prefetch(self, blocks: List[JSONDict], base_dir: str | os.PathLike = ".") -> int:
+        """Submit every local media reference in *blocks*; return how many."""
+        count = 0
+        for block in iter_local_media(blocks):
+            self.submit(local_src(block), base_dir)
+            count += 1
+        return count
+
+    def resolve(self, blocks: List[JSONDict],
+                base_dir: str | os.PathLike = ".") -> List[JSONDict]:
+        """
+        Copy of *blocks* with local media replaced by hosted sources.
+
+        Blocks without local media are returned as-is (not copied).
+        Raises `AssetError` if a file is missing or its upload failed.
+        """
+        self.prefetch(blocks, base_dir)
+        return [self._resolve_block(b, base_dir) for b in blocks]
+
+    def close(self) -> None:
+        """Wait for running uploads and persist the cache."""
+        self._pool.shutdown(wait=True)
+        self.cache.save()
+
+    def __enter__(self) -> "AssetUploader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _resolve_block(self, block: JSONDict, base_dir) -> JSONDict:
+        children = get_children(block)
+        if children and not isinstance(children, LazyChildren):
+            resolved = [self._resolve_block(c, base_dir) for c in children]
+            if any(a is not b for a, b in zip(resolved, children)):
+                block = with_children(block, resolved)
+        src = local_src(block)
+        if src is None:
+            return block
+        if not isinstance(block, dict):  # IR media: the hosted source needs JSON
+            block = block.to_notion()
+        btype = block["type"]
+        data = block[btype]
+        try:
+            source = self.submit(src, base_dir).result()
+        except Exception as exc:
+            raise AssetError(f"{src}: {type(exc).__name__}: {exc}") from exc
+        payload = {k: v for k, v in data.items() if k not in ("type", "external")}
+        return {**block, btype: {**source, **payload}}
+
+    def _process(self, path: pathlib.Path) -> JSONDict:
+        digest = self.cache.digest(path)
+        source = self.cache.get(digest)
+        if source is not None and not self._usable(digest, source):
+            source = None
+        with self._lock:
+            if source is not None:
+                self.stats.cached += 1
+                return source
+            pending = self._by_digest.get(digest)
+            owner = pending is None
+            if owner:
+                pending = self._by_digest[digest] = Future()
+            else:
+                self.stats.deduped += 1
+        if not owner:
+            return pending.result()
+        try:
+            source = self.upload(path)
+        except BaseException as exc:
+            with self._lock:
+                del self._by_digest[digest]  # a later reference may retry
+            pending.set_exception(exc)
+            raise
+        self.cache.put(digest, source, unconfirmed=source.get("type") == "file_upload")
+        with self._lock:
+            self.stats.uploaded += 1
+            self.stats.bytes += path.stat().st_size
+        pending.set_result(source)
+        return source
+
+    def _usable(self, digest: str, source: JSONDict) -> bool:
+        """Whether a cached *source* is still live (see "Expiry" above)."""
+        since = self.cache.uploaded_at(digest)
+        if since is None or time.time() - since < TRUST_SECONDS:
+            return True
+        if self.verify is None or not self.verify(source):
+            return False
+        self.cache.put(digest, source)  # attached: confirmed for good
+        return True
+
+
+def open_uploader(client=None, *, cache_path: str | os.PathLike | None = None,
+                  workers: int | None = None) -> AssetUploader:
+    """`AssetUploader` over Notion file uploads with the configured cache."""
+    from ledu.config import settings
+
+    if client is None:
+        from ledu.notion.client import NotionClient
+        client = NotionClient(settings.notion_api_token)
+    cache = AssetCache(cache_path or settings.asset_cache or None)
+    # looked up per call: clients without file uploads work until one is needed
+    return AssetUploader(lambda path: client.upload_file(path), cache,
+                         workers=workers or settings.asset_workers,
+                         verify=lambda source: _attached(client, source))
+
+
+def _attached(client, source: JSONDict) -> bool:
+    """Whether the Notion file upload in *source* is used by a block."""
+    from ledu.notion.client import is_not_found
+
+    try:
+        upload = client.retrieve_file_upload(source["file_upload"]["id"])
+    except Exception as exc:
+        if is_not_found(exc):
+            return False
+        raise
+    return upload.get("status") == "uploaded" and not upload.get("expiry_time")
@@ -6,27 +6,88 @@ Goals
 * Keep the rest of Ledu completely decoupled from HTTP details.
 * Allow dependency injection / mocking during unit tests.
 
-Future improvements
--------------------
-* Back-off & retry logic using `tenacity`.
-* Request batching for >100 block uploads.
+Transport layer
+---------------
+Every SDK call goes through `NotionClient._call`, which
+
+1. waits on a `TokenBucket` (≈3 req/s, Notion's sustained average),
+2. retries failures with jittered exponential back-off (`RetryPolicy`),
+   honouring `Retry-After` on 429,
+3. only retries 5xx / time-outs for *idempotent* endpoints.
+
+`AsyncNotionClient` mirrors the same surface on top of
+`notion_client.AsyncClient`.
+
+Connections & rate limits are shared
+------------------------------------
+Unless given an explicit `client=` (an `httpx.Client`), both classes send
+through the process-wide keep-alive pool of `ledu.notion.session`, and
+unless given a `rate_limiter` they take the `TokenBucket` shared by every
+client of the same integration token — so creating a client per page is
+cheap and many clients together still respect Notion's per-integration
+limit.
+
+Request batching for >100 block uploads lives in `ledu.notion.planner`.
 """
 from __future__ import annotations
 
-from typing import List, Any
-from notion_client import Client
+import asyncio
+import mimetypes
+import os
+import time
+from typing import Any, Awaitable, Callable, List
+from notion_client import AsyncClient, Client
+from notion_client.errors import APIErrorCode, APIResponseError
+
+from ledu.blocks.ir import lower
+from ledu.notion.ratelimit import RetryPolicy, TokenBucket, retry_after_seconds
+from ledu.notion.session import shared_pool
 
 
 class NotionClient:
     """Wraps the Notion Python SDK with just the endpoints we need."""
 
-    def __init__(self, token: str, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        token: str,
+        *,
+        rate_limiter: TokenBucket | None = None,
+        retry: RetryPolicy | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        **kwargs: Any,
+    ) -> None:
+        if "client" not in kwargs:
+            kwargs["client"] = shared_pool().http_client()
         #: underlying SDK instance (private)
         self._client = Client(auth=token, **kwargs)
+        self.rate_limiter = rate_limiter or shared_pool().rate_limiter(token)
+        self.retry = retry or RetryPolicy()
+        self._sleep = sleep
+
+    # --------------------------  Transport  --------------------------- #
+
+    def _call(self, fn: Callable[..., Any], *args: Any,
+              idempotent: bool, **kwargs: Any) -> Any:
+        """Run one SDK call under the rate limiter with retry/back-off."""
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(self._sleep)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as exc:
+                if (attempt + 1 >= self.retry.max_attempts
+                        or not self.retry.is_retryable(exc, idempotent=idempotent)):
+                    raise
+                retry_after = retry_after_seconds(exc)
+                if retry_after is not None:
+                    self.rate_limiter.pause(retry_after)
+                self._sleep(self.retry.delay(attempt, exc))
+                attempt += 1
 
     # --------------------------  Pages  ------------------------------- #
 
-    def create_page(self, parent: dict, blocks: List[dict]) -> dict:
+    def create_page(self, parent: dict, blocks: List[dict], *,
+                    title: str | None = None) -> dict:
         """
         Create a new Notion page populated with *blocks*.
 
@@ -36,16 +97,181 @@ class NotionClient:
             Parent spec, e.g. `{\"page_id\": \"...\"}` or `{\"database_id\": ...}`.
         blocks : list[dict]
             Children blocks in API format.
+        title : str, optional
+            Page title (the `title` property).
 
         Returns
         -------
         dict
             Raw response from Notion HTTP API.
         """
-        return self._client.pages.create(parent=parent, children=blocks)
+        return self._call(self._client.pages.create, idempotent=False,
+                          **_page_kwargs(parent, blocks, title))
+
+    def retrieve_page(self, page_id: str) -> dict:
+        """Return the page object (properties, parent, …) for *page_id*."""
+        return self._call(self._client.pages.retrieve, page_id, idempotent=True)
+
+    # --------------------------  Blocks  ------------------------------ #
+
+    def append_blocks(self, block_id: str, blocks: List[dict], *,
+                      after: str | None = None) -> dict:
+        """Append *blocks* to an existing block or page (optionally *after* a sibling)."""
+        kwargs: dict[str, Any] = {"children": lower(blocks)}  # IR, lazy slices too
+        if after:
+            kwargs["after"] = after
+        return self._call(self._client.blocks.children.append, block_id,
+                          idempotent=False, **kwargs)
+
+    def list_children(self, block_id: str, *,
+                      start_cursor: str | None = None,
+                      page_size: int = 100) -> dict:
+        """Return one page of children of *block_id* (idempotent)."""
+        kwargs: dict[str, Any] = {"page_size": page_size}
+        if start_cursor:
+            kwargs["start_cursor"] = start_cursor
+        return self._call(self._client.blocks.children.list, block_id,
+                          idempotent=True, **kwargs)
+
+    def update_block(self, block_id: str, block: dict) -> dict:
+        """Replace the content of *block_id* with *block* (children ignored)."""
+        btype = block["type"]
+        payload = {k: v for k, v in block[btype].items() if k != "children"}
+        return self._call(self._client.blocks.update, block_id,
+                          idempotent=True, **{btype: payload})
+
+    def delete_block(self, block_id: str) -> dict:
+        """Archive *block_id* (and its subtree)."""
+        return self._call(self._client.blocks.delete, block_id, idempotent=True)
+
+    # --------------------------  Files  ------------------------------- #
+
+    def upload_file(self, path: str | os.PathLike) -> dict:
+        """
+        Upload a local file through Notion's File Upload API.
+
+        Files up to `UPLOAD_PART_BYTES` go in one request, larger ones in
+        multi-part mode.  Returns the media *source* to put in an image /
+        file / video … block: `{"type": "file_upload", "file_upload": {"id": ...}}`.
+        """
+        name = os.path.basename(path)
+        ctype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        size = os.path.getsize(path)
+        parts = max(1, -(-size // UPLOAD_PART_BYTES))
+        kwargs: dict[str, Any] = {"filename": name, "content_type": ctype}
+        if parts > 1:
+            kwargs.update(mode="multi_part", number_of_parts=parts)
+        upload = self._call(self._client.file_uploads.create, idempotent=False, **kwargs)
+        with open(path, "rb") as fh:
+            for number in range(1, parts + 1):
+                form: dict[str, Any] = {"file": (name, fh.read(UPLOAD_PART_BYTES), ctype)}
+                if parts > 1:
+                    form["part_number"] = str(number)
+                self._call(self._client.file_uploads.send, upload["id"],
+                           idempotent=True, **form)
+        if parts > 1:
+            self._call(self._client.file_uploads.complete, upload["id"], idempotent=True)
+        return {"type": "file_upload", "file_upload": {"id": upload["id"]}}
+
+    def retrieve_file_upload(self, upload_id: str) -> dict:
+        """The file upload object (`status`, `expiry_time`, …) (idempotent)."""
+        return self._call(self._client.file_uploads.retrieve, upload_id, idempotent=True)
+
+
+def is_not_found(exc: BaseException) -> bool:
+    """Whether *exc* is the API saying the object does not exist (404)."""
+    return isinstance(exc, APIResponseError) and exc.code == APIErrorCode.ObjectNotFound
+
+
+#: part size for multi-part file uploads (Notion: 5–20 MB per part)
+UPLOAD_PART_BYTES = 10 * 2**20
+
+
+def _page_kwargs(parent: dict, blocks: List[dict], title: str | None) -> dict:
+    kwargs: dict[str, Any] = {"parent": parent, "children": lower(blocks)}
+    if title:
+        kwargs["properties"] = {
+            "title": {"title": [{"type": "text", "text": {"content": title}}]}
+        }
+    return kwargs
+
+
+class AsyncNotionClient:
+    """Async twin of `NotionClient` built on `notion_client.AsyncClient`."""
+
+    def __init__(
+        self,
+        token: str,
+        *,
+        rate_limiter: TokenBucket | None = None,
+        retry: RetryPolicy | None = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        **kwargs: Any,
+    ) -> None:
+        self._pooled = "client" not in kwargs
+        if self._pooled:
+            try:
+                kwargs["client"] = shared_pool().async_http_client()
+            except RuntimeError:  # no running loop: private pool, closed by aclose
+                self._pooled = False
+        #: underlying SDK instance (private)
+        self._client = AsyncClient(auth=token, **kwargs)
+        self.rate_limiter = rate_limiter or shared_pool().rate_limiter(token)
+        self.retry = retry or RetryPolicy()
+        self._sleep = sleep
+
+    async def aclose(self) -> None:
+        """Close the HTTP connection pool, unless it is the shared one."""
+        if not self._pooled:
+            await self._client.aclose()
+
+    # --------------------------  Transport  --------------------------- #
+
+    async def _call(self, fn: Callable[..., Awaitable[Any]], *args: Any,
+                    idempotent: bool, **kwargs: Any) -> Any:
+        """Async counterpart of `NotionClient._call`."""
+        attempt = 0
+        while True:
+            wait = self.rate_limiter.reserve()
+            if wait > 0:
+                await self._sleep(wait)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as exc:
+                if (attempt + 1 >= self.retry.max_attempts
+                        or not self.retry.is_retryable(exc, idempotent=idempotent)):
+                    raise
+                retry_after = retry_after_seconds(exc)
+                if retry_after is not None:
+                    self.rate_limiter.pause(retry_after)
+                await self._sleep(self.retry.delay(attempt, exc))
+                attempt += 1
+
+    # --------------------------  Pages  ------------------------------- #
+
+    async def create_page(self, parent: dict, blocks: List[dict], *,
+                          title: str | None = None) -> dict:
+        """See `NotionClient.create_page`."""
+        return await self._call(self._client.pages.create, idempotent=False,
+                                **_page_kwargs(parent, blocks, title))
+
+    async def retrieve_page(self, page_id: str) -> dict:
+        """See `NotionClient.retrieve_page`."""
+        return await self._call(self._client.pages.retrieve, page_id, idempotent=True)
 
     # --------------------------  Blocks  ------------------------------ #
 
-    def append_blocks(self, block_id: str, blocks: List[dict]) -> dict:
+    async def append_blocks(self, block_id: str, blocks: List[dict]) -> dict:
         """Append *blocks* to an existing block or page."""
-        return self._client.blocks.children.append(block_id, children=blocks)
+        return await self._call(self._client.blocks.children.append, block_id,
+                                idempotent=False, children=lower(blocks))
+
+    async def list_children(self, block_id: str, *,
+                            start_cursor: str | None = None,
+                            page_size: int = 100) -> dict:
+        """Return one page of children of *block_id* (idempotent)."""
+        kwargs: dict[str, Any] = {"page_size": page_size}
+        if start_cursor:
+            kwargs["start_cursor"] = start_cursor
+        return await self._call(self._client.blocks.children.list, block_id,
+                                idempotent=True, **kwargs)
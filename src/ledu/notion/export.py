@@ -0,0 +1,252 @@
+"""
+export.py
+=========
+
+Notion → Markdown export with concurrent, paginated block-tree fetching.
+
+Fetching
+--------
+A page's block tree is only reachable one `blocks.children.list` call per
+block with children (plus one per extra 100 children).  `TreeFetcher`
+issues those calls concurrently, bounded by one semaphore shared by every
+page being exported; a block's children are requested as soon as the block
+itself is known, and the semaphore's FIFO queue makes the traversal
+breadth-first.  Pagination within one parent is inherently sequential
+(each cursor comes from the previous response).
+
+Writing
+-------
+`iter_page_markdown` starts fetching every top-level block's subtree
+immediately but yields Markdown in document order: block *n* is rendered
+and written as soon as its own subtree and blocks 0‥n-1 are done, so output
+starts flowing long before the last subtree arrives and memory holds only
+what is still pending.
+
+Many pages
+----------
+`export_pages` runs *jobs* page exports at once over one client (so one
+rate limiter) and one request semaphore.  With `recursive=True`,
+`child_page` blocks are linked to their own files and queued for export,
+which is how a whole workspace subtree is backed up.
+"""
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import re
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterable, List
+
+from ledu.notion.render import MarkdownRenderer
+from ledu.utils.tree import count_blocks
+from ledu.utils.typing import JSONDict
+
+#: block types whose children belong to another page / database
+_OPAQUE = frozenset({"child_page", "child_database"})
+
+
+@dataclass
+class ExportResult:
+    """Outcome of exporting one page."""
+    page_id: str
+    path: pathlib.Path | None = None
+    title: str = ""
+    block_count: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class TreeFetcher:
+    """Fetch block subtrees with at most *concurrency* requests in flight."""
+
+    def __init__(self, client, *, concurrency: int = 8) -> None:
+        self.client = client
+        self._slots = asyncio.Semaphore(concurrency)
+        self.requests = 0
+
+    async def list_all(self, block_id: str) -> List[JSONDict]:
+        """Every child of *block_id*, following cursors."""
+        out: List[JSONDict] = []
+        cursor = None
+        while True:
+            async with self._slots:
+                self.requests += 1
+                page = await self.client.list_children(block_id, start_cursor=cursor)
+            out.extend(page["results"])
+            cursor = page.get("next_cursor")
+            if not page.get("has_more") or not cursor:
+                return out
+
+    async def load(self, block: JSONDict) -> JSONDict:
+        """Attach *block*'s full subtree under `block[type]["children"]`."""
+        btype = block["type"]
+        if not block.get("has_children") or btype in _OPAQUE:
+            return block
+        children = await self.list_all(block["id"])
+        await asyncio.gather(*(self.load(c) for c in children if c.get("has_children")))
+        block[btype]["children"] = children
+        return block
+
+    async def iter_blocks(self, page_id: str) -> AsyncIterator[JSONDict]:
+        """Top-level blocks of *page_id*, each complete, in document order."""
+        pending: asyncio.Queue = asyncio.Queue()
+
+        async def produce() -> None:
+            cursor = None
+            while True:
+                async with self._slots:
+                    self.requests += 1
+                    page = await self.client.list_children(page_id, start_cursor=cursor)
+                for block in page["results"]:
+                    pending.put_nowait(asyncio.ensure_future(self.load(block)))
+                cursor = page.get("next_cursor")
+                if not page.get("has_more") or not cursor:
+                    break
+            pending.put_nowait(None)
+
+        producer = asyncio.ensure_future(produce())
+        tasks = []
+        try:
+            while True:
+                getter = asyncio.ensure_future(pending.get())
+                await asyncio.wait({getter, producer}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    producer.result()  # listing failed: raise its error
+                task = getter.result()
+                if task is None:
+                    break
+                tasks.append(task)
+                yield await task
+        finally:
+            for task in tasks + [producer]:
+                task.cancel()
+
+
+def page_title(page: JSONDict) -> str:
+    """Plain title of a page object (or of a `child_page` block)."""
+    if page.get("type") == "child_page":
+        return page["child_page"].get("title", "")
+    for prop in (page.get("properties") or {}).values():
+        if prop.get("type") == "title" or "title" in prop:
+            return "".join(t.get("plain_text") or t.get("text", {}).get("content", "")
+                           for t in prop.get("title", []))
+    return ""
+
+
+def page_filename(title: str, page_id: str) -> str:
+    """Stable, filesystem-safe `<slug>-<id8>.md` name."""
+    slug = re.sub(r"[^\w-]+", "-", title.lower(), flags=re.UNICODE).strip("-")[:60]
+    return f"{slug or 'untitled'}-{page_id.replace('-', '')[:8]}.md"
+
+
+# ---------------------------------------------------------------------- #
+# Public API                                                             #
+# ---------------------------------------------------------------------- #
+
+async def iter_page_markdown(client, page_id: str, *, fetcher: TreeFetcher | None = None,
+                             renderer: MarkdownRenderer | None = None,
+                             title: str | None = None) -> AsyncIterator[str]:
+    """Yield the Markdown of *page_id* chunk by chunk, in order."""
+    fetcher = fetcher or TreeFetcher(client)
+    stream = (renderer or MarkdownRenderer()).stream()
+    if title:
+        yield f"# {title}\n\n"
+    async for block in fetcher.iter_blocks(page_id):
+        chunk = stream.feed(block)
+        if chunk:
+            yield chunk
+    tail = stream.close()
+    if tail:
+        yield tail
+
+
+async def export_page(client, page_id: str, path: str | pathlib.Path, *,
+                      page: JSONDict | None = None,
+                      fetcher: TreeFetcher | None = None,
+                      on_child_page: Callable[[JSONDict], str | None] | None = None,
+                      ) -> ExportResult:
+    """
+    Write *page_id* as Markdown to *path*, one top-level block at a time.
+
+    *page* is the page object if the caller already retrieved it (for the
+    title); *on_child_page* maps `child_page` blocks to link targets.
+    """
+    start = time.perf_counter()
+    fetcher = fetcher or TreeFetcher(client)
+    result = ExportResult(page_id, pathlib.Path(path))
+    try:
+        if page is None:
+            page = await client.retrieve_page(page_id)
+        result.title = page_title(page)
+        stream = MarkdownRenderer(page_link=on_child_page).stream()
+        result.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(result.path, "w", encoding="utf8") as fh:
+            if result.title:
+                fh.write(f"# {result.title}\n\n")
+            async for block in fetcher.iter_blocks(page_id):
+                result.block_count += count_blocks([block])
+                fh.write(stream.feed(block))
+            fh.write(stream.close())
+    except Exception as exc:  # reported in the summary, never fatal
+        result.error = f"{type(exc).__name__}: {exc}"
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+async def export_pages(client, page_ids: Iterable[str], directory: str | pathlib.Path, *,
+                       jobs: int = 4, concurrency: int = 8,
+                       recursive: bool = False) -> List[ExportResult]:
+    """
+    Export many pages into *directory*, *jobs* at a time.
+
+    All pages share one `TreeFetcher` (≤ *concurrency* requests in flight).
+    With *recursive*, child pages are exported too and linked by file name.
+    """
+    directory = pathlib.Path(directory)
+    fetcher = TreeFetcher(client, concurrency=concurrency)
+    queue: asyncio.Queue = asyncio.Queue()
+    seen: set[str] = set()
+    results: List[ExportResult] = []
+    names: dict[str, str] = {}
+
+    def schedule(page_id: str, title: str | None = None) -> None:
+        if page_id not in seen:
+            seen.add(page_id)
+            queue.put_nowait(page_id)
+        if title is not None:
+            names.setdefault(page_id, page_filename(title, page_id))
+
+    def link_child(block: JSONDict) -> str:
+        schedule(block["id"], page_title(block))
+        return names[block["id"]]
+
+    async def worker() -> None:
+        while True:
+            page_id = await queue.get()
+            try:
+                page = await client.retrieve_page(page_id)
+                name = names.setdefault(page_id, page_filename(page_title(page), page_id))
+                results.append(await export_page(
+                    client, page_id, directory / name, page=page, fetcher=fetcher,
+                    on_child_page=link_child if recursive else None))
+            except Exception as exc:
+                results.append(ExportResult(page_id, error=f"{type(exc).__name__}: {exc}"))
+            finally:
+                queue.task_done()
+
+    for page_id in page_ids:
+        schedule(page_id)
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(1, jobs))]
+    try:
+        await queue.join()
+    finally:
+        for w in workers:
+            w.cancel()
+    return results
+
@@ -0,0 +1,562 @@
+"""
+fake.py
+=======
+
+In-process stand-in for the Notion REST API, for offline load and
+throughput testing of the upload path.
+
+What it implements
+------------------
+`POST /v1/pages`, `GET /v1/pages/{id}`, `GET|PATCH|DELETE /v1/blocks/{id}`,
+`GET|PATCH /v1/blocks/{id}/children` (cursor pagination, `after`),
+`POST /v1/file_uploads[/{id}/send|/complete]` (single and multi-part),
+`GET /v1/file_uploads/{id}`.  Uploads carry an `expiry_time` until a block
+uses them; `expire_uploads()` expires the unattached ones, as Notion does
+after an hour.
+Page parents that were never created are assumed to exist (they stand
+for pages shared with the integration).
+
+Notion's request limits are enforced with Notion-shaped `validation_error`
+responses, so `notion_client` raises the same `APIResponseError`s it would
+against the real service:
+
+* ≤100 elements in any `children` array, ≤2 nesting levels per request,
+  ≤1000 blocks per request, ≤500 KB request body,
+* ≤100 `rich_text` items per array, ≤2000 characters per `text.content`,
+* media sources: `external.url` must be http(s), `file_upload.id` must name
+  a finished upload.
+
+Load shaping
+------------
+latency      seconds added to every response (sleep in the transport)
+rate, burst  server-side token bucket; over quota → 429 + `Retry-After`
+error_rate   probability of an injected 429 (seeded, reproducible);
+             `inject_429(n)` queues exactly *n*
+`stats`      requests per endpoint, bytes in/out, throttled / rejected
+
+Wiring
+------
+`fake.client()` / `fake.async_client()` return `NotionClient` /
+`AsyncNotionClient` whose httpx pool talks to the fake through a mock
+transport (no sockets).  `with fake.serve() as url:` additionally exposes
+it on localhost for tools that only take a base URL.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List
+
+import httpx
+
+from ledu.notion.ratelimit import TokenBucket
+
+#: Notion error codes used by the fake
+_VALIDATION, _NOT_FOUND, _RATE_LIMITED = "validation_error", "object_not_found", "rate_limited"
+
+
+@dataclass
+class FakeLimits:
+    """Request limits the fake enforces (defaults = Notion's)."""
+    max_children: int = 100
+    max_depth: int = 2
+    max_blocks: int = 1000
+    max_payload_bytes: int = 500_000
+    max_rich_text_items: int = 100
+    max_text_length: int = 2000
+    max_upload_part_bytes: int = 20 * 2**20
+
+
+@dataclass
+class FakeStats:
+    """Counters since construction (or the last `reset_stats`)."""
+    requests: Counter = field(default_factory=Counter)
+    bytes_in: int = 0
+    bytes_out: int = 0
+    throttled: int = 0
+    rejected: int = 0
+    blocks_created: int = 0
+    files_uploaded: int = 0
+    connections: int = 0  # TCP connections accepted by `serve`
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+
+class FakeError(Exception):
+    """Raised inside handlers; rendered as a Notion error response."""
+
+    def __init__(self, status: int, code: str, message: str,
+                 headers: Dict[str, str] | None = None) -> None:
+        super().__init__(message)
+        self.status, self.code, self.headers = status, code, headers or {}
+
+
+def _in_an_hour() -> str:
+    expiry = time.gmtime(time.time() + 3600)
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", expiry)
+
+
+class _Node:
+    __slots__ = ("id", "type", "payload", "parent", "children", "archived")
+
+    def __init__(self, id: str, type: str, payload: dict, parent: str | None) -> None:
+        self.id, self.type, self.payload, self.parent = id, type, payload, parent
+        self.children: List[str] = []
+        self.archived = False
+
+
+_ROUTES: List[tuple[str, "re.Pattern[str]", str]] = [
+    ("POST", re.compile(r"/v1/pages/?$"), "pages.create"),
+    ("GET", re.compile(r"/v1/pages/(?P<id>[^/]+)$"), "pages.retrieve"),
+    ("GET", re.compile(r"/v1/blocks/(?P<id>[^/]+)/children$"), "blocks.children.list"),
+    ("PATCH", re.compile(r"/v1/blocks/(?P<id>[^/]+)/children$"), "blocks.children.append"),
+    ("GET", re.compile(r"/v1/blocks/(?P<id>[^/]+)$"), "blocks.retrieve"),
+    ("PATCH", re.compile(r"/v1/blocks/(?P<id>[^/]+)$"), "blocks.update"),
+    ("DELETE", re.compile(r"/v1/blocks/(?P<id>[^/]+)$"), "blocks.delete"),
+    ("POST", re.compile(r"/v1/file_uploads/?$"), "file_uploads.create"),
+    ("POST", re.compile(r"/v1/file_uploads/(?P<id>[^/]+)/send$"), "file_uploads.send"),
+    ("POST", re.compile(r"/v1/file_uploads/(?P<id>[^/]+)/complete$"),
+     "file_uploads.complete"),
+    ("GET", re.compile(r"/v1/file_uploads/(?P<id>[^/]+)$"), "file_uploads.retrieve"),
+]
+
+
+class FakeNotion:
+    """
+    Thread-safe in-memory Notion workspace.
+
+    Parameters
+    ----------
+    limits : FakeLimits, optional
+        Request limits to enforce.
+    latency : float
+        Seconds each response is delayed by (transport / server side).
+    rate, burst : float, optional
+        Server-side quota in requests per second (`None` = unlimited).
+    error_rate : float
+        Probability of answering any request with an injected 429.
+    seed : int
+        Seed for `error_rate` so runs are reproducible.
+    clock : callable
+        Monotonic time source for the quota; injectable for tests.
+    """
+
+    def __init__(self, *, limits: FakeLimits | None = None, latency: float = 0.0,
+                 rate: float | None = None, burst: float | None = None,
+                 error_rate: float = 0.0, seed: int = 0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.limits = limits or FakeLimits()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.stats = FakeStats()
+        self._quota = TokenBucket(rate, burst, clock=clock) if rate else None
+        self._rng = random.Random(seed)
+        self._forced_429: List[float] = []
+        self._nodes: Dict[str, _Node] = {}
+        self._uploads: Dict[str, dict] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Answer one API request (no latency; see `transport`)."""
+        body = request.content or b""
+        with self._lock:
+            self.stats.bytes_in += len(body)
+            try:
+                endpoint, match = self._route(request)
+                self.stats.requests[endpoint] += 1
+                self._admit()
+                multipart = request.headers.get("content-type", "").startswith("multipart/")
+                limit = (self.limits.max_upload_part_bytes if multipart
+                         else self.limits.max_payload_bytes)
+                if len(body) > limit:
+                    raise FakeError(413, _VALIDATION, "Request body too large.")
+                if multipart:
+                    data = {"part_bytes": len(body)}
+                else:
+                    data = json.loads(body) if body else {}
+                status, payload = 200, getattr(self, "_" + endpoint.replace(".", "_"))(
+                    match, data, request.url.params)
+                headers: Dict[str, str] = {}
+            except FakeError as err:
+                if err.status == 429:
+                    self.stats.throttled += 1
+                else:
+                    self.stats.rejected += 1
+                status, headers = err.status, err.headers
+                payload = {"object": "error", "status": err.status,
+                           "code": err.code, "message": str(err)}
+            out = json.dumps(payload).encode("utf8")
+            self.stats.bytes_out += len(out)
+        return httpx.Response(status, content=out, headers={
+            "content-type": "application/json", **headers})
+
+    def expire_uploads(self) -> int:
+        """Expire every file upload no block uses yet; return how many."""
+        with self._lock:
+            stale = [u for u in self._uploads.values() if u["expiry_time"] is not None]
+            for upload in stale:
+                upload["status"] = "expired"
+        return len(stale)
+
+    def transport(self) -> httpx.MockTransport:
+        """Sync httpx transport (sleeps `latency` per request)."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            request.read()  # multipart uploads arrive as a stream
+            if self.latency:
+                time.sleep(self.latency)
+            return self.handle(request)
+        return httpx.MockTransport(handler)
+
+    def async_transport(self) -> httpx.MockTransport:
+        """Async httpx transport (awaits `latency` per request)."""
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await request.aread()
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self.handle(request)
+        return httpx.MockTransport(handler)
+
+    def client(self, **kwargs: Any):
+        """`NotionClient` wired to this fake (kwargs go to NotionClient)."""
+        from ledu.notion.client import NotionClient
+        return NotionClient("fake-token",
+                            client=httpx.Client(transport=self.transport()), **kwargs)
+
+    def async_client(self, **kwargs: Any):
+        """`AsyncNotionClient` wired to this fake."""
+        from ledu.notion.client import AsyncNotionClient
+        return AsyncNotionClient(
+            "fake-token", client=httpx.AsyncClient(transport=self.async_transport()),
+            **kwargs)
+
+    @contextlib.contextmanager
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+        """Run a localhost HTTP server in a thread; yields its base URL."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like api.notion.com
+
+            def setup(self) -> None:
+                super().setup()
+                with fake._lock:
+                    fake.stats.connections += 1
+
+            def _reply(self) -> None:
+                length = int(self.headers.get("content-length") or 0)
+                request = httpx.Request(self.command, f"http://{host}{self.path}",
+                                        headers=dict(self.headers),
+                                        content=self.rfile.read(length))
+                if fake.latency:
+                    time.sleep(fake.latency)
+                response = fake.handle(request)
+                self.send_response(response.status_code)
+                for name, value in response.headers.items():
+                    if name.lower() != "content-length":
+                        self.send_header(name, value)
+                self.send_header("content-length", str(len(response.content)))
+                self.end_headers()
+                self.wfile.write(response.content)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _reply
+
+            def log_message(self, *args: Any) -> None:  # keep test output quiet
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://{host}:{server.server_address[1]}"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def inject_429(self, count: int = 1, retry_after: float = 1.0) -> None:
+        """Answer the next *count* requests with 429 + `Retry-After`."""
+        with self._lock:
+            self._forced_429.extend([retry_after] * count)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = FakeStats()
+
+    def tree(self, block_id: str) -> List[dict]:
+        """Live children of *block_id* as nested API-style block dicts."""
+        with self._lock:
+            return [self._export(self._nodes[c], deep=True)
+                    for c in self._live_children(block_id)]
+
+    # ------------------------------------------------------------------ #
+    # Endpoints                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _pages_create(self, match, data: dict, params) -> dict:
+        parent = data.get("parent") or {}
+        parent_id = parent.get("page_id") or parent.get("database_id")
+        if not parent_id:
+            raise FakeError(400, _VALIDATION, "body.parent should be defined.")
+        children = data.get("children") or []
+        self._validate(children)
+        parent_node = self._nodes.get(parent_id) or self._implicit_page(parent_id)
+        title = "".join(t.get("plain_text") or t.get("text", {}).get("content", "")
+                        for t in (data.get("properties") or {})
+                        .get("title", {}).get("title", []))
+        page = self._new(parent_node.id, "child_page", {"title": title})
+        parent_node.children.append(page.id)
+        self._insert(page, children, after=None)
+        return self._page_object(page)
+
+    def _pages_retrieve(self, match, data: dict, params) -> dict:
+        return self._page_object(self._get(match["id"], page=True))
+
+    def _blocks_retrieve(self, match, data: dict, params) -> dict:
+        return self._export(self._get(match["id"]))
+
+    def _blocks_children_list(self, match, data: dict, params) -> dict:
+        node = self._get(match["id"])
+        ids = self._live_children(node.id)
+        start = 0
+        if params.get("start_cursor"):
+            try:
+                start = ids.index(params["start_cursor"])
+            except ValueError:
+                raise FakeError(400, _VALIDATION, "start_cursor is invalid.") from None
+        size = min(int(params.get("page_size") or 100), 100)
+        page = ids[start:start + size]
+        more = start + size < len(ids)
+        return {"object": "list", "type": "block", "block": {},
+                "results": [self._export(self._nodes[i]) for i in page],
+                "next_cursor": ids[start + size] if more else None, "has_more": more}
+
+    def _blocks_children_append(self, match, data: dict, params) -> dict:
+        node = self._get(match["id"])
+        children = data.get("children") or []
+        if not children:
+            raise FakeError(400, _VALIDATION, "body.children should be defined.")
+        self._validate(children)
+        after = data.get("after")
+        if after is not None and after not in self._live_children(node.id):
+            raise FakeError(400, _VALIDATION, f"after block {after} is not a child.")
+        created = self._insert(node, children, after=after)
+        return {"object": "list", "type": "block", "block": {}, "next_cursor": None,
+                "has_more": False, "results": [self._export(c) for c in created]}
+
+    def _blocks_update(self, match, data: dict, params) -> dict:
+        node = self._get(match["id"])
+        if data.get("archived") or data.get("in_trash"):
+            return self._blocks_delete(match, {}, params)
+        if node.type not in data:
+            raise FakeError(400, _VALIDATION,
+                            f"body.{node.type} should be defined (type cannot change).")
+        payload = dict(data[node.type])
+        self._validate_payload(payload)
+        node.payload = payload
+        return self._export(node)
+
+    def _blocks_delete(self, match, data: dict, params) -> dict:
+        node = self._get(match["id"])
+        node.archived = True
+        return self._export(node)
+
+    def _file_uploads_create(self, match, data: dict, params) -> dict:
+        n = next(self._ids)
+        upload = {"object": "file_upload", "id": f"{n:08x}-0000-4000-9000-{n:012x}",
+                  "filename": data.get("filename"), "content_type": data.get("content_type"),
+                  "status": "pending", "parts": int(data.get("number_of_parts") or 1),
+                  "mode": data.get("mode") or "single_part", "received": 0,
+                  "expiry_time": _in_an_hour()}
+        self._uploads[upload["id"]] = upload
+        return upload
+
+    def _file_uploads_retrieve(self, match, data: dict, params) -> dict:
+        upload = self._uploads.get(match["id"])
+        if upload is None:
+            raise FakeError(404, _NOT_FOUND, f"Could not find file upload {match['id']}.")
+        return upload
+
+    def _file_uploads_send(self, match, data: dict, params) -> dict:
+        upload = self._uploads.get(match["id"])
+        if upload is None:
+            raise FakeError(404, _NOT_FOUND, f"Could not find file upload {match['id']}.")
+        if upload["status"] != "pending":
+            raise FakeError(400, _VALIDATION, "File upload is not pending.")
+        upload["received"] += 1
+        if upload["mode"] == "single_part":
+            upload["status"] = "uploaded"
+            self.stats.files_uploaded += 1
+        return upload
+
+    def _file_uploads_complete(self, match, data: dict, params) -> dict:
+        upload = self._uploads.get(match["id"])
+        if upload is None or upload["received"] < upload["parts"]:
+            raise FakeError(400, _VALIDATION, "File upload has missing parts.")
+        if upload["status"] == "pending":
+            upload["status"] = "uploaded"
+            self.stats.files_uploaded += 1
+        return upload
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _route(self, request: httpx.Request):
+        path = request.url.path
+        for method, pattern, endpoint in _ROUTES:
+            if request.method == method and (match := pattern.search(path)):
+                return endpoint, match
+        raise FakeError(400, "invalid_request_url", f"Invalid request URL {path}.")
+
+    def _admit(self) -> None:
+        """Apply injected failures and the server-side quota."""
+        if self._forced_429:
+            retry = self._forced_429.pop(0)
+        elif self.error_rate and self._rng.random() < self.error_rate:
+            retry = 1.0
+        elif self._quota is not None and (wait := self._quota.try_acquire()) > 0:
+            retry = wait
+        else:
+            return
+        raise FakeError(429, _RATE_LIMITED, "You have been rate limited.",
+                        {"Retry-After": str(max(1, math.ceil(retry)))})
+
+    def _validate(self, children: List[dict]) -> None:
+        lim = self.limits
+        total = 0
+
+        def walk(blocks: List[dict], level: int) -> None:
+            nonlocal total
+            if not isinstance(blocks, list):
+                raise FakeError(400, _VALIDATION, "children should be an array.")
+            if len(blocks) > lim.max_children:
+                raise FakeError(400, _VALIDATION, f"children.length should be ≤ "
+                                f"`{lim.max_children}`, instead was `{len(blocks)}`.")
+            for block in blocks:
+                total += 1
+                btype = block.get("type")
+                if not btype or not isinstance(block.get(btype), dict):
+                    raise FakeError(400, _VALIDATION, f"block type {btype!r} is invalid.")
+                self._validate_payload(block[btype])
+                nested = block[btype].get("children")
+                if btype == "synced_block":
+                    self._validate_synced(block[btype], nested)
+                if nested:
+                    if level >= lim.max_depth:
+                        raise FakeError(400, _VALIDATION, "children nested more than "
+                                        f"{lim.max_depth} levels in one request.")
+                    walk(nested, level + 1)
+
+        walk(children, 1)
+        if total > lim.max_blocks:
+            raise FakeError(400, _VALIDATION, f"request has {total} blocks; "
+                            f"limit is {lim.max_blocks}.")
+
+    def _validate_synced(self, payload: dict, children) -> None:
+        source = payload.get("synced_from")
+        if source is None:
+            if any(c.get("type") == "synced_block" for c in children or ()):
+                raise FakeError(400, _VALIDATION, "synced blocks cannot be nested.")
+            return
+        if children:
+            raise FakeError(400, _VALIDATION, "a synced_from block cannot have children.")
+        original = self._nodes.get(source.get("block_id"))
+        if original is None or original.archived or original.type != "synced_block" \
+                or original.payload.get("synced_from"):
+            raise FakeError(404, _NOT_FOUND, "Could not find original synced block "
+                            f"with ID: {source.get('block_id')}.")
+
+    def _validate_payload(self, payload: dict) -> None:
+        lim = self.limits
+        source = payload.get("type")
+        if source == "external":
+            url = (payload.get("external") or {}).get("url", "")
+            if not url.startswith(("http://", "https://")):
+                raise FakeError(400, _VALIDATION, f"Invalid URL for external file: {url}")
+        elif source == "file_upload":
+            upload = self._uploads.get((payload.get("file_upload") or {}).get("id"))
+            if upload is None or upload["status"] != "uploaded":
+                raise FakeError(400, _VALIDATION, "file_upload.id is not an uploaded file.")
+            upload["expiry_time"] = None  # attached: kept for good
+        for key in ("rich_text", "caption"):
+            items = payload.get(key) or []
+            if len(items) > lim.max_rich_text_items:
+                raise FakeError(400, _VALIDATION, f"{key}.length should be ≤ "
+                                f"`{lim.max_rich_text_items}`, instead was `{len(items)}`.")
+            for item in items:
+                content = (item.get("text") or {}).get("content", "")
+                if len(content) > lim.max_text_length:
+                    raise FakeError(400, _VALIDATION, f"text.content.length should be ≤ "
+                                    f"`{lim.max_text_length}`, instead was `{len(content)}`.")
+
+    def _new(self, parent: str | None, btype: str, payload: dict) -> _Node:
+        n = next(self._ids)
+        node = _Node(f"{n:08x}-0000-4000-8000-{n:012x}", btype, payload, parent)
+        self._nodes[node.id] = node
+        return node
+
+    def _implicit_page(self, page_id: str) -> _Node:
+        node = _Node(page_id, "child_page", {"title": ""}, None)
+        self._nodes[page_id] = node
+        return node
+
+    def _insert(self, parent: _Node, blocks: List[dict], *, after: str | None) -> List[_Node]:
+        created = []
+        for block in blocks:
+            payload = {k: v for k, v in block[block["type"]].items() if k != "children"}
+            node = self._new(parent.id, block["type"], payload)
+            self.stats.blocks_created += 1
+            self._insert(node, block[block["type"]].get("children") or [], after=None)
+            created.append(node)
+        pos = len(parent.children) if after is None else parent.children.index(after) + 1
+        parent.children[pos:pos] = [n.id for n in created]
+        return created
+
+    def _get(self, block_id: str, *, page: bool = False) -> _Node:
+        node = self._nodes.get(block_id)
+        if node is None and page:
+            node = self._implicit_page(block_id)
+        if node is None or node.archived:
+            raise FakeError(404, _NOT_FOUND, f"Could not find block with ID: {block_id}.")
+        return node
+
+    def _live_children(self, block_id: str) -> List[str]:
+        node = self._nodes.get(block_id)
+        if node is None:
+            return []
+        return [c for c in node.children if not self._nodes[c].archived]
+
+    def _export(self, node: _Node, *, deep: bool = False) -> dict:
+        kids = self._live_children(node.id)
+        block = {"object": "block", "id": node.id, "type": node.type,
+                 node.type: dict(node.payload), "has_children": bool(kids),
+                 "archived": node.archived, "in_trash": node.archived,
+                 "parent": {"type": "block_id", "block_id": node.parent}}
+        if deep and kids:
+            block[node.type]["children"] = [self._export(self._nodes[c], deep=True)
+                                            for c in kids]
+        return block
+
+    def _page_object(self, node: _Node) -> dict:
+        title = node.payload.get("title", "")
+        return {"object": "page", "id": node.id, "archived": node.archived,
+                "parent": {"type": "page_id", "page_id": node.parent},
+                "properties": {"title": {"id": "title", "type": "title", "title": [
+                    {"type": "text", "text": {"content": title}, "plain_text": title}]}}}
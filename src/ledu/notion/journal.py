@@ -0,0 +1,238 @@
+"""
+journal.py
+==========
+
+Checkpoint journal for resumable uploads (`ledu FILE --resume`).
+
+An upload is a `RequestPlanner` plan run in order (or concurrently, see
+`execute_plan_async`).  With an `UploadJournal` passed to the executors,
+every request leaves two JSON lines in an append-only file:
+
+* `send`  — written (and fsynced) just before the request goes out,
+* `done`  — written after it succeeded, with the IDs of the blocks that
+  later requests attach children to.
+
+The first line is a header keyed by the source file and a hash of its
+content (plus the parent and the plan length); the last one, `finished`,
+marks a complete page.
+
+Resuming
+--------
+`UploadJournal.start(..., resume=True)` keeps a journal whose header
+matches the current source and plan.  The executors then skip every `done`
+request and restore the IDs it recorded, so the remaining requests append
+to the right parents.  A request with a `send` but no `done` may or may not
+have reached Notion; `reconcile` decides by counting its parent's children
+(known exactly from the plan) and, if it landed, takes the new block IDs
+from that listing — so no block is uploaded twice.
+
+To make that count exact from the first request on, a journaled upload
+creates its page **empty** and sends the page's first batch as an append
+(one extra request per page).  A crash during `pages.create` can leave at
+most an empty page behind.
+
+A journal whose source changed is never resumed (`JournalError`); without
+`resume` the file simply starts over.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+from typing import Dict, List, Sequence, Set
+
+from ledu.notion.planner import PAGE, PlannedRequest
+from ledu.utils.tree import get_children
+
+#: bump when the record layout changes
+_FORMAT = 1
+
+
+class JournalError(RuntimeError):
+    """The journal cannot be resumed (source changed, page edited meanwhile)."""
+
+
+def content_hash(markdown: str) -> str:
+    """Digest identifying one version of a source document."""
+    return hashlib.blake2b(markdown.encode("utf8"), digest_size=16).hexdigest()
+
+
+def default_journal_path(source: str | os.PathLike,
+                         directory: str | os.PathLike) -> pathlib.Path:
+    """Journal location for a Markdown *source* file inside *directory*."""
+    source = pathlib.Path(source)
+    key = hashlib.blake2b(str(source.resolve()).encode(), digest_size=4).hexdigest()
+    return pathlib.Path(directory) / f"{source.stem}-{key}.jsonl"
+
+
+class UploadJournal:
+    """
+    Append-only JSONL record of one page upload.
+
+    Attributes
+    ----------
+    header : dict | None
+        First record (source, hash, parent, title, plan length).
+    page : str | None
+        ID of the page being filled.
+    done : dict[int, dict[int, str]]
+        Confirmed request index → IDs of its blocks, by plan ref.
+    pending : set[int]
+        Requests sent but never confirmed.
+    finished : bool
+        The upload completed.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = pathlib.Path(path)
+        self._fh = None
+        self._reset()
+        if self.path.exists():
+            self._load()
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def start(self, plan: Sequence[PlannedRequest], *, content_hash: str, parent: dict,
+              title: str | None = None, source: str = "", resume: bool = False) -> None:
+        """
+        Keep the recorded progress if *resume* and it belongs to this upload,
+        otherwise start a new journal.
+
+        Raises `JournalError` when resuming a journal written for other
+        content, another parent or another plan.
+        """
+        if not plan or plan[0].op != "create":
+            raise ValueError("only page-creating plans can be journaled")
+        key = {"hash": content_hash, "parent": parent, "requests": len(plan)}
+        if resume and self.header is not None:
+            if any(self.header.get(k) != v for k, v in key.items()):
+                raise JournalError(
+                    f"{source or self.path}: content changed since the interrupted "
+                    f"upload to page {self.page}; upload without --resume to start over")
+            return
+        self._reset()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.path, "w", encoding="utf8")
+        self.header = {"event": "start", "format": _FORMAT, "source": source,
+                       "title": title, **key}
+        self._write(self.header)
+
+    def reconcile(self, client, plan: Sequence[PlannedRequest]) -> None:
+        """Settle every `pending` request by listing its parent's children."""
+        inline: Dict[int, int] = {PAGE: 0}  # children created with each parent
+        for req in plan:
+            for block, ref in zip(req.blocks, req.refs):
+                if ref is not None:
+                    inline[ref] = len(get_children(block))
+        ids = self.ids()
+        for index in sorted(self.pending):
+            req = plan[index]
+            expected = inline[req.parent] + sum(
+                len(plan[i].blocks) for i in self.done if plan[i].parent == req.parent)
+            children = _list_all(client, ids[req.parent])
+            if len(children) == expected + len(req.blocks):  # it landed
+                self.completed(req, [{"id": c} for c in children[expected:]])
+                ids.update(self.done[index])
+            elif len(children) == expected:
+                self.pending.discard(index)
+            else:
+                raise JournalError(
+                    f"block {ids[req.parent]} has {len(children)} children, expected "
+                    f"{expected} or {expected + len(req.blocks)}; was the page edited?")
+
+    def ids(self) -> Dict[int, str]:
+        """Plan ref → block ID for everything recorded so far (page included)."""
+        ids: Dict[int, str] = {PAGE: self.page} if self.page else {}
+        for refs in self.done.values():
+            ids.update(refs)
+        return ids
+
+    # -----------------------  Executor hooks  ------------------------- #
+
+    def started(self, page_id: str) -> None:
+        self.page = page_id
+        self._write({"event": "page", "id": page_id}, sync=True)
+
+    def sending(self, req: PlannedRequest) -> None:
+        self.pending.add(req.index)
+        self._write({"event": "send", "index": req.index}, sync=True)
+
+    def completed(self, req: PlannedRequest, results: List[dict]) -> None:
+        refs = {ref: r["id"] for ref, r in zip(req.refs, results) if ref is not None}
+        self.pending.discard(req.index)
+        self.done[req.index] = refs
+        self._write({"event": "done", "index": req.index,
+                     "refs": {str(k): v for k, v in refs.items()}}, sync=True)
+
+    def finish(self, page_id: str) -> None:
+        self.finished = True
+        self._write({"event": "finished", "page": page_id}, sync=True)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self) -> "UploadJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _reset(self) -> None:
+        self.close()
+        self.header: dict | None = None
+        self.page: str | None = None
+        self.done: Dict[int, Dict[int, str]] = {}
+        self.pending: Set[int] = set()
+        self.finished = False
+
+    def _load(self) -> None:
+        with open(self.path, encoding="utf8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:  # torn last line of a crashed run
+                    continue
+                event = record.get("event")
+                if event == "start":
+                    if record.get("format") != _FORMAT:
+                        return self._reset()
+                    self.header = record
+                elif event == "page":
+                    self.page = record["id"]
+                elif event == "send":
+                    self.pending.add(record["index"])
+                elif event == "done":
+                    self.pending.discard(record["index"])
+                    self.done[record["index"]] = {int(k): v
+                                                  for k, v in record["refs"].items()}
+                elif event == "finished":
+                    self.finished = True
+
+    def _write(self, record: dict, *, sync: bool = False) -> None:
+        if self._fh is None:
+            self._fh = open(self.path, "a", encoding="utf8")
+        self._fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._fh.flush()
+        if sync:
+            os.fsync(self._fh.fileno())
+
+
+def _list_all(client, block_id: str) -> List[str]:
+    """IDs of every live child of *block_id*, in order."""
+    ids: List[str] = []
+    cursor = None
+    while True:
+        listing = client.list_children(block_id, start_cursor=cursor)
+        ids.extend(b["id"] for b in listing["results"])
+        cursor = listing.get("next_cursor")
+        if not listing.get("has_more") or not cursor:
+            return ids
@@ -0,0 +1,189 @@
+"""
+planner.py
+==========
+
+Packs a block tree into the smallest ordered list of API requests.
+
+Notion limits per request
+-------------------------
+* at most **100** blocks in any `children` array,
+* at most **two levels** of nesting (children + grandchildren),
+* at most **1000** blocks in total.
+
+Algorithm
+---------
+Breadth-first over parents (the page first):
+
+1. A parent's children are packed greedily into chunks of ≤100 top-level /
+   ≤1000 total blocks.  The page's first chunk is the `pages.create` call,
+   every other chunk a `blocks.children.append`.
+2. A child whose own children are all leaves travels *inline* with them
+   (up to the limits above).  Otherwise the child is sent without its
+   children and those are deferred to a later append on the child's ID.
+3. Blocks whose IDs are needed later get a *ref* (small int).
+4. `LazyChildren` (e.g. 50k table rows) are all leaves: they are cut into
+   lazy ≤100-block slices without building a single row dict.  Each request
+   records the ref of its parent, the request that produces that ref, and
+   the previous request on the same parent (sibling order).
+
+Executing the plan front to back therefore always has every parent ID in
+hand; an async executor can run requests whose dependencies are done.
+"""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Literal, Sequence, Tuple
+
+from ledu.utils.tree import LazyChildren, get_children, with_children, without_children
+from ledu.utils.typing import JSONDict
+
+#: Notion API hard limits.
+MAX_CHILDREN: int = 100
+MAX_BLOCKS: int = 1000
+
+#: Ref of the root parent: the page created by the first request, or the
+#: existing block/page an append-only plan attaches to.
+PAGE: int = 0
+
+
+@dataclass
+class PlannedRequest:
+    """
+    One API call of a plan.
+
+    Attributes
+    ----------
+    index : int
+        Position inside the plan.
+    op : {"create", "append"}
+        `pages.create` or `blocks.children.append`.
+    parent : int
+        Ref of the block/page the blocks are attached to.
+    blocks : list[JSONDict]
+        Request payload (`children`), deferred grandchildren stripped (a
+        lazy slice when the children are `LazyChildren`).
+    refs : list[int | None]
+        Ref assigned to each top-level block (None when its ID is not needed).
+    sources : list[JSONDict]
+        The original (unstripped) tree node behind each entry of *blocks*.
+    depends_on : int | None
+        Index of the request that yields the ID of *parent*.
+    after : int | None
+        Index of the previous request appending to the same *parent*.
+    """
+    index: int
+    op: Literal["create", "append"]
+    parent: int
+    blocks: List[JSONDict] = field(default_factory=list)
+    refs: List[int | None] = field(default_factory=list)
+    sources: List[JSONDict] = field(default_factory=list, repr=False)
+    depends_on: int | None = None
+    after: int | None = None
+    size: int = 0
+
+    @property
+    def needs_ids(self) -> bool:
+        """True if later requests depend on IDs returned by this one."""
+        return any(ref is not None for ref in self.refs)
+
+
+class RequestPlanner:
+    """Turn a block tree into an ordered list of `PlannedRequest`s."""
+
+    def __init__(self, *, max_children: int = MAX_CHILDREN,
+                 max_blocks: int = MAX_BLOCKS) -> None:
+        self.max_children = max_children
+        self.max_blocks = max_blocks
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def plan(self, blocks: Sequence[JSONDict], *,
+             create_page: bool = True) -> List[PlannedRequest]:
+        """
+        Plan page creation + all follow-up appends for *blocks*.
+
+        With `create_page=False` the first request is an append to an
+        existing parent instead of `pages.create`.
+        """
+        plan: List[PlannedRequest] = []
+        self._create_page = create_page
+        self._next_ref = PAGE + 1
+        pending: Deque[Tuple[int, Sequence[JSONDict], int | None]] = deque()
+        pending.append((PAGE, blocks, None))
+
+        while pending:
+            parent, children, producer = pending.popleft()
+            self._pack(plan, pending, parent, children, producer)
+        return plan
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _new_request(self, plan: List[PlannedRequest], parent: int,
+                     producer: int | None, previous: int | None) -> PlannedRequest:
+        op = "create" if not plan and self._create_page else "append"
+        req = PlannedRequest(len(plan), op, parent,
+                             depends_on=producer, after=previous)
+        plan.append(req)
+        return req
+
+    def _leaf_prefix(self, kids: Sequence[JSONDict]) -> int:
+        """Number of leading *kids* that have no children themselves."""
+        limit = min(len(kids), self.max_children)
+        if isinstance(kids, LazyChildren):
+            return limit
+        for i in range(limit):
+            if get_children(kids[i]):
+                return i
+        return limit
+
+    def _pack(self, plan: List[PlannedRequest], pending: Deque,
+              parent: int, children: Sequence[JSONDict],
+              producer: int | None) -> None:
+        if isinstance(children, LazyChildren):
+            return self._pack_lazy(plan, parent, children, producer)
+        req = self._new_request(plan, parent, producer, None)
+
+        for child in children:
+            kids = get_children(child)
+            inline = self._leaf_prefix(kids)
+            full = 1 + inline
+            room = self.max_blocks - req.size
+            if len(req.blocks) >= self.max_children or room < 1 or (
+                full > room and full <= self.max_blocks and req.blocks
+            ):
+                req = self._new_request(plan, parent, producer, req.index)
+                room = self.max_blocks
+            inline = min(inline, room - 1)
+
+            req.sources.append(child)
+            if not kids:
+                req.blocks.append(child)
+                req.refs.append(None)
+            else:
+                payload = with_children(child, kids[:inline]) if inline \
+                    else without_children(child)
+                req.blocks.append(payload)
+                if inline < len(kids):
+                    ref = self._next_ref
+                    self._next_ref += 1
+                    req.refs.append(ref)
+                    pending.append((ref, kids[inline:], req.index))
+                else:
+                    req.refs.append(None)
+            req.size += 1 + inline
+
+    def _pack_lazy(self, plan: List[PlannedRequest], parent: int,
+                   children: LazyChildren, producer: int | None) -> None:
+        step = min(self.max_children, self.max_blocks)
+        previous = None
+        for start in range(0, len(children), step):
+            req = self._new_request(plan, parent, producer, previous)
+            req.blocks = req.sources = children[start:start + step]
+            req.refs = [None] * len(req.blocks)
+            req.size = len(req.blocks)
+            previous = req.index
@@ -0,0 +1,178 @@
+"""
+ratelimit.py
+============
+
+Throttling & retry primitives used by `NotionClient`.
+
+Notion quirks
+-------------
+* The public API allows an *average* of ~3 requests/second per integration;
+  short bursts above that are tolerated, sustained ones answer **429**.
+* A 429 carries a `Retry-After` header (seconds) — always honour it.
+* 5xx / time-outs may or may not have been applied server-side, so only
+  **idempotent** calls (retrieve, list, update, delete) are retried on them.
+  `pages.create` and `blocks.children.append` are retried only when the
+  failure proves nothing was written (429, connection refused).
+
+Both primitives are transport-agnostic: `TokenBucket.reserve()` returns the
+number of seconds to wait, so the sync client can `time.sleep` and an async
+client can `await asyncio.sleep` on the very same bucket.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+import httpx
+from notion_client.errors import (
+    APIErrorCode,
+    APIResponseError,
+    HTTPResponseError,
+    RequestTimeoutError,
+)
+
+#: Notion's documented average request rate (requests / second).
+NOTION_RATE_LIMIT: float = 3.0
+
+#: HTTP statuses worth retrying for idempotent calls.
+RETRYABLE_STATUSES: frozenset[int] = frozenset({409, 429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second (sustained request rate).
+    capacity : float
+        Maximum burst size.
+    clock : callable
+        Monotonic time source; injectable for tests.
+    """
+
+    def __init__(
+        self,
+        rate: float = NOTION_RATE_LIMIT,
+        capacity: float | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._clock = clock
+        self._tokens = self.capacity
+        self._stamp = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def reserve(self) -> float:
+        """
+        Take one token and return how long the caller must wait (seconds).
+
+        The token is debited immediately (the balance may go negative), so
+        concurrent callers queue up behind each other fairly.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._stamp) * self.rate
+            )
+            self._stamp = now
+            self._tokens -= 1.0
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._blocked_until - now)
+
+    def try_acquire(self) -> float:
+        """
+        Take one token if available and return 0; otherwise take nothing and
+        return the seconds until one will be (server-side quota checks).
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._stamp) * self.rate
+            )
+            self._stamp = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(self, sleep: Callable[[float], None] = time.sleep) -> None:
+        """Blocking variant of `reserve()`."""
+        wait = self.reserve()
+        if wait > 0:
+            sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold *every* caller back for *seconds* (server said Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Jittered exponential back-off ("full jitter").
+
+    Attributes
+    ----------
+    max_attempts : int
+        Total tries including the first one.
+    base_delay, max_delay : float
+        Back-off window is `uniform(0, min(max_delay, base_delay * 2**n))`.
+    """
+    max_attempts: int = 6
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+
+    def is_retryable(self, exc: BaseException, *, idempotent: bool) -> bool:
+        """Decide whether *exc* may be retried for this kind of call."""
+        status = getattr(exc, "status", None)
+        if status == 429 or (
+            isinstance(exc, APIResponseError) and exc.code == APIErrorCode.RateLimited
+        ):
+            return True  # rejected before any work was done
+        if isinstance(exc, httpx.ConnectError):
+            return True  # request never reached the server
+        if not idempotent:
+            return False
+        if isinstance(exc, (RequestTimeoutError, httpx.TransportError)):
+            return True
+        if isinstance(exc, HTTPResponseError):
+            return status in RETRYABLE_STATUSES
+        return False
+
+    def delay(self, attempt: int, exc: BaseException | None = None) -> float:
+        """Seconds to wait before retry number *attempt* (0-based)."""
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            return retry_after
+        window = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return self.rng.uniform(0, window)
+
+
+def retry_after_seconds(exc: BaseException | None) -> float | None:
+    """Extract `Retry-After` (delta-seconds form) from an SDK error, if any."""
+    headers = getattr(exc, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None  # HTTP-date form; Notion does not use it
@@ -0,0 +1,273 @@
+"""
+render.py
+=========
+
+Notion block JSON → Markdown (the reverse of `PageBuilder`).
+
+`MarkdownRenderer.render(blocks)` takes blocks whose subtrees are already
+attached under `block[type]["children"]` (as `ledu.notion.export` fetches
+them) and returns Markdown text.  `iter_render` yields the same text one
+block at a time (separators and list numbering carried across), so the
+exporter can write each top-level block as soon as its subtree is complete.
+
+Coverage
+--------
+Text blocks, headings (toggleable headings too), bulleted / numbered / to-do
+lists with nesting, quote, callout, toggle (`<details>`), code, equation,
+divider, table, media & bookmarks (as links/images), columns and synced
+blocks (flattened), child pages (link via `page_link`).  Anything else
+becomes an HTML comment so nothing disappears silently.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from ledu.utils.typing import JSONDict
+
+_ESCAPE = str.maketrans({c: "\\" + c for c in "\\`*_[]<>$~|"})
+
+
+def rich_text_to_markdown(items: List[JSONDict]) -> str:
+    """Inline Markdown for a Notion `rich_text` array."""
+    out = []
+    for item in items or []:
+        ann = item.get("annotations") or {}
+        if item.get("type") == "equation":
+            out.append(f"${item['equation']['expression']}$")
+            continue
+        text = (item.get("text") or {}).get("content", item.get("plain_text", ""))
+        if not text:
+            continue
+        if ann.get("code"):
+            fence = "``" if "`" in text else "`"
+            piece = f"{fence}{text}{fence}"
+        else:
+            piece = text.translate(_ESCAPE)
+        # keep surrounding whitespace outside the markers (`** a**` is not bold)
+        core = piece.strip()
+        if core:
+            lead = piece[:len(piece) - len(piece.lstrip())]
+            trail = piece[len(piece.rstrip()):]
+            if ann.get("strikethrough"):
+                core = f"~~{core}~~"
+            if ann.get("italic"):
+                core = f"*{core}*"
+            if ann.get("bold"):
+                core = f"**{core}**"
+            link = (item.get("text") or {}).get("link") or {}
+            href = link.get("url") or item.get("href")
+            if href:
+                core = f"[{core}]({href})"
+            piece = lead + core + trail
+        out.append(piece)
+    return "".join(out)
+
+
+def _indent(text: str, prefix: str) -> str:
+    return "\n".join(prefix + line if line else line for line in text.split("\n"))
+
+
+class MarkdownRenderer:
+    """
+    Render Notion blocks to Markdown.
+
+    Parameters
+    ----------
+    page_link : callable, optional
+        `child_page` block → link target (e.g. a relative file name).  By
+        default child pages render as their bare title in bold.
+    """
+
+    def __init__(self, page_link: Callable[[JSONDict], str | None] | None = None) -> None:
+        self.page_link = page_link
+        self._handlers: Dict[str, Callable[[JSONDict, JSONDict], str]] = {
+            "paragraph": self._paragraph,
+            "heading_1": self._heading,
+            "heading_2": self._heading,
+            "heading_3": self._heading,
+            "bulleted_list_item": self._list_item,
+            "numbered_list_item": self._list_item,
+            "to_do": self._list_item,
+            "quote": self._quote,
+            "callout": self._quote,
+            "toggle": self._toggle,
+            "code": self._code,
+            "equation": self._equation,
+            "divider": lambda b, p: "---",
+            "table": self._table,
+            "image": self._media,
+            "video": self._media,
+            "audio": self._media,
+            "file": self._media,
+            "pdf": self._media,
+            "bookmark": self._media,
+            "embed": self._media,
+            "link_preview": self._media,
+            "column_list": self._transparent,
+            "column": self._transparent,
+            "synced_block": self._transparent,
+            "child_page": self._child_page,
+            "table_of_contents": lambda b, p: "[TOC]",
+        }
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def render(self, blocks: List[JSONDict]) -> str:
+        """Markdown for a sibling list (ends with a newline when non-empty)."""
+        return "".join(self.iter_render(blocks))
+
+    def iter_render(self, blocks: Iterable[JSONDict]) -> Iterator[str]:
+        """
+        Yield Markdown chunks for *blocks* one block at a time.
+
+        The chunks concatenate to exactly `render(list(blocks))`.
+        """
+        stream = self.stream()
+        for block in blocks:
+            chunk = stream.feed(block)
+            if chunk:
+                yield chunk
+        tail = stream.close()
+        if tail:
+            yield tail
+
+    def stream(self) -> "RenderStream":
+        """Push-style renderer for sources that are not plain iterables."""
+        return RenderStream(self)
+
+    def render_block(self, block: JSONDict, number: int = 1) -> str:
+        """Markdown for one block (*number* = position in a numbered list)."""
+        btype = block.get("type", "")
+        handler = self._handlers.get(btype)
+        if handler is None:
+            return f"<!-- unsupported Notion block: {btype} -->"
+        return handler(block, {"number": number})
+
+    # ------------------------------------------------------------------ #
+    # Block handlers                                                     #
+    # ------------------------------------------------------------------ #
+
+    def _children(self, block: JSONDict) -> List[JSONDict]:
+        return block[block["type"]].get("children") or []
+
+    def _text(self, block: JSONDict) -> str:
+        return rich_text_to_markdown(block[block["type"]].get("rich_text"))
+
+    def _paragraph(self, block: JSONDict, ctx: JSONDict) -> str:
+        text = self._text(block)
+        children = self._children(block)
+        if children:  # indented children under a paragraph
+            text += "\n\n" + _indent(self.render(children).rstrip("\n"), "    ")
+        return text
+
+    def _heading(self, block: JSONDict, ctx: JSONDict) -> str:
+        level = int(block["type"][-1])
+        text = f"{'#' * level} {self._text(block)}"
+        children = self._children(block)
+        if children:  # toggleable heading
+            text += "\n\n" + self.render(children).rstrip("\n")
+        return text
+
+    def _list_item(self, block: JSONDict, ctx: JSONDict) -> str:
+        btype = block["type"]
+        if btype == "numbered_list_item":
+            marker = f"{ctx['number']}."
+        elif btype == "to_do":
+            marker = "- [x]" if block["to_do"].get("checked") else "- [ ]"
+        else:
+            marker = "-"
+        text = f"{marker} {self._text(block)}"
+        children = self._children(block)
+        if children:
+            width = len(marker.split(" ")[0]) + 1
+            text += "\n" + _indent(self.render(children).rstrip("\n"), " " * width)
+        return text
+
+    def _quote(self, block: JSONDict, ctx: JSONDict) -> str:
+        body = self._text(block)
+        if block["type"] == "callout":
+            icon = (block["callout"].get("icon") or {}).get("emoji")
+            body = f"[!NOTE]{' ' + icon if icon else ''}\n{body}"
+        children = self._children(block)
+        if children:
+            body += "\n\n" + self.render(children).rstrip("\n")
+        return _indent(body, "> ").replace("\n\n", "\n>\n")
+
+    def _toggle(self, block: JSONDict, ctx: JSONDict) -> str:
+        inner = self.render(self._children(block)).rstrip("\n")
+        return (f"<details>\n<summary>{self._text(block)}</summary>\n\n"
+                f"{inner}\n\n</details>")
+
+    def _code(self, block: JSONDict, ctx: JSONDict) -> str:
+        code = "".join(t.get("text", {}).get("content", t.get("plain_text", ""))
+                       for t in block["code"].get("rich_text") or [])
+        lang = block["code"].get("language") or ""
+        fence = "````" if "```" in code else "```"
+        return f"{fence}{'' if lang == 'plain text' else lang}\n{code}\n{fence}"
+
+    def _equation(self, block: JSONDict, ctx: JSONDict) -> str:
+        return f"$$\n{block['equation']['expression']}\n$$"
+
+    def _table(self, block: JSONDict, ctx: JSONDict) -> str:
+        rows = [[rich_text_to_markdown(cell).replace("\n", " ")
+                 for cell in row["table_row"]["cells"]]
+                for row in self._children(block) if row.get("type") == "table_row"]
+        if not rows:
+            return ""
+        width = max(len(r) for r in rows)
+        rows = [r + [""] * (width - len(r)) for r in rows]
+        lines = ["| " + " | ".join(rows[0]) + " |", "|" + "---|" * width]
+        lines += ["| " + " | ".join(r) + " |" for r in rows[1:]]
+        return "\n".join(lines)
+
+    def _media(self, block: JSONDict, ctx: JSONDict) -> str:
+        btype = block["type"]
+        data = block[btype]
+        url = data.get("url") or (data.get(data.get("type", ""), {}) or {}).get("url", "")
+        caption = rich_text_to_markdown(data.get("caption")) or btype
+        if btype == "image":
+            return f"![{caption}]({url})"
+        return f"[{caption}]({url})"
+
+    def _transparent(self, block: JSONDict, ctx: JSONDict) -> str:
+        return self.render(self._children(block)).rstrip("\n")
+
+    def _child_page(self, block: JSONDict, ctx: JSONDict) -> str:
+        title = block["child_page"].get("title") or "Untitled"
+        target = self.page_link(block) if self.page_link else None
+        return f"[{title}]({target})" if target else f"**{title}**"
+
+
+_LIST_TYPES = frozenset({"bulleted_list_item", "numbered_list_item", "to_do"})
+
+
+class RenderStream:
+    """
+    Sibling-list renderer fed one block at a time.
+
+    Carries what `render` needs across blocks: list numbering and whether
+    the separator is a blank line or (inside one list) a single newline.
+    """
+    __slots__ = ("renderer", "prev", "number")
+
+    def __init__(self, renderer: MarkdownRenderer) -> None:
+        self.renderer = renderer
+        self.prev: str | None = None
+        self.number = 0
+
+    def feed(self, block: JSONDict) -> str:
+        btype = block.get("type")
+        self.number = self.number + 1 if btype == "numbered_list_item" else 0
+        part = self.renderer.render_block(block, self.number)
+        if not part:
+            return ""
+        if self.prev is not None:
+            tight = btype == self.prev and btype in _LIST_TYPES
+            part = ("\n" if tight else "\n\n") + part
+        self.prev = btype
+        return part
+
+    def close(self) -> str:
+        return "\n" if self.prev is not None else ""
@@ -0,0 +1,233 @@
+"""
+session.py
+==========
+
+Long-lived HTTP connection pools shared by every Notion client in a process.
+
+Why
+---
+`notion_client.Client` creates its own `httpx.Client` unless given one, so
+a fresh `NotionClient` per page meant a fresh connection pool — and a TCP +
+TLS handshake — per page.  `SessionPool` keeps one pool for the process
+instead:
+
+* one `httpx.HTTPTransport` (the connection pool itself) with keep-alive,
+  tunable limits and optional HTTP/2;
+* one `httpx.AsyncHTTPTransport` per event loop (async pools are bound to
+  the loop they were created on);
+* one `TokenBucket` per integration token — Notion's rate limit applies to
+  the integration, not to a client object.
+
+`notion_client` writes the base URL and `Authorization` header onto the
+`httpx.Client` it is given, so clients never share that object: each gets
+a thin `httpx.Client` of its own around the shared transport.
+
+Proxies
+-------
+httpx ignores the environment's proxy settings once a client is given a
+`transport=`, so the pool applies them itself, per URL the way a plain
+`httpx.Client()` does: one direct transport plus one per proxy, mounted on
+each client by `environment_proxies()` patterns (`HTTPS_PROXY`,
+`ALL_PROXY`, … and `NO_PROXY` exclusions).
+
+`NotionClient` / `AsyncNotionClient` use `shared_pool()` unless passed an
+explicit `client=`; `configure_pool` swaps in new limits.
+
+HTTP/2 needs the optional `h2` package (`pip install httpx[http2]`).
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import ipaddress
+import threading
+import urllib.request
+import weakref
+from dataclasses import dataclass
+from typing import Dict
+
+import httpx
+
+from ledu.notion.ratelimit import TokenBucket
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """
+    Connection pool settings.
+
+    Attributes
+    ----------
+    max_connections : int
+        Open connections per pool (in use + idle).
+    max_keepalive_connections : int
+        Idle connections kept for reuse.
+    keepalive_expiry : float
+        Seconds an idle connection is kept open.
+    http2 : bool
+        Negotiate HTTP/2 (one multiplexed connection per host).
+    proxy : str, optional
+        Proxy URL for every request; defaults to the environment's proxy
+        settings (`environment_proxies`).
+    """
+    max_connections: int = 16
+    max_keepalive_connections: int = 16
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+    proxy: str | None = None
+
+    @classmethod
+    def from_settings(cls) -> "PoolConfig":
+        from ledu.config import settings
+        return cls(max_connections=settings.http_max_connections,
+                   max_keepalive_connections=settings.http_max_connections,
+                   keepalive_expiry=settings.http_keepalive_expiry,
+                   http2=settings.http2)
+
+    def transport_kwargs(self, proxy: str | None = None) -> dict:
+        return {
+            "limits": httpx.Limits(max_connections=self.max_connections,
+                                   max_keepalive_connections=self.max_keepalive_connections,
+                                   keepalive_expiry=self.keepalive_expiry),
+            "http2": self.http2,
+            "proxy": proxy,
+        }
+
+    def proxy_mounts(self) -> Dict[str, str | None]:
+        """URL pattern → proxy URL (`None`: direct) for this pool's clients."""
+        return {"all://": self.proxy} if self.proxy else environment_proxies()
+
+
+def environment_proxies() -> Dict[str, str | None]:
+    """
+    httpx mount pattern → proxy URL (`None`: direct) from the environment,
+    as `httpx.Client(trust_env=True)` reads it.
+    """
+    proxies = urllib.request.getproxies()
+    mounts: Dict[str, str | None] = {
+        f"{scheme}://": proxies[scheme] for scheme in ("http", "https", "all")
+        if proxies.get(scheme)}
+    for host in (h.strip() for h in proxies.get("no", "").split(",")):
+        if not host:
+            continue
+        if host == "*":
+            return {}
+        if "://" in host:
+            mounts[host] = None
+        elif host.lower() == "localhost" or _is_ip(host):
+            mounts[f"all://[{host}]" if ":" in host else f"all://{host}"] = None
+        else:
+            mounts[f"all://*{host}"] = None  # the domain and its subdomains
+    return mounts
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class SessionPool:
+    """
+    Shared transports and per-token rate limiters.
+
+    Thread-safe; transports are created on first use.
+    """
+
+    def __init__(self, config: PoolConfig | None = None) -> None:
+        self.config = config or PoolConfig()
+        self._proxies = self.config.proxy_mounts()
+        self._transports: Dict[str | None, httpx.HTTPTransport] = {}  # proxy → pool
+        self._async: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()  # loop → pools
+        self._limiters: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def transport(self, proxy: str | None = None) -> httpx.HTTPTransport:
+        """The process-wide sync connection pool (through *proxy*, or direct)."""
+        with self._lock:
+            transport = self._transports.get(proxy)
+            if transport is None:
+                transport = self._transports[proxy] = httpx.HTTPTransport(
+                    **self.config.transport_kwargs(proxy))
+            return transport
+
+    def async_transport(self, proxy: str | None = None) -> httpx.AsyncHTTPTransport:
+        """The connection pool for the running event loop (through *proxy*)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pools = self._async.setdefault(loop, {})
+            transport = pools.get(proxy)
+            if transport is None:
+                transport = pools[proxy] = httpx.AsyncHTTPTransport(
+                    **self.config.transport_kwargs(proxy))
+            return transport
+
+    def http_client(self) -> httpx.Client:
+        """A fresh `httpx.Client` over the shared pools (do not close it)."""
+        return httpx.Client(transport=self.transport(), mounts={
+            pattern: proxy and self.transport(proxy)
+            for pattern, proxy in self._proxies.items()})
+
+    def async_http_client(self) -> httpx.AsyncClient:
+        """A fresh `httpx.AsyncClient` over this loop's shared pools."""
+        return httpx.AsyncClient(transport=self.async_transport(), mounts={
+            pattern: proxy and self.async_transport(proxy)
+            for pattern, proxy in self._proxies.items()})
+
+    def rate_limiter(self, token: str) -> TokenBucket:
+        """The `TokenBucket` shared by every client of integration *token*."""
+        key = hashlib.sha256(token.encode()).hexdigest()  # never hold the secret itself
+        with self._lock:
+            bucket = self._limiters.get(key)
+            if bucket is None:
+                bucket = self._limiters[key] = TokenBucket()
+            return bucket
+
+    def close(self) -> None:
+        """Close the sync pools (a later request opens new ones)."""
+        with self._lock:
+            transports, self._transports = self._transports, {}
+        for transport in transports.values():
+            transport.close()
+
+    async def aclose(self) -> None:
+        """Close the running loop's async pools."""
+        with self._lock:
+            pools = self._async.pop(asyncio.get_running_loop(), {})
+        for transport in pools.values():
+            await transport.aclose()
+
+
+_shared: SessionPool | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool() -> SessionPool:
+    """The process-wide `SessionPool` (built from `settings` on first use)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SessionPool(PoolConfig.from_settings())
+        return _shared
+
+
+def configure_pool(config: PoolConfig | None = None, **options) -> SessionPool:
+    """
+    Replace the shared pool, e.g. `configure_pool(http2=True)`.
+
+    Clients created earlier keep the previous pool; rate limiters carry
+    over, so old and new clients still share one budget per token.
+    """
+    global _shared
+    new = SessionPool(config or PoolConfig(**options))
+    with _shared_lock:
+        if _shared is not None:
+            new._limiters = _shared._limiters
+        _shared = new
+    return new
@@ -0,0 +1,292 @@
+"""
+sync.py
+=======
+
+Incremental page sync: patch an already-uploaded page instead of creating
+a new one.
+
+Manifest
+--------
+After every run a JSON manifest is written for the page.  It mirrors the
+uploaded block tree; each node stores the Notion block ID (when known),
+the block's own digest and its subtree digest (see `ledu.utils.tree`).
+IDs of blocks that were uploaded inline (grandchildren) are not returned
+by the API; they are stored as `null` and listed lazily the first time an
+edit needs them.
+
+Edit script
+-----------
+For every parent, old and new children are aligned on subtree digests with
+`difflib.SequenceMatcher`:
+
+* equal subtrees are kept untouched (zero calls);
+* a changed block of the same type is patched with `blocks.update` and its
+  children are diffed recursively;
+* anything else becomes `blocks.delete` + an insert after the preceding
+  surviving sibling (`blocks.children.append(after=...)`).
+
+Notion cannot insert *before* the first child, so blocks inserted at the
+head are appended after the first surviving sibling together with a fresh
+copy of that sibling, which is then deleted.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Dict, List, Sequence
+
+from ledu.notion.planner import RequestPlanner
+from ledu.notion.upload import execute_plan
+from ledu.utils.tree import DigestNode, digest_tree
+from ledu.utils.typing import JSONDict
+
+MANIFEST_VERSION = 1
+
+
+# ---------------------------------------------------------------------- #
+# Manifest                                                               #
+# ---------------------------------------------------------------------- #
+
+@dataclass
+class ManifestNode:
+    """One uploaded block as remembered by the manifest."""
+    id: str | None
+    own: str
+    tree: str
+    type: str
+    children: List["ManifestNode"] = field(default_factory=list)
+
+    def to_json(self) -> JSONDict:
+        data: JSONDict = {"id": self.id, "own": self.own, "tree": self.tree,
+                          "type": self.type}
+        if self.children:
+            data["children"] = [c.to_json() for c in self.children]
+        return data
+
+    @classmethod
+    def from_json(cls, data: JSONDict) -> "ManifestNode":
+        return cls(data["id"], data["own"], data["tree"], data["type"],
+                   [cls.from_json(c) for c in data.get("children", ())])
+
+
+@dataclass
+class Manifest:
+    """Local record of what a page looked like after the last sync."""
+    page_id: str
+    blocks: List[ManifestNode] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "Manifest | None":
+        """Read *path*; `None` if it does not exist yet."""
+        try:
+            data = json.loads(pathlib.Path(path).read_text(encoding="utf8"))
+        except FileNotFoundError:
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return cls(data["page_id"], [ManifestNode.from_json(b) for b in data["blocks"]])
+
+    def save(self, path: str | os.PathLike) -> None:
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps({
+            "version": MANIFEST_VERSION,
+            "page_id": self.page_id,
+            "blocks": [b.to_json() for b in self.blocks],
+        }, separators=(",", ":")), encoding="utf8")
+        os.replace(tmp, path)
+
+
+def default_manifest_path(source: str | os.PathLike,
+                          directory: str | os.PathLike) -> pathlib.Path:
+    """Manifest location for a Markdown *source* file inside *directory*."""
+    source = pathlib.Path(source)
+    key = hashlib.blake2b(str(source.resolve()).encode(), digest_size=4).hexdigest()
+    return pathlib.Path(directory) / f"{source.stem}-{key}.json"
+
+
+# ---------------------------------------------------------------------- #
+# Diff & patch                                                           #
+# ---------------------------------------------------------------------- #
+
+@dataclass
+class SyncReport:
+    """Number of API operations a sync performed, by kind."""
+    created: bool = False
+    updated: int = 0
+    deleted: int = 0
+    inserted: int = 0
+    listed: int = 0
+
+    @property
+    def calls(self) -> int:
+        return self.updated + self.deleted + self.inserted + self.listed
+
+
+class PageSync:
+    """Apply the minimal edit script between a manifest and new blocks."""
+
+    def __init__(self, client, planner: RequestPlanner | None = None) -> None:
+        self.client = client
+        self.planner = planner or RequestPlanner()
+        self.report = SyncReport()
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def create(self, parent: dict, blocks: Sequence[JSONDict], *,
+               title: str | None = None) -> Manifest:
+        """First upload: create the page and record every returned ID."""
+        nodes = digest_tree(blocks)
+        ids: Dict[int, str] = {}
+        page_id = execute_plan(self.client, self.planner.plan(blocks), parent,
+                               title=title, on_result=self._collector(ids))
+        self.report.created = True
+        return Manifest(page_id, _to_manifest(nodes, ids))
+
+    def update(self, manifest: Manifest, blocks: Sequence[JSONDict]) -> Manifest:
+        """Patch the page described by *manifest* so it matches *blocks*."""
+        children = self._level(manifest.page_id, manifest.blocks, digest_tree(blocks))
+        return Manifest(manifest.page_id, children)
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _collector(ids: Dict[int, str]):
+        """`on_result` hook mapping planned source blocks to returned IDs."""
+        def collect(req, results) -> None:
+            for source, result in zip(req.sources, results):
+                ids[id(source)] = result["id"]
+        return collect
+
+    def _level(self, parent_id: str, old: List[ManifestNode],
+               new: List[DigestNode]) -> List[ManifestNode]:
+        """Diff one children array and return the resulting manifest nodes."""
+        old = self._ensure_ids(parent_id, old)
+        out: List[ManifestNode] = []
+        pending: List[DigestNode] = []
+        matcher = SequenceMatcher(None, [o.tree for o in old], [n.tree for n in new],
+                                  autojunk=False)
+
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                for o, n in zip(old[i1:i2], new[j1:j2]):
+                    self._keep(parent_id, o, n, out, pending)
+            elif tag == "delete":
+                for o in old[i1:i2]:
+                    self._delete(o)
+            elif tag == "insert":
+                pending.extend(new[j1:j2])
+            else:  # replace: pair positionally, patch same-type blocks
+                olds, news = old[i1:i2], new[j1:j2]
+                for k in range(max(len(olds), len(news))):
+                    o = olds[k] if k < len(olds) else None
+                    n = news[k] if k < len(news) else None
+                    if o is not None and n is not None and o.type == n.block["type"]:
+                        self._keep(parent_id, o, n, out, pending)
+                        continue
+                    if o is not None:
+                        self._delete(o)
+                    if n is not None:
+                        pending.append(n)
+
+        if pending:
+            out.extend(self._insert(parent_id, out[-1].id if out else None, pending))
+        return out
+
+    def _keep(self, parent_id: str, old: ManifestNode, new: DigestNode,
+              out: List[ManifestNode], pending: List[DigestNode]) -> None:
+        """Keep *old* in place (patched to *new*), flushing queued inserts."""
+        if pending and not out:
+            # head insert: re-create *old* after the new blocks, drop original
+            out.extend(self._insert(parent_id, old.id, [*pending, new]))
+            pending.clear()
+            self._delete(old)
+            return
+        if pending:
+            out.extend(self._insert(parent_id, out[-1].id, pending))
+            pending.clear()
+
+        if old.own != new.own:
+            self.client.update_block(old.id, new.block)
+            self.report.updated += 1
+        children = old.children
+        if old.tree != new.tree:
+            children = self._level(old.id, old.children, new.children)
+        out.append(ManifestNode(old.id, new.own, new.tree, old.type, children))
+
+    def _delete(self, node: ManifestNode) -> None:
+        self.client.delete_block(node.id)
+        self.report.deleted += 1
+
+    def _insert(self, parent_id: str, after: str | None,
+                nodes: List[DigestNode]) -> List[ManifestNode]:
+        ids: Dict[int, str] = {}
+        plan = self.planner.plan([n.block for n in nodes], create_page=False)
+        execute_plan(self.client, plan, {"block_id": parent_id}, after=after,
+                     on_result=self._collector(ids))
+        self.report.inserted += len(plan)
+        return _to_manifest(nodes, ids)
+
+    def _ensure_ids(self, parent_id: str,
+                    nodes: List[ManifestNode]) -> List[ManifestNode]:
+        """Fill in IDs that were never returned by the API (inline uploads)."""
+        if all(n.id is not None for n in nodes):
+            return nodes
+        remote: List[str] = []
+        cursor = None
+        while True:
+            page = self.client.list_children(parent_id, start_cursor=cursor)
+            self.report.listed += 1
+            remote.extend(r["id"] for r in page["results"])
+            if not page.get("has_more"):
+                break
+            cursor = page["next_cursor"]
+        for node, block_id in zip(nodes, remote):
+            node.id = block_id
+        return nodes
+
+
+def _to_manifest(nodes: List[DigestNode], ids: Dict[int, str]) -> List[ManifestNode]:
+    return [ManifestNode(ids.get(id(n.block)), n.own, n.tree, n.block["type"],
+                         _to_manifest(n.children, ids)) for n in nodes]
+
+
+def sync_blocks(blocks: Sequence[JSONDict], manifest_path: str | os.PathLike, *,
+                parent_id: str | None = None, title: str | None = None,
+                client=None) -> SyncReport:
+    """
+    Create or patch the page recorded in *manifest_path* so it shows *blocks*.
+
+    The first run (no manifest yet) needs *parent_id* and creates the page.
+    """
+    if client is None:
+        from ledu.config import settings
+        from ledu.notion.client import NotionClient
+        client = NotionClient(settings.notion_api_token)
+
+    syncer = PageSync(client)
+    manifest = Manifest.load(manifest_path)
+    if manifest is None:
+        if parent_id is None:
+            raise ValueError("first sync of a page needs parent_id")
+        manifest = syncer.create({"page_id": parent_id}, blocks, title=title)
+    else:
+        manifest = syncer.update(manifest, blocks)
+    manifest.save(manifest_path)
+    return syncer.report
+
+
+def sync_markdown(markdown: str, manifest_path: str | os.PathLike, **kwargs) -> SyncReport:
+    """Convert *markdown* and `sync_blocks` the result."""
+    from ledu.builder.page_builder import PageBuilder
+
+    return sync_blocks(PageBuilder().convert(markdown), manifest_path, **kwargs)
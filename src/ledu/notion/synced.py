@@ -0,0 +1,304 @@
+"""
+synced.py
+=========
+
+Opt-in dedupe of repeated content (disclaimers, nav footers, shared
+"prerequisites" sections) through Notion **synced blocks**.
+
+Flow
+----
+`SyncedDeduper.apply(pages)` runs after conversion, on the block lists of a
+whole batch:
+
+1. every page is cut into *candidates* — top-level **sections** (a run
+   starting at a heading or divider, up to the next one) and single
+   top-level blocks with children — and each candidate is fingerprinted
+   with the Merkle digests of `ledu.utils.tree.digest_tree`;
+2. candidates of at least *min_blocks* blocks that occur *min_count* times
+   in the batch (or were hosted by an earlier run) are **shared**;
+3. each shared fingerprint is uploaded once as an original `synced_block`
+   (`synced_from: null`, the candidate as its children);
+4. every occurrence is replaced by a one-block reference
+   (`synced_from: {"block_id": ...}`).
+
+Originals live on one *library* page under the batch's parent rather than
+in whichever page happens to contain the first copy: references then never
+wait on another page's upload, so pages can still be uploaded in any order
+and concurrently.
+
+Registry
+--------
+`SyncedRegistry` persists fingerprint → original block ID (plus the library
+page ID) in a JSON file, so later runs reference existing originals instead
+of uploading them again.  Entries are checked against the library once per
+run; originals deleted in Notion are uploaded anew, and a library page the
+API reports gone (404) starts a new one.  Any other failure of that check
+skips dedupe for the run (`DedupeStats.error`) and leaves the registry as
+it is.
+
+Notion does not allow synced blocks inside synced blocks (nor child pages
+or databases in them); candidates containing one are never shared.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+from ledu.notion.client import is_not_found
+from ledu.notion.planner import PAGE, RequestPlanner
+from ledu.notion.upload import execute_plan
+from ledu.utils.tree import DigestNode, count_blocks, digest_tree, iter_tree
+from ledu.utils.typing import JSONDict
+
+#: bump when the registry file layout changes
+_FORMAT = 1
+
+#: smallest candidate (blocks, nested ones included) worth a synced block
+MIN_BLOCKS: int = 8
+
+_SECTION_STARTS = frozenset({"heading_1", "heading_2", "heading_3", "divider"})
+_NOT_SYNCABLE = frozenset({"synced_block", "child_page", "child_database"})
+
+
+# ---------------------------------------------------------------------- #
+# Fingerprints                                                           #
+# ---------------------------------------------------------------------- #
+
+def synced_reference(block_id: str) -> JSONDict:
+    """Reference block showing the original synced block *block_id*."""
+    return {"object": "block", "type": "synced_block",
+            "synced_block": {"synced_from": {"block_id": block_id}}}
+
+
+def synced_original(blocks: Sequence[JSONDict]) -> JSONDict:
+    """Original synced block holding *blocks*."""
+    return {"object": "block", "type": "synced_block",
+            "synced_block": {"synced_from": None, "children": list(blocks)}}
+
+
+def fingerprint(nodes: Sequence[DigestNode]) -> str:
+    """Digest of a run of sibling subtrees (order-sensitive)."""
+    data = "|".join(["run", *(n.tree for n in nodes)]).encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def candidates(blocks: Sequence[JSONDict], nodes: Sequence[DigestNode] | None = None, *,
+               min_blocks: int = MIN_BLOCKS) -> List[Tuple[int, int, str]]:
+    """
+    `(start, stop, fingerprint)` of every candidate in *blocks* (top level).
+
+    Sections come before the single blocks inside them.
+    """
+    nodes = digest_tree(blocks) if nodes is None else nodes
+    found: List[Tuple[int, int, str]] = []
+    starts = [i for i, b in enumerate(blocks) if i == 0 or b.get("type") in _SECTION_STARTS]
+    for start, stop in zip(starts, [*starts[1:], len(blocks)]):
+        section = blocks[start:stop]
+        if count_blocks(section) >= min_blocks and _syncable(section):
+            found.append((start, stop, fingerprint(nodes[start:stop])))
+        for i in range(start, stop):
+            if stop - start > 1 and nodes[i].children \
+                    and count_blocks(blocks[i:i + 1]) >= min_blocks \
+                    and _syncable(blocks[i:i + 1]):
+                found.append((i, i + 1, fingerprint(nodes[i:i + 1])))
+    return found
+
+
+def _syncable(blocks: Sequence[JSONDict]) -> bool:
+    return not any(b.get("type") in _NOT_SYNCABLE for b in iter_tree(blocks))
+
+
+# ---------------------------------------------------------------------- #
+# Registry                                                               #
+# ---------------------------------------------------------------------- #
+
+class SyncedRegistry:
+    """
+    Persistent fingerprint → original synced block ID map.
+
+    *path* `None` keeps it in memory.  `save` writes atomically.
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None) -> None:
+        self.path = pathlib.Path(path) if path else None
+        self.library: str | None = None
+        self.blocks: Dict[str, str] = {}
+        if self.path is not None and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf8"))
+            except (OSError, ValueError):
+                data = {}
+            if data.get("format") == _FORMAT:
+                self.library = data.get("library")
+                self.blocks = data.get("blocks", {})
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        text = json.dumps({"format": _FORMAT, "library": self.library,
+                           "blocks": self.blocks}, separators=(",", ":"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf8") as fh:
+                fh.write(text)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+# ---------------------------------------------------------------------- #
+# Dedupe                                                                 #
+# ---------------------------------------------------------------------- #
+
+@dataclass
+class DedupeStats:
+    """What one `SyncedDeduper.apply` did."""
+    originals: int = 0      # synced blocks uploaded this run
+    reused: int = 0         # shared fingerprints already hosted
+    references: int = 0     # occurrences replaced by a reference
+    blocks_saved: int = 0   # blocks not uploaded thanks to the references
+    error: str | None = None  # why dedupe was skipped (library not reachable)
+
+
+class SyncedDeduper:
+    """
+    Replace content repeated across a batch by synced-block references.
+
+    Parameters
+    ----------
+    client : NotionClient
+        Used to create the library page and the originals.
+    parent_id : str
+        Page the library page is created under (normally the batch parent).
+    registry : SyncedRegistry, optional
+        Persistent originals; in-memory when omitted.
+    min_blocks : int
+        Smallest candidate worth sharing.
+    min_count : int
+        Occurrences in the batch needed before a new original is uploaded.
+    """
+
+    def __init__(self, client, parent_id: str, registry: SyncedRegistry | None = None,
+                 *, min_blocks: int = MIN_BLOCKS, min_count: int = 2,
+                 title: str = "Synced blocks (ledu)") -> None:
+        self.client = client
+        self.parent_id = parent_id
+        self.registry = registry or SyncedRegistry()
+        self.min_blocks = min_blocks
+        self.min_count = min_count
+        self.title = title
+        self.stats = DedupeStats()
+        self._verified = False
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def apply(self, pages: Sequence[Sequence[JSONDict]]) -> List[List[JSONDict]]:
+        """Deduplicated copies of *pages* (top-level block lists, in batch order)."""
+        found = [candidates(blocks, min_blocks=self.min_blocks) for blocks in pages]
+        counts = Counter(fp for page in found for _, _, fp in page)
+        try:
+            hosted = self._hosted() if any(counts) else {}
+        except Exception as exc:  # library unreachable: no dedupe, registry untouched
+            self.stats.error = f"{type(exc).__name__}: {exc}"
+            return [list(blocks) for blocks in pages]
+        shared = {fp for fp, n in counts.items() if n >= self.min_count or fp in hosted}
+
+        # choose replacements left to right, sections before their blocks
+        chosen: List[List[Tuple[int, int, str]]] = []
+        first: Dict[str, Sequence[JSONDict]] = {}
+        for blocks, page in zip(pages, found):
+            picks, end = [], 0
+            for start, stop, fp in page:
+                if fp in shared and start >= end:
+                    picks.append((start, stop, fp))
+                    first.setdefault(fp, blocks[start:stop])
+                    end = stop
+            chosen.append(picks)
+
+        ids = {fp: hosted[fp] for fp in first if fp in hosted}
+        self.stats.reused += len(ids)
+        missing = [fp for fp in first if fp not in ids]
+        if missing:
+            ids.update(self._upload_originals({fp: first[fp] for fp in missing}))
+
+        out: List[List[JSONDict]] = []
+        for blocks, picks in zip(pages, chosen):
+            page, pos = [], 0
+            for start, stop, fp in picks:
+                page.extend(blocks[pos:start])
+                page.append(synced_reference(ids[fp]))
+                self.stats.references += 1
+                self.stats.blocks_saved += count_blocks(blocks[start:stop]) - 1
+                pos = stop
+            page.extend(blocks[pos:])
+            out.append(page)
+        return out
+
+    def close(self) -> None:
+        """Persist the registry."""
+        self.registry.save()
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _hosted(self) -> Dict[str, str]:
+        """Registry entries whose original is still live (checked once per run)."""
+        registry = self.registry
+        if not self._verified and registry.library and registry.blocks:
+            live = set()
+            cursor = None
+            try:
+                while True:
+                    listing = self.client.list_children(registry.library, start_cursor=cursor)
+                    live.update(b["id"] for b in listing["results"]
+                                if b.get("type") == "synced_block")
+                    cursor = listing.get("next_cursor")
+                    if not listing.get("has_more") or not cursor:
+                        break
+            except Exception as exc:
+                if not is_not_found(exc):
+                    raise
+                registry.library = None  # library page gone: start over
+            registry.blocks = {fp: bid for fp, bid in registry.blocks.items() if bid in live}
+        self._verified = True
+        return registry.blocks
+
+    def _upload_originals(self, runs: Dict[str, Sequence[JSONDict]]) -> Dict[str, str]:
+        registry = self.registry
+        if registry.library is None:
+            page = self.client.create_page({"page_id": self.parent_id}, [], title=self.title)
+            registry.library = page["id"]
+        created: List[str] = []
+
+        def collect(req, results: List[JSONDict]) -> None:
+            if req.parent == PAGE:
+                created.extend(r["id"] for r in results)
+
+        originals = [synced_original(blocks) for blocks in runs.values()]
+        execute_plan(self.client, RequestPlanner().plan(originals, create_page=False),
+                     {"block_id": registry.library}, on_result=collect)
+        ids = dict(zip(runs, created))
+        registry.blocks.update(ids)
+        self.stats.originals += len(ids)
+        return ids
+
+
+def open_deduper(client, parent_id: str, *, registry_path: str | os.PathLike | None = None,
+                 min_blocks: int | None = None) -> SyncedDeduper:
+    """`SyncedDeduper` with the configured registry file and threshold."""
+    from ledu.config import settings
+
+    registry = SyncedRegistry(registry_path or settings.synced_registry or None)
+    return SyncedDeduper(client, parent_id, registry,
+                         min_blocks=min_blocks or settings.synced_min_blocks)
@@ -3,31 +3,484 @@ Higher-level convenience functions for multi-step uploads.
 
 Example use-case
 ----------------
-`upload_markdown(md_str, parent_id=\"...\")` that internally calls PageBuilder
-and then NotionClient.create_page.
+`upload_markdown(md_str, parent_id=\"...\")` calls PageBuilder, packs the
+blocks with `RequestPlanner` and executes the plan through NotionClient.
 
-This stub is optional; flesh out once basic conversion works.
+Plan execution
+--------------
+Requests run strictly in plan order.  After each request the IDs of blocks
+that later requests attach to are recorded: `blocks.children.append`
+returns them directly, `pages.create` does not, so the page's first batch
+is listed once when (and only when) some of its blocks have deferred
+children.
+
+`execute_plan_async` runs the same plan on `AsyncNotionClient`: every
+request waits only for the request producing its parent ID and for the
+previous append on the same parent, so subtrees of different toggles /
+list items upload side by side while sibling order is kept.  A semaphore
+caps the number of requests in flight.
+
+Checkpoints
+-----------
+Both executors take an optional `UploadJournal` (`ledu.notion.journal`):
+each request is recorded before it is sent and once it succeeded, and
+requests a previous, interrupted run completed are skipped.
+
+Streaming upload
+----------------
+`upload_stream` consumes any iterable of top-level blocks (typically
+`PageBuilder.iter_convert`).  Blocks are cut into windows of ≤100 top-level
+blocks; each window is planned and sent as soon as it is full — the first
+one creates the page, later ones append to it.
+
+The whole document passes `ledu.notion.validate.preflight` before the first
+request — local media are uploaded only after it — so an invalid block near the end never leaves a half-uploaded page
+behind: with validation on, conversion runs to completion first and only
+the planning, lowering and sending are streamed.  With
+`validate="off"`, conversion runs in a background thread a few windows
+ahead, so network waits overlap with CPU work and memory stays bounded by
+the windows in flight.
+
+The converting uploads keep the builder's typed IR (`iter_convert_ir`,
+`ledu.blocks.ir`) all the way through planning; the client lowers each
+request's blocks to JSON only when that request is sent.
+
+Many pages
+----------
+`BatchUploader` takes (markdown, parent, title, base_dir) jobs and runs up
+to *concurrency* of them at once on worker threads, all through one client —
+hence one shared keep-alive connection pool and one rate limiter (see
+`ledu.notion.session`) — and one `AssetUploader` for their local media.  `upload` yields each job's result as soon as its
+page is complete.
 """
 from __future__ import annotations
 
-from typing import List
+import asyncio
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Tuple
 from ledu.builder.page_builder import PageBuilder
-from ledu.notion.client import NotionClient
+from ledu.notion.assets import AssetUploader, iter_local_media, open_uploader
+from ledu.notion.client import AsyncNotionClient, NotionClient
+from ledu.notion.planner import MAX_CHILDREN, PAGE, PlannedRequest, RequestPlanner
+from ledu.notion.validate import preflight
 from ledu.config import settings
 
+if TYPE_CHECKING:
+    from ledu.notion.journal import UploadJournal
+
+
+def execute_plan(client: NotionClient, plan: List[PlannedRequest],
+                 parent: dict, *, title: str | None = None,
+                 after: str | None = None,
+                 on_result: Callable[[PlannedRequest, List[dict]], None] | None = None,
+                 journal: "UploadJournal | None" = None) -> str:
+    """
+    Run *plan* sequentially and return the ID of the root parent.
+
+    Parameters
+    ----------
+    client : NotionClient
+        Transport to use (rate limiting & retry live there).
+    plan : list[PlannedRequest]
+        Output of `RequestPlanner.plan`.
+    parent : dict
+        Parent spec for the new page, e.g. `{"page_id": "..."}`; for
+        append-only plans `{"block_id": "..."}` of the existing parent.
+    after : str, optional
+        Append-only plans: insert the root-level blocks after this sibling
+        instead of at the end.
+    on_result : callable, optional
+        Called with every request and the top-level blocks it created.
+        Setting it also lists the `pages.create` batch so every result is
+        known.
+    journal : UploadJournal, optional
+        Checkpoint every request and skip those a previous run completed
+        (see `ledu.notion.journal`); the page is created empty first.
+    """
+    ids: Dict[int, str] = {}
+    if plan and plan[0].op == "append":
+        ids[PAGE] = parent.get("block_id") or parent["page_id"]
+    if journal is not None:
+        ids.update(journal.ids())
+        if PAGE not in ids:
+            ids[PAGE] = client.create_page(parent, [], title=title)["id"]
+            journal.started(ids[PAGE])
+    for req in plan:
+        if journal is not None:
+            if req.index in journal.done:
+                continue
+            journal.sending(req)
+        anchor = after if req.parent == PAGE else None
+        results = _send(client, req, ids, parent, title, anchor,
+                        want_all=on_result is not None)
+        if journal is not None:
+            journal.completed(req, results)
+        if anchor is not None and results:
+            after = results[-1]["id"]  # next root chunk follows this one
+        for ref, result in zip(req.refs, results):
+            if ref is not None:
+                ids[ref] = result["id"]
+        if on_result is not None:
+            on_result(req, results)
+    return ids[PAGE]
+
+
+def _send(client: NotionClient, req: PlannedRequest, ids: Dict[int, str],
+          parent: dict, title: str | None, after: str | None = None,
+          *, want_all: bool = False) -> List[dict]:
+    """Issue one planned request and return the created top-level blocks."""
+    if req.op == "create" and PAGE not in ids:
+        page = client.create_page(parent, req.blocks, title=title)
+        ids[PAGE] = page["id"]
+        if not (req.needs_ids or want_all) or not req.blocks:
+            return []
+        return client.list_children(page["id"], page_size=len(req.blocks))["results"]
+    return client.append_blocks(ids[req.parent], req.blocks, after=after)["results"]
+
+
+async def _send_async(client: AsyncNotionClient, req: PlannedRequest,
+                      ids: Dict[int, str], parent: dict,
+                      title: str | None) -> List[dict]:
+    """Async counterpart of `_send`."""
+    if req.op == "create" and PAGE not in ids:
+        page = await client.create_page(parent, req.blocks, title=title)
+        ids[PAGE] = page["id"]
+        if not req.needs_ids:
+            return []
+        listing = await client.list_children(page["id"], page_size=len(req.blocks))
+        return listing["results"]
+    return (await client.append_blocks(ids[req.parent], req.blocks))["results"]
+
+
+async def execute_plan_async(client: AsyncNotionClient, plan: List[PlannedRequest],
+                             parent: dict, *, title: str | None = None,
+                             concurrency: int | None = None,
+                             journal: "UploadJournal | None" = None) -> str:
+    """
+    Run *plan* concurrently and return the ID of the created page.
+
+    Parameters
+    ----------
+    concurrency : int, optional
+        Maximum requests in flight (defaults to `settings.upload_concurrency`).
+    journal : UploadJournal, optional
+        As for `execute_plan`.
+    """
+    ids: Dict[int, str] = {}
+    if plan and plan[0].op == "append":
+        ids[PAGE] = parent.get("block_id") or parent["page_id"]
+    if journal is not None:
+        ids.update(journal.ids())
+        if PAGE not in ids:
+            ids[PAGE] = (await client.create_page(parent, [], title=title))["id"]
+            journal.started(ids[PAGE])
+    done = [asyncio.Event() for _ in plan]
+    limit = asyncio.Semaphore(max(1, concurrency or settings.upload_concurrency))
+
+    async def run(req: PlannedRequest) -> None:
+        if journal is not None and req.index in journal.done:
+            done[req.index].set()
+            return
+        for dep in (req.depends_on, req.after):
+            if dep is not None:
+                await done[dep].wait()
+        async with limit:
+            if journal is not None:
+                journal.sending(req)
+            results = await _send_async(client, req, ids, parent, title)
+        if journal is not None:
+            journal.completed(req, results)
+        for ref, result in zip(req.refs, results):
+            if ref is not None:
+                ids[ref] = result["id"]
+        done[req.index].set()
+
+    async with asyncio.TaskGroup() as group:
+        for req in plan:
+            group.create_task(run(req))
+    return ids[PAGE]
+
+
+def upload_stream(client: NotionClient, blocks: Iterable[dict], parent: dict, *,
+                  title: str | None = None, window: int = MAX_CHILDREN,
+                  prefetch: int = 2, lines: List[int] | None = None,
+                  validate: str | None = None, base_dir: str | os.PathLike = ".",
+                  assets: AssetUploader | None = None) -> str:
+    """
+    Upload top-level *blocks* as they arrive and return the new page ID.
+
+    Parameters
+    ----------
+    window : int
+        Top-level blocks planned together (≤100 keeps one call per window).
+    prefetch : int
+        Windows converted ahead in a background thread; 0 disables the
+        thread and pulls from *blocks* inline.  Only used with validation
+        off: a validated document is converted before anything is sent.
+    lines : list[int], optional
+        Source line of each top-level block as the producer fills it in
+        (`PageBuilder.iter_convert_ir(..., lines=)`), for preflight errors.
+    validate : str, optional
+        Preflight mode (default `settings.validate_uploads`), see
+        `ledu.notion.validate.preflight`.
+    base_dir : path-like
+        Directory local media paths are relative to.
+    assets : AssetUploader, optional
+        Uploads local media (see `ledu.notion.assets`); one on *client* is
+        opened when the blocks hold any and none is given.
+    """
+    own: List[AssetUploader] = []
+    stop = threading.Event()
+
+    def resolve(chunk: List[dict]) -> List[dict]:
+        if next(iter_local_media(chunk), None) is None:
+            return chunk
+        if assets is None and not own:
+            own.append(open_uploader(client))
+        return (assets or own[0]).resolve(chunk, base_dir)
+
+    try:
+        mode = validate or settings.validate_uploads
+        if mode != "off":  # every block is checked before the first request
+            blocks = resolve(preflight(list(blocks), mode=mode, lines=lines,
+                                       local_media=True))
+            prefetch = 0
+        planner = RequestPlanner()
+        windows = _windows(blocks, window)
+        if prefetch > 0:
+            windows = _prefetch(windows, prefetch, stop)
+
+        page_id: str | None = None
+        for chunk in windows:
+            if mode == "off":
+                chunk = resolve(chunk)
+            if page_id is None:
+                page_id = execute_plan(client, planner.plan(chunk), parent, title=title)
+            else:
+                execute_plan(client, planner.plan(chunk, create_page=False),
+                             {"block_id": page_id})
+        if page_id is None:  # empty document still gets its page
+            page_id = execute_plan(client, planner.plan([]), parent, title=title)
+        return page_id
+    finally:
+        stop.set()  # releases the prefetch thread if we stopped early
+        for uploader in own:
+            uploader.close()
+
+
+def _windows(blocks: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(blocks)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _prefetch(items: Iterator[List[dict]], depth: int,
+              stop: threading.Event) -> Iterator[List[dict]]:
+    """
+    Run *items* in a daemon thread, buffering at most *depth* results.
+
+    The producer gives up (dropping *items*) once *stop* is set, so a
+    consumer that fails early does not leave it blocked on a full buffer.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    done = object()
+
+    def put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as exc:  # re-raised in the consumer
+            put(exc)
+        put(done)
+
+    threading.Thread(target=produce, name="ledu-prefetch", daemon=True).start()
+    while (item := buffer.get()) is not done:
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
 
-def upload_markdown(markdown: str, parent_id: str, *, title: str | None = None) -> str:
+def upload_markdown(markdown: str, parent_id: str, *, title: str | None = None,
+                    client: NotionClient | None = None,
+                    base_dir: str | os.PathLike = ".") -> str:
     """
     Render *markdown* and create a new Notion page.
 
+    Conversion is streamed into the uploader (see `upload_stream`); local
+    media are uploaded from *base_dir* first.
+
     Returns
     -------
     str
         ID of the newly-created page.
     """
-    blocks = PageBuilder().convert(markdown)
+    client = client or NotionClient(settings.notion_api_token)
+    lines: List[int] = []
+    return upload_stream(client, PageBuilder().iter_convert_ir(markdown, lines=lines),
+                         {"page_id": parent_id}, title=title, lines=lines,
+                         base_dir=base_dir)
+
+
+async def upload_markdown_async(markdown: str, parent_id: str, *,
+                                title: str | None = None,
+                                client: AsyncNotionClient | None = None,
+                                concurrency: int | None = None,
+                                base_dir: str | os.PathLike = ".",
+                                assets: AssetUploader | None = None) -> str:
+    """
+    Async variant of `upload_markdown` (parallel sibling subtrees).
+
+    Local media are uploaded from *base_dir* through *assets*, or a default
+    `open_uploader()` (file uploads are synchronous: they run in a thread).
+    """
+    builder, lines = PageBuilder(), []
+    blocks = preflight(builder.convert_ir(markdown, lines=lines), lines=lines,
+                       local_media=True)
+    if next(iter_local_media(blocks), None) is not None:
+        blocks = await asyncio.to_thread(_resolve_media, blocks, base_dir, assets)
+    plan = RequestPlanner().plan(blocks)
+
+    if client is not None:
+        return await execute_plan_async(client, plan, {"page_id": parent_id},
+                                        title=title, concurrency=concurrency)
+    client = AsyncNotionClient(settings.notion_api_token)
+    try:
+        return await execute_plan_async(client, plan, {"page_id": parent_id},
+                                        title=title, concurrency=concurrency)
+    finally:
+        await client.aclose()
+
+
+def _resolve_media(blocks: List[dict], base_dir: str | os.PathLike,
+                   assets: AssetUploader | None) -> List[dict]:
+    if assets is not None:
+        return assets.resolve(blocks, base_dir)
+    with open_uploader() as own:
+        return own.resolve(blocks, base_dir)
+
+
+# ---------------------------------------------------------------------- #
+# Many pages                                                             #
+# ---------------------------------------------------------------------- #
+
+@dataclass
+class UploadJob:
+    """
+    One page to create: Markdown source, parent page ID, title and the
+    directory its local media paths are relative to.
+    """
+    markdown: str
+    parent_id: str
+    title: str | None = None
+    base_dir: str | os.PathLike = "."
+
+
+@dataclass
+class UploadResult:
+    """Outcome of one `UploadJob`."""
+    job: UploadJob
+    page_id: str | None = None
+    seconds: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BatchUploader:
+    """
+    Upload many Markdown pages with bounded concurrency.
+
+    Parameters
+    ----------
+    client : NotionClient, optional
+        Shared by every job; a default client on the shared connection pool
+        when omitted.
+    concurrency : int, optional
+        Pages uploaded at once (defaults to `settings.upload_concurrency`).
+        All of them draw on the client's rate limiter.
+
+    Local media of every job go through one `AssetUploader` on the client,
+    so an image shared by several pages is uploaded once.
+
+    Use as a context manager, or call `close` when done.
+    """
+
+    def __init__(self, client: NotionClient | None = None, *,
+                 concurrency: int | None = None) -> None:
+        self.client = client or NotionClient(settings.notion_api_token)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, concurrency or settings.upload_concurrency),
+            thread_name_prefix="ledu-upload")
+        self.assets = open_uploader(self.client)
+        self._local = threading.local()  # one warm PageBuilder per worker
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def submit(self, markdown: str, parent_id: str, *, title: str | None = None,
+               base_dir: str | os.PathLike = ".") -> "Future[UploadResult]":
+        """Queue one page; the future resolves to its `UploadResult`."""
+        return self._pool.submit(self._run, UploadJob(markdown, parent_id, title, base_dir))
+
+    def upload(self, jobs: Iterable[UploadJob | Tuple[str, ...]]) -> Iterator[UploadResult]:
+        """
+        Upload *jobs* (`UploadJob`s or `(markdown, parent_id[, title[,
+        base_dir]])` tuples) and yield their results in completion order.
+
+        A failed job is reported in its result (`error`), never raised.
+        """
+        futures = [self._pool.submit(self._run, job if isinstance(job, UploadJob)
+                                     else UploadJob(*job)) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def close(self) -> None:
+        """Wait for queued jobs and stop the workers."""
+        self._pool.shutdown(wait=True)
+        self.assets.close()
+
+    def __enter__(self) -> "BatchUploader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
-    client = NotionClient(settings.notion_api_token)
-    page = client.create_page({"page_id": parent_id}, blocks)
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
 
-    return page["id"]
+    def _run(self, job: UploadJob) -> UploadResult:
+        builder = getattr(self._local, "builder", None)
+        if builder is None:
+            builder = self._local.builder = PageBuilder()
+        start = time.perf_counter()
+        try:
+            lines: List[int] = []
+            page_id = upload_stream(self.client,
+                                    builder.iter_convert_ir(job.markdown, lines=lines),
+                                    {"page_id": job.parent_id}, title=job.title,
+                                    prefetch=0, lines=lines, base_dir=job.base_dir,
+                                    assets=self.assets)
+        except Exception as exc:
+            return UploadResult(job, seconds=time.perf_counter() - start,
+                                error=f"{type(exc).__name__}: {exc}")
+        return UploadResult(job, page_id, time.perf_counter() - start)
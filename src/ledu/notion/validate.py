@@ -0,0 +1,446 @@
+"""
+validate.py
+===========
+
+Local preflight check of a block tree against the Notion API's limits, run
+before the first request of an upload so an invalid block is reported (or
+repaired) instead of being rejected after earlier batches were spent.
+
+What is checked
+---------------
+* `text.content` ≤ 2000 characters, ≤ 100 items per `rich_text` /
+  `caption` array, equation expressions ≤ 1000 characters;
+* `code.language` is one Notion supports;
+* URLs: media `external.url`, bookmark / embed `url` (http(s)) and
+  rich-text links, each ≤ 2000 characters;
+* children only on block types that can hold them, `table_row` cell counts
+  matching `table_width`, and — when `Limits.max_depth` is set — nesting
+  depth.  (Per-request nesting and batch sizes are the planner's job.)
+
+Everything happens in one walk over the tree; blocks are never copied
+unless a fix changes them, and typed IR blocks (`ledu.blocks.ir`) are
+lowered one at a time.  URL syntax is checked with pydantic `TypeAdapter`s
+compiled once on first use, results memoised per URL (a plain scheme check
+without pydantic).
+
+Fixing
+------
+`fix` repairs what can be repaired without losing content:
+
+* oversize runs are split into ≤ 2000-character runs with the same
+  annotations and link;
+* more than 100 rich-text items are first merged where adjacent runs share
+  formatting; paragraphs, quotes and code blocks still over the limit are
+  split into consecutive blocks of the same type;
+* unknown code languages map to their Notion name (`py` → `python`) or to
+  `plain text`; links with an invalid URL keep their text;
+* children of blocks that cannot hold any are moved right after them;
+  short table rows are padded with empty cells.
+
+Source lines
+------------
+Issues carry the index path of the block and, given the per-top-level-block
+`lines` from `PageBuilder.convert(..., lines=[])`, the Markdown line it came
+from (table rows are resolved to their own line).
+
+`preflight` is what the upload paths call: `settings.validate_uploads`
+selects "fix" (default), "check" or "off", and anything left unfixed raises
+`PreflightError` before any network call — asset uploads included: local
+media paths pass as pending assets (`local_media=True`) and are uploaded
+only once the whole document is valid.
+"""
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from ledu.blocks.ir import lower_block
+from ledu.blocks.media import MEDIA_TYPES, is_local_src
+from ledu.utils.typing import JSONDict
+
+
+@dataclass(frozen=True)
+class Limits:
+    """Notion API limits the preflight enforces."""
+    max_rich_text_items: int = 100
+    max_text_length: int = 2000
+    max_equation_length: int = 1000
+    max_url_length: int = 2000
+    max_depth: int | None = None  # document-wide nesting cap (None: unchecked)
+
+
+LIMITS = Limits()
+
+#: `code.language` values the API accepts
+LANGUAGES = frozenset({
+    "abap", "agda", "arduino", "ascii art", "assembly", "bash", "basic", "bnf", "c", "c#",
+    "c++", "clojure", "coffeescript", "coq", "css", "dart", "dhall", "diff", "docker",
+    "ebnf", "elixir", "elm", "erlang", "f#", "flow", "fortran", "gherkin", "glsl", "go",
+    "graphql", "groovy", "haskell", "hcl", "html", "idris", "java", "javascript", "json",
+    "julia", "kotlin", "latex", "less", "lisp", "livescript", "llvm ir", "lua", "makefile",
+    "markdown", "markup", "matlab", "mathematica", "mermaid", "nix", "notion formula",
+    "objective-c", "ocaml", "pascal", "perl", "php", "plain text", "powershell", "prolog",
+    "protobuf", "purescript", "python", "r", "racket", "reason", "ruby", "rust", "sass",
+    "scala", "scheme", "scss", "shell", "smalltalk", "solidity", "sql", "swift", "toml",
+    "typescript", "vb.net", "verilog", "vhdl", "visual basic", "webassembly", "xml", "yaml",
+    "java/c/c++/c#",
+})
+
+#: common fence info strings → Notion language names
+LANGUAGE_ALIASES: Dict[str, str] = {
+    "py": "python", "python3": "python", "js": "javascript", "jsx": "javascript",
+    "ts": "typescript", "tsx": "typescript", "sh": "shell", "zsh": "shell",
+    "console": "shell", "shell-session": "shell", "ps1": "powershell", "yml": "yaml",
+    "md": "markdown", "rb": "ruby", "rs": "rust", "kt": "kotlin", "cs": "c#",
+    "csharp": "c#", "cpp": "c++", "cxx": "c++", "h": "c", "hpp": "c++", "fs": "f#",
+    "fsharp": "f#", "golang": "go", "dockerfile": "docker", "tex": "latex",
+    "objc": "objective-c", "make": "makefile", "proto": "protobuf", "tf": "hcl",
+    "terraform": "hcl", "wasm": "webassembly", "vb": "visual basic", "text": "plain text",
+    "txt": "plain text", "plaintext": "plain text", "": "plain text",
+}
+
+#: block types whose payload may carry `children`
+_CONTAINERS = frozenset({
+    "paragraph", "bulleted_list_item", "numbered_list_item", "to_do", "toggle", "quote",
+    "callout", "synced_block", "template", "column", "column_list", "table",
+})
+#: block types whose `rich_text` may be split over several consecutive blocks
+_SPLITTABLE = frozenset({"paragraph", "quote", "code"})
+_URL_BLOCKS = frozenset({"bookmark", "embed", "link_preview"})
+
+
+@functools.lru_cache(maxsize=None)
+def _url_validators():
+    """(web, any) URL validators, compiled once on first use; None without pydantic."""
+    try:
+        from pydantic import AnyUrl, HttpUrl, TypeAdapter, ValidationError
+    except ImportError:  # optional dependency
+        return None
+    return TypeAdapter(HttpUrl), TypeAdapter(AnyUrl), ValidationError
+
+
+@functools.lru_cache(maxsize=4096)
+def _url_syntax_ok(url: str, web: bool) -> bool:
+    validators = _url_validators()
+    if validators is None:
+        parts = urlsplit(url)
+        return parts.scheme in ("http", "https") and bool(parts.netloc) if web \
+            else bool(parts.scheme) and bool(parts.netloc or parts.path)
+    web_url, any_url, error = validators
+    try:
+        (web_url if web else any_url).validate_python(url)
+    except error:
+        return False
+    return True
+
+
+def _url_ok(url: object, *, web: bool, limits: Limits) -> bool:
+    if not isinstance(url, str) or not url or len(url) > limits.max_url_length:
+        return False
+    return _url_syntax_ok(url, web)
+
+
+def fix_language(language: str) -> str:
+    """Notion language name for a fence info string (`plain text` if unknown)."""
+    language = (language or "").strip().lower()
+    if language in LANGUAGES:
+        return language
+    return LANGUAGE_ALIASES.get(language, "plain text")
+
+
+# ---------------------------------------------------------------------- #
+# Issues                                                                 #
+# ---------------------------------------------------------------------- #
+
+@dataclass
+class Issue:
+    """
+    One limit violation.
+
+    Attributes
+    ----------
+    path : tuple[int, ...]
+        Index of the block at each level, top level first.
+    code : str
+        Short identifier, e.g. `"text_too_long"`.
+    message : str
+        What is wrong, in the API's words where it has any.
+    line : int | None
+        1-based Markdown line, when source lines were given.
+    fixed : bool
+        Repaired by `fix`.
+    """
+    path: Tuple[int, ...]
+    code: str
+    message: str
+    line: int | None = None
+    fixed: bool = False
+
+    def __str__(self) -> str:
+        where = f"line {self.line}" if self.line is not None else \
+            "block " + ".".join(map(str, self.path))
+        return f"{where}: {self.message}{' (fixed)' if self.fixed else ''}"
+
+
+class PreflightError(ValueError):
+    """Blocks that would be rejected by the API; `.issues` lists why."""
+
+    def __init__(self, issues: Sequence[Issue]) -> None:
+        self.issues = list(issues)
+        shown = "\n  ".join(map(str, self.issues[:10]))
+        more = f"\n  … and {len(self.issues) - 10} more" if len(self.issues) > 10 else ""
+        super().__init__(f"{len(self.issues)} invalid block(s):\n  {shown}{more}")
+
+
+# ---------------------------------------------------------------------- #
+# Public API                                                             #
+# ---------------------------------------------------------------------- #
+
+def check(blocks: Sequence, *, lines: Sequence[int] | None = None,
+          limits: Limits = LIMITS, local_media: bool = False) -> List[Issue]:
+    """
+    Every limit violation in *blocks* (IR or dicts); nothing is changed.
+
+    *local_media* accepts local media paths as assets still to be uploaded
+    (`ledu.notion.assets`), so the check can run before any upload.
+    """
+    walker = _Walker(limits, False, lines, local_media)
+    walker.blocks(blocks, (), 1)
+    return walker.issues
+
+
+def fix(blocks: Sequence, *, lines: Sequence[int] | None = None,
+        limits: Limits = LIMITS, local_media: bool = False) -> Tuple[List, List[Issue]]:
+    """
+    *blocks* with every fixable violation repaired, plus all issues found
+    (`Issue.fixed` marks the repaired ones).  Unchanged blocks are returned
+    as they are.  *local_media* as for `check`.
+    """
+    walker = _Walker(limits, True, lines, local_media)
+    return list(walker.blocks(blocks, (), 1)), walker.issues
+
+
+def preflight(blocks: Sequence, *, mode: str | None = None,
+              lines: Sequence[int] | None = None, limits: Limits = LIMITS,
+              local_media: bool = False) -> List:
+    """
+    Validate *blocks* before an upload according to *mode* (default
+    `settings.validate_uploads`): "fix", "check" or "off".  Callers that
+    upload local media afterwards pass *local_media* (see `check`).
+
+    Returns the blocks to upload; raises `PreflightError` if anything
+    invalid is left.
+    """
+    if mode is None:
+        from ledu.config import settings
+        mode = settings.validate_uploads
+    if mode == "off":
+        return blocks
+    if mode == "check":
+        issues = check(blocks, lines=lines, limits=limits, local_media=local_media)
+    elif mode == "fix":
+        blocks, issues = fix(blocks, lines=lines, limits=limits, local_media=local_media)
+        issues = [i for i in issues if not i.fixed]
+    else:
+        raise ValueError(f"unknown validation mode {mode!r}")
+    if issues:
+        raise PreflightError(issues)
+    return blocks
+
+
+# ---------------------------------------------------------------------- #
+# Walk                                                                   #
+# ---------------------------------------------------------------------- #
+
+class _Walker:
+    """One validation pass; `blocks` returns the (possibly fixed) list."""
+
+    def __init__(self, limits: Limits, fixing: bool, lines: Sequence[int] | None,
+                 local_media: bool = False) -> None:
+        self.limits = limits
+        self.fixing = fixing
+        self.lines = lines
+        self.local_media = local_media
+        self.issues: List[Issue] = []
+
+    def issue(self, path: Tuple[int, ...], code: str, message: str, *,
+              fixable: bool = True, row: bool = False) -> None:
+        line = None
+        if self.lines is not None and path and path[0] < len(self.lines):
+            line = self.lines[path[0]]
+            if row and len(path) == 2:  # markdown table: header, delimiter, rows
+                line += path[1] + (path[1] > 0)
+        self.issues.append(Issue(path, code, message, line, fixable and self.fixing))
+
+    def blocks(self, blocks: Sequence, path: Tuple[int, ...], depth: int,
+               width: int | None = None) -> Sequence:
+        out = None
+        for i, block in enumerate(blocks):
+            fixed = self.block(block, (*path, i), depth, width)
+            if fixed is not None and out is None:
+                out = list(blocks[:i])
+            if out is not None:
+                out.extend([block] if fixed is None else fixed)
+        return blocks if out is None else out
+
+    def block(self, block, path: Tuple[int, ...], depth: int,
+              width: int | None) -> List | None:
+        """Replacement blocks for *block*, or None if it stays as it is."""
+        data = block if isinstance(block, dict) else lower_block(block)
+        btype = data.get("type")
+        payload = data.get(btype) if btype else None
+        if not isinstance(payload, dict):
+            self.issue(path, "invalid_block", f"block type {btype!r} is invalid.",
+                       fixable=False)
+            return None
+        limits = self.limits
+        edits: JSONDict = {}
+
+        for key in ("rich_text", "caption"):
+            items = payload.get(key)
+            if items:
+                fixed = self.rich_text(items, path)
+                if fixed is not None:
+                    edits[key] = items = fixed
+                if len(items) > limits.max_rich_text_items and not (
+                        key == "rich_text" and btype in _SPLITTABLE):
+                    self.issue(path, "too_many_rich_text",
+                               f"{key}.length should be ≤ `{limits.max_rich_text_items}`, "
+                               f"instead was `{len(items)}`.", fixable=False)
+
+        if btype == "code" and payload.get("language") not in LANGUAGES:
+            self.issue(path, "bad_language",
+                       f"code.language {payload.get('language')!r} is not supported.")
+            edits["language"] = fix_language(payload.get("language") or "")
+        elif btype == "equation":
+            self.equation(payload.get("expression") or "", path)
+        elif btype in MEDIA_TYPES and payload.get("type") == "external":
+            url = (payload.get("external") or {}).get("url")
+            if not _url_ok(url, web=True, limits=limits) and not (
+                    self.local_media and isinstance(url, str) and is_local_src(url)):
+                self.issue(path, "bad_url", f"Invalid URL for external file: {url}",
+                           fixable=False)
+        elif btype in _URL_BLOCKS and not _url_ok(payload.get("url"), web=True,
+                                                  limits=limits):
+            self.issue(path, "bad_url", f"Invalid URL for {btype}: {payload.get('url')}",
+                       fixable=False)
+        elif btype == "table_row" and width is not None:
+            cells = payload.get("cells") or []
+            fixed_cells = None
+            for c, cell in enumerate(cells):
+                fixed = self.rich_text(cell, path, row=True)
+                if fixed is not None:
+                    fixed_cells = fixed_cells or list(cells)
+                    fixed_cells[c] = cell = fixed
+                if len(cell) > limits.max_rich_text_items:
+                    self.issue(path, "too_many_rich_text", f"cells[{c}].length should be ≤ "
+                               f"`{limits.max_rich_text_items}`, instead was `{len(cell)}`.",
+                               fixable=False, row=True)
+            if len(cells) > width:
+                self.issue(path, "table_width", f"table row has {len(cells)} cells, "
+                           f"table_width is {width}.", fixable=False, row=True)
+            elif len(cells) < width:
+                self.issue(path, "table_width", f"table row has {len(cells)} cells, "
+                           f"table_width is {width}.", row=True)
+                fixed_cells = (fixed_cells or list(cells)) + [[]] * (width - len(cells))
+            if fixed_cells is not None:
+                edits["cells"] = fixed_cells
+
+        hoisted: Sequence = ()
+        children = payload.get("children")
+        if children:
+            if limits.max_depth is not None and depth >= limits.max_depth:
+                self.issue(path, "too_deep", f"children nested deeper than "
+                           f"{limits.max_depth} levels.", fixable=False)
+            fixed = self.blocks(children, path, depth + 1,
+                                payload.get("table_width") if btype == "table" else None)
+            allowed = btype in _CONTAINERS or (
+                btype.startswith("heading_") and payload.get("is_toggleable"))
+            if not allowed:
+                self.issue(path, "children_not_allowed",
+                           f"{btype} blocks cannot have children.")
+                hoisted, fixed = fixed, []
+            if fixed is not children:
+                edits["children"] = fixed
+
+        rich_text = edits.get("rich_text", payload.get("rich_text")) or ()
+        split = btype in _SPLITTABLE and len(rich_text) > limits.max_rich_text_items
+        if split:
+            self.issue(path, "too_many_rich_text",
+                       f"rich_text.length should be ≤ `{limits.max_rich_text_items}`, "
+                       f"instead was `{len(rich_text)}`.")
+        if not self.fixing or not (edits or hoisted):
+            return None
+
+        payload = {**payload, **edits}
+        if not payload.get("children"):
+            payload.pop("children", None)
+        if not split:
+            out = [{**data, btype: payload}]
+        else:  # consecutive blocks of ≤ max items; children stay with the last
+            step = limits.max_rich_text_items
+            out = [{**data, btype: {**payload, "rich_text": rich_text[i:i + step]}}
+                   for i in range(0, len(rich_text), step)]
+            for piece in out[:-1]:
+                piece[btype].pop("children", None)
+        return [*out, *hoisted]
+
+    def rich_text(self, items: Sequence[JSONDict], path: Tuple[int, ...], *,
+                  row: bool = False) -> List[JSONDict] | None:
+        """Fixed copy of a rich-text array, or None if nothing was changed."""
+        limits = self.limits
+        out = None
+        for i, item in enumerate(items):
+            fixed = None
+            kind = item.get("type", "text")
+            if kind == "equation":
+                self.equation((item.get("equation") or {}).get("expression") or "", path,
+                              row=row)
+            elif kind == "text":
+                text = item.get("text") or {}
+                content = text.get("content") or ""
+                link = text.get("link")
+                if link and not _url_ok(link.get("url"), web=False, limits=limits):
+                    self.issue(path, "bad_url", f"Invalid URL for link: {link.get('url')}",
+                               row=row)
+                    text = {**text, "link": None}
+                    fixed = [{**item, "text": text}]
+                if len(content) > limits.max_text_length:
+                    self.issue(path, "text_too_long",
+                               f"text.content.length should be ≤ `{limits.max_text_length}`, "
+                               f"instead was `{len(content)}`.", row=row)
+                    step = limits.max_text_length
+                    fixed = [{**item, "text": {**text, "content": content[j:j + step]}}
+                             for j in range(0, len(content), step)]
+            if fixed is not None and self.fixing and out is None:
+                out = list(items[:i])
+            if out is not None:
+                out.extend([item] if fixed is None or not self.fixing else fixed)
+        if self.fixing and len(out if out is not None else items) > limits.max_rich_text_items:
+            out = _coalesce(out if out is not None else items, limits.max_text_length)
+        return out
+
+    def equation(self, expression: str, path: Tuple[int, ...], *, row: bool = False) -> None:
+        if len(expression) > self.limits.max_equation_length:
+            self.issue(path, "equation_too_long", f"equation.expression.length should be ≤ "
+                       f"`{self.limits.max_equation_length}`, instead was "
+                       f"`{len(expression)}`.", fixable=False, row=row)
+
+
+def _coalesce(items: Iterable[JSONDict], max_length: int) -> List[JSONDict]:
+    """Merge adjacent text runs with the same formatting (≤ *max_length* each)."""
+    out: List[JSONDict] = []
+    for item in items:
+        prev = out[-1] if out else None
+        if prev is not None and item.get("type", "text") == "text" \
+                and prev.get("type", "text") == "text" \
+                and prev.get("annotations") == item.get("annotations") \
+                and prev["text"].get("link") == item["text"].get("link") \
+                and len(prev["text"]["content"]) + len(item["text"]["content"]) <= max_length:
+            out[-1] = {**prev, "text": {**prev["text"], "content":
+                                        prev["text"]["content"] + item["text"]["content"]}}
+        else:
+            out.append(item)
+    return out
@@ -0,0 +1,126 @@
+"""
+output.py
+=========
+
+Streaming writers for block lists (`ledu --dry`, exports, tooling).
+
+Blocks are written **one at a time** as they come out of a generator
+(`PageBuilder.iter_convert`), so a million-block dump never exists as one
+list, let alone as one giant JSON string.
+
+Formats
+-------
+pretty   indented JSON array (2 spaces) — the historic `--dry` output
+json     compact JSON array, one block per line
+ndjson   one compact JSON object per line, no enclosing array
+
+Backend
+-------
+Compact formats use `orjson` when it is installed (several times faster,
+emits bytes directly) and fall back to the standard library otherwise; both
+produce identical text (UTF-8, no spaces after separators).  `pretty`
+always uses the standard library.
+"""
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import pathlib
+import sys
+from typing import BinaryIO, Callable, Iterable, Iterator
+
+from ledu.utils.tree import json_default
+from ledu.utils.typing import JSONDict
+
+FORMATS = ("pretty", "json", "ndjson")
+
+
+def _stdlib_dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"),
+                      default=json_default).encode("utf8")
+
+
+def compact_dumps(backend: str = "auto") -> Callable[[object], bytes]:
+    """Compact `obj → bytes` serializer: "orjson", "json" or "auto"."""
+    if backend in ("auto", "orjson"):
+        try:
+            import orjson
+        except ImportError:
+            if backend == "orjson":
+                raise
+        else:
+            return functools.partial(orjson.dumps, default=json_default)
+    return _stdlib_dumps
+
+
+class BlockWriter:
+    """
+    Incrementally write blocks to a binary *stream* in *fmt*.
+
+    Use as a context manager (or call `close`) so the JSON array is
+    terminated; `close` does not close *stream* itself.
+    """
+
+    def __init__(self, stream: BinaryIO, fmt: str = "json", *,
+                 backend: str = "auto") -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown format {fmt!r} (choose from {FORMATS})")
+        self.stream = stream
+        self.fmt = fmt
+        self.count = 0
+        self._dumps = self._pretty if fmt == "pretty" else compact_dumps(backend)
+        self._closed = False
+
+    @staticmethod
+    def _pretty(block) -> bytes:
+        text = json.dumps(block, indent=2, default=json_default)
+        return ("  " + text.replace("\n", "\n  ")).encode("utf8")
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def write(self, block: JSONDict) -> None:
+        data = self._dumps(block)
+        if self.fmt == "ndjson":
+            self.stream.write(data + b"\n")
+        else:
+            self.stream.write((b",\n" if self.count else b"[\n") + data)
+        self.count += 1
+
+    def write_all(self, blocks: Iterable[JSONDict]) -> int:
+        for block in blocks:
+            self.write(block)
+        return self.count
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self.fmt != "ndjson":
+            self.stream.write(b"\n]\n" if self.count else b"[]\n")
+        self.stream.flush()
+
+    def __enter__(self) -> "BlockWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+@contextlib.contextmanager
+def open_output(path: str | pathlib.Path | None) -> Iterator[BinaryIO]:
+    """Binary stream for *path*; `None` or "-" means stdout."""
+    if path is None or str(path) == "-":
+        yield sys.stdout.buffer
+        return
+    with open(path, "wb") as fh:
+        yield fh
+
+
+def write_blocks(blocks: Iterable[JSONDict], path: str | pathlib.Path | None = None,
+                 fmt: str = "json", *, backend: str = "auto") -> int:
+    """Stream *blocks* to *path* (stdout by default); return how many."""
+    with open_output(path) as stream, BlockWriter(stream, fmt, backend=backend) as w:
+        return w.write_all(blocks)
@@ -7,10 +7,26 @@ Tokenises raw Markdown into markdown-it-py `Token` objects.
 Implementation plan
 -------------------
 1. Instantiate a `MarkdownIt` parser with CommonMark base.
-2. Enable extensions as needed (`table`, `strikethrough`, …).
-3. Expose **only one public method**: `parse(markdown: str) -> list[Token]`.
+2. Enable extensions as needed (`table`, `strikethrough`, …) — GFM tables
+   and strikethrough are on by default.
+3. Expose `parse(markdown: str) -> list[Token]` (plus `parse_inline` for the
+   rich-text segmenter).
 4. Unit-test the token list for a simple paragraph and for a table.
 
+Inline math
+-----------
+`$...$` becomes a `math_inline` token (content = LaTeX source) via a small
+inline rule registered after `escape`, so `\\$` stays a literal dollar.
+Pandoc's conventions apply: no whitespace right inside the delimiters and
+no digit right after the closing `$` (so "$5 and $6" is plain text).
+
+Nesting depth
+-------------
+The commonmark preset stops at `maxNesting=20` and silently drops anything
+deeper — a 10-level list already needs 21 (list + item per level, plus the
+paragraph).  `MAX_NESTING` raises the cap; markdown-it's recursion is
+bounded by it, so it must stay well below Python's recursion limit.
+
 Edge cases to handle later
 --------------------------
 * HTML disabled (security); enable via option if you truly need raw HTML.
@@ -18,22 +34,76 @@ Edge cases to handle later
 """
 from typing import List
 from markdown_it import MarkdownIt
+from markdown_it.rules_core import StateCore, block, normalize
+from markdown_it.rules_inline import StateInline
 from markdown_it.token import Token
 
 
+def math_inline(state: StateInline, silent: bool) -> bool:
+    """markdown-it inline rule: `$expr$` → `math_inline` token."""
+    src, start, limit = state.src, state.pos, state.posMax
+    if src[start] != "$" or start + 1 >= limit or src[start + 1] in " \t\n$":
+        return False
+
+    end = start + 1
+    while True:
+        end = src.find("$", end, limit)
+        if end == -1:
+            return False
+        if src[end - 1] not in " \t\n\\" and not (
+            end + 1 < limit and src[end + 1].isdigit()
+        ):
+            break
+        end += 1
+
+    if not silent:
+        token = state.push("math_inline", "math", 0)
+        token.markup = "$"
+        token.content = src[start + 1:end]
+    state.pos = end + 1
+    return True
+
+
+#: markdown-it nesting cap (see "Nesting depth" above)
+MAX_NESTING: int = 64
+
+
 class MarkdownParser:
     """Light wrapper around `markdown_it.MarkdownIt`."""
 
     def __init__(self, *, enable_extensions: bool = True) -> None:
-        self.md = MarkdownIt("commonmark", {"html": False})
+        self.md = MarkdownIt("commonmark", {"html": False, "maxNesting": MAX_NESTING})
         if enable_extensions:
-            # TODO → call self.md.enable("table") etc.
-            pass
+            self.md.enable(["strikethrough", "table"])
+            self.md.inline.ruler.after("escape", "math_inline", math_inline)
 
     # --------------------------------------------------------------------- #
     # Public API
     # --------------------------------------------------------------------- #
 
-    def parse(self, markdown: str) -> List[Token]:
-        """Return a list of markdown-it tokens preserving order & nesting."""
-        return self.md.parse(markdown)
+    def parse(self, markdown: str, env: dict | None = None) -> List[Token]:
+        """
+        Return a list of markdown-it tokens preserving order & nesting.
+
+        *env* (optional) receives markdown-it's environment, e.g. the link
+        reference definitions under `env["references"]`.
+        """
+        return self.md.parse(markdown, env)
+
+    def references(self, markdown: str) -> dict:
+        """
+        Link reference definitions in *markdown* (label → href/title).
+
+        Runs the block-level pass only (no inline parsing), so it is much
+        cheaper than `parse`; the result can seed another `parse`'s
+        `env["references"]`.
+        """
+        env: dict = {}
+        state = StateCore(markdown, self.md, env)
+        normalize(state)
+        block(state)
+        return env.get("references", {})
+
+    def parse_inline(self, text: str) -> List[Token]:
+        """Tokenise *text* as inline content and return the child tokens."""
+        return self.md.parseInline(text)[0].children or []
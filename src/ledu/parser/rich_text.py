@@ -11,33 +11,111 @@ Why isolate this?
 * Easier to write unit tests against plain strings without worrying about
   outer blocks.
 
-Implementation roadmap
-----------------------
-1. Start with bold/italic/code only → make tests pass.
-2. Add inline equations (`$...$`) — be careful to escape '\\\\$' literals.
-3. Introduce hyperlinks (`[text](url)`).
-4. Eventually support mentions via a special pattern (`<mention:id>`).
-
-The heavy lifting will probably be done via a small *state machine* that walks
-through the raw text and yields `RichTextRun` dataclass instances.
+How it works
+------------
+markdown-it has already tokenised inline content into `token.children`
+(emphasis, code spans, links, `math_inline` from `MarkdownParser`), so the
+segmenter never re-parses raw strings:
+
+1. `segment_tokens` walks the children **once**, tracking open
+   bold/italic/strikethrough/link state, and appends text to the current
+   run while the style is unchanged (adjacent runs are merged on the fly).
+2. `segment(text)` is the string entry point.  Text without any markup
+   character takes a fast path (one plain run, no tokenising); anything
+   else goes through `MarkdownParser.parse_inline` first.
+3. Runs are cut at Notion's 2,000-character `text.content` limit;
+   `split_runs` groups runs into ≤100-element `rich_text` arrays for
+   converters that must spread long content over several blocks.
+
+Memory & repetition
+-------------------
+* `Annotations` are interned flyweights: one immutable object per
+  combination, shared by every run that uses it.
+* `RichTextRun` is an immutable tuple subclass (no per-instance `__dict__`).
+* `segment` / `segment_inline` sit behind a bounded LRU memo keyed by the
+  source text, so repeated cells ("Yes", "N/A") and boilerplate are
+  segmented once and share their runs.  `cache_info()` reports hits/misses.
+  Inline tokens containing `[` are never memoised: their links may resolve
+  through the document's reference definitions, which the source text
+  alone does not capture.
+
+Still on the roadmap: mentions via a special pattern (`<mention:id>`).
 """
 from __future__ import annotations
 
-import re
-from dataclasses import dataclass
-from typing import List, Dict
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Sequence, Tuple
 from ledu.utils.typing import RichTextDict
 
+#: Notion API limits.
+MAX_TEXT_LENGTH: int = 2000
+MAX_RICH_TEXT_ITEMS: int = 100
+
+#: Characters that can start inline markup; text without them is plain.
+_MARKUP_CHARS = frozenset("*_`~[]<>&\\$!\n\r")
+
+
+class Annotations:
+    """
+    Immutable, interned annotation set (flyweight).
+
+    `Annotations(bold=True)` always returns the same object for the same
+    combination, so identity comparison is enough and thousands of runs
+    share a handful of instances.  Supports read-only mapping access
+    (`ann["bold"]`) for code that treats annotations as a dict.
+    """
+    __slots__ = ("bold", "italic", "strikethrough", "underline", "code", "color",
+                 "_dict")
+    _interned: Dict[tuple, "Annotations"] = {}
+
+    def __new__(cls, bold: bool = False, italic: bool = False,
+                strikethrough: bool = False, underline: bool = False,
+                code: bool = False, color: str = "default") -> "Annotations":
+        key = (bold, italic, strikethrough, underline, code, color)
+        self = cls._interned.get(key)
+        if self is None:
+            self = object.__new__(cls)
+            for name, value in zip(cls.__slots__, key):
+                object.__setattr__(self, name, value)
+            object.__setattr__(self, "_dict", dict(zip(cls.__slots__, key)))
+            cls._interned[key] = self
+        return self
 
-@dataclass
-class RichTextRun:
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "Annotations":
+        return cls(**data)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("Annotations are immutable")
+
+    def __getitem__(self, key: str):
+        return self._dict[key]
+
+    def __reduce__(self):  # keep interning across pickling (process pools)
+        return (Annotations, tuple(self._dict.values()))
+
+    def __repr__(self) -> str:
+        on = [k for k, v in self._dict.items() if v is True]
+        color = "" if self.color == "default" else f", color={self.color!r}"
+        return f"Annotations({', '.join(on) or 'plain'}{color})"
+
+    def to_dict(self) -> Dict[str, object]:
+        """Fresh JSON dict (callers may mutate it)."""
+        return dict(self._dict)
+
+
+#: the annotation set of unformatted text
+PLAIN = Annotations()
+
+
+class RichTextRun(NamedTuple):
     """
-    Dataclass representing a single rich-text fragment.
+    A single rich-text fragment (immutable tuple, `__slots__ = ()`).
 
     Fields mirror Notion's JSON structure for easy conversion.
     """
     plain_text: str
-    annotations: Dict[str, bool]
+    annotations: Annotations = PLAIN
     href: str | None = None
     equation: str | None = None
 
@@ -51,30 +129,201 @@ class RichTextRun:
             return {
                 "type": "equation",
                 "equation": {"expression": self.equation},
-                "annotations": self.annotations,
+                "annotations": self.annotations.to_dict(),
             }
         return {
             "type": "text",
             "text": {"content": self.plain_text, "link": None if not self.href else {"url": self.href}},
-            "annotations": self.annotations,
+            "annotations": self.annotations.to_dict(),
         }
 
 
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
 class RichTextSegmenter:
-    """Pure-function object that splits a string into `RichTextRun`s."""
+    """Pure-function object that splits inline Markdown into `RichTextRun`s."""
+
+    #: texts longer than this are not memoised (rarely repeated, costly to keep)
+    MAX_CACHED_LENGTH: int = 512
 
-    INLINE_EQ = re.compile(r"\\?\\$(.+?)\\$")  # naive first pass
+    def __init__(self, parser=None, *, cache_size: int = 4096) -> None:
+        if parser is None:
+            from ledu.parser.markdown_parser import MarkdownParser
+            parser = MarkdownParser()
+        self.parser = parser
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[RichTextRun, ...]]" = OrderedDict()
+        self._hits = self._misses = 0
 
     # ------------------------------------------------------------------ #
     # Public API                                                         #
     # ------------------------------------------------------------------ #
 
     def segment(self, text: str) -> List[RichTextRun]:
+        """Main entry point — returns an ordered list of runs for *text*."""
+        if not text:
+            return []
+        runs = self._lookup(text)
+        if runs is None:
+            if _MARKUP_CHARS.isdisjoint(text):
+                runs = self._runs(text, PLAIN, None)
+            else:
+                runs = self.segment_tokens(self.parser.parse_inline(text))
+            self._store(text, runs)
+        return list(runs)
+
+    def segment_inline(self, token) -> List[RichTextRun]:
+        """Runs for a block-level `inline` token (memoised on its source)."""
+        if "[" in token.content:  # reference links depend on the document
+            return self.segment_tokens(token.children or [])
+        runs = self._lookup(token.content)
+        if runs is None:
+            runs = self.segment_tokens(token.children or [])
+            self._store(token.content, runs)
+        return list(runs)
+
+    def segment_column(self, cells: Sequence, *,
+                       plain: bool = False) -> List[Tuple[RichTextRun, ...]]:
+        """
+        Runs for a batch of table cells (`inline` tokens or strings).
+
+        Identical cells in the batch are segmented once and share one runs
+        tuple, whatever their length.  *plain* treats strings as literal
+        text (CSV data) instead of inline Markdown.
         """
-        Main entry point — returns an ordered list of runs.
+        seen: Dict[str, Tuple[RichTextRun, ...]] = {}
+        out: List[Tuple[RichTextRun, ...]] = []
+        for cell in cells:
+            text = cell if isinstance(cell, str) else cell.content
+            runs = seen.get(text)
+            if runs is None:
+                if not text:
+                    runs = ()
+                elif not isinstance(cell, str):
+                    runs = tuple(self.segment_inline(cell))
+                elif plain:
+                    runs = tuple(self._runs(text, PLAIN, None))
+                else:
+                    runs = tuple(self.segment(text))
+                seen[text] = runs
+            out.append(runs)
+        return out
+
+    def cache_info(self) -> CacheInfo:
+        """Memo statistics, shaped like `functools.lru_cache`'s."""
+        return CacheInfo(self._hits, self._misses, self.cache_size, len(self._cache))
+
+    def cache_clear(self) -> None:
+        self._cache.clear()
+        self._hits = self._misses = 0
 
-        TODO → replace this naïve placeholder with a real parser that respects
-        overlapping Markdown tokens and escapes.
+    def segment_tokens(self, children: Sequence) -> List[RichTextRun]:
         """
-        # Temporary trivial implementation: whole text, no annotations.
-        return [RichTextRun(plain_text=text, annotations={})]
+        Convert markdown-it inline *children* (an `inline` token's
+        `.children`) into merged runs in a single linear pass.
+        """
+        runs: List[RichTextRun] = []
+        parts: List[str] = []
+        current: tuple | None = None
+        bold = italic = strike = 0
+        links: List[str | None] = []
+
+        for tok in children:
+            kind = tok.type
+            code = False
+            if kind == "text":
+                piece = tok.content
+            elif kind == "code_inline":
+                piece, code = tok.content, True
+            elif kind == "softbreak":
+                piece = " "
+            elif kind == "hardbreak":
+                piece = "\n"
+            elif kind == "strong_open":
+                bold += 1
+                continue
+            elif kind == "strong_close":
+                bold -= 1
+                continue
+            elif kind == "em_open":
+                italic += 1
+                continue
+            elif kind == "em_close":
+                italic -= 1
+                continue
+            elif kind == "s_open":
+                strike += 1
+                continue
+            elif kind == "s_close":
+                strike -= 1
+                continue
+            elif kind == "link_open":
+                links.append(tok.attrGet("href"))
+                continue
+            elif kind == "link_close":
+                links.pop()
+                continue
+            elif kind == "math_inline":
+                if parts:
+                    runs.extend(self._runs("".join(parts), current[0], current[1]))
+                    parts, current = [], None
+                runs.append(RichTextRun(tok.content,
+                                        Annotations(bold > 0, italic > 0, strike > 0),
+                                        equation=tok.content))
+                continue
+            else:  # image alt text, html_inline, …
+                piece = tok.content
+            if not piece:
+                continue
+
+            style = (Annotations(bold > 0, italic > 0, strike > 0, False, code),
+                     links[-1] if links else None)
+            if style != current:
+                if parts:
+                    runs.extend(self._runs("".join(parts), current[0], current[1]))
+                parts, current = [], style
+            parts.append(piece)
+
+        if parts:
+            runs.extend(self._runs("".join(parts), current[0], current[1]))
+        return runs
+
+    @staticmethod
+    def split_runs(runs: Sequence[RichTextRun],
+                   limit: int = MAX_RICH_TEXT_ITEMS) -> List[List[RichTextRun]]:
+        """Group *runs* into consecutive lists of at most *limit* runs."""
+        return [list(runs[i:i + limit]) for i in range(0, len(runs), limit)] or [[]]
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _lookup(self, text: str) -> Tuple[RichTextRun, ...] | None:
+        runs = self._cache.get(text)
+        if runs is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._cache.move_to_end(text)
+        return runs
+
+    def _store(self, text: str, runs: List[RichTextRun]) -> None:
+        if self.cache_size <= 0 or len(text) > self.MAX_CACHED_LENGTH:
+            return
+        self._cache[text] = tuple(runs)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _runs(text: str, annotations: Annotations,
+              href: str | None) -> List[RichTextRun]:
+        """One run for *text*, or several if it exceeds `MAX_TEXT_LENGTH`."""
+        if len(text) <= MAX_TEXT_LENGTH:
+            return [RichTextRun(text, annotations, href)]
+        return [RichTextRun(text[i:i + MAX_TEXT_LENGTH], annotations, href)
+                for i in range(0, len(text), MAX_TEXT_LENGTH)]
@@ -0,0 +1,187 @@
+"""
+Helpers for walking Notion block *trees* (blocks nesting `children`).
+
+Notion stores a block's children inside its type payload:
+`{"type": "toggle", "toggle": {"rich_text": [...], "children": [...]}}`.
+Keep every "where do the children live" decision in this module.
+
+Content digests
+---------------
+`block_digest` hashes a block *without* its children (what `blocks.update`
+can change in place); `digest_tree` adds a Merkle-style *subtree* digest so
+two subtrees compare equal in O(1) once hashed.
+
+Lazy children
+-------------
+A `LazyChildren` sequence stands in for a huge run of *leaf* children
+(e.g. 50k `table_row`s): each item is built when accessed and slices are
+views, so the planner can send 100-row chunks without the whole run ever
+existing as dicts.  JSON writers pass `json_default`; `materialize` turns
+a tree back into plain lists (e.g. for `marshal`).
+
+Every helper also accepts the typed IR blocks of `ledu.blocks.ir` (anything
+that is not a dict), through their `children` / `with_children`.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from abc import abstractmethod
+from collections.abc import Sequence as _SequenceABC
+from dataclasses import dataclass, field
+from typing import Iterator, List, Sequence
+from ledu.utils.typing import JSONDict
+
+
+def get_children(block: JSONDict) -> List[JSONDict]:
+    """Return the nested children of *block* (empty list if none)."""
+    if not isinstance(block, dict):  # typed IR block (`ledu.blocks.ir`)
+        return block.children
+    payload = block.get(block.get("type", ""))
+    if not isinstance(payload, dict):
+        return []
+    return payload.get("children") or []
+
+
+def with_children(block: JSONDict, children: Sequence[JSONDict]) -> JSONDict:
+    """Shallow copy of *block* whose children are replaced by *children*."""
+    if not isinstance(block, dict):
+        return block.with_children(children)
+    btype = block["type"]
+    payload = dict(block.get(btype) or {})
+    if children:
+        payload["children"] = list(children)
+    else:
+        payload.pop("children", None)
+    return {**block, btype: payload}
+
+
+class LazyChildren(_SequenceABC):
+    """
+    Read-only sequence of leaf blocks materialized on access.
+
+    Subclasses implement `__len__`, `_item(i)` (a fresh block dict) and
+    `_view(start, stop)` (a lazy slice).  Compares equal to any sequence
+    with the same blocks.
+    """
+    __slots__ = ()
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def _item(self, index: int) -> JSONDict: ...
+
+    @abstractmethod
+    def _view(self, start: int, stop: int) -> "LazyChildren": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self._item(i) for i in range(start, stop, step)]
+            return self._view(start, max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._item(index)
+
+    def __iter__(self) -> Iterator[JSONDict]:
+        return map(self._item, range(len(self)))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, _SequenceABC) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # mutable-looking container semantics, like list
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} of {len(self)} blocks>"
+
+
+def json_default(obj: object) -> list:
+    """`default=` hook for `json.dumps` / `orjson.dumps` (lazy children)."""
+    if isinstance(obj, LazyChildren):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def materialize(blocks: Sequence[JSONDict]) -> List[JSONDict]:
+    """*blocks* with every `LazyChildren` replaced by a list (shared where unchanged)."""
+    out = []
+    for block in blocks:
+        children = get_children(block)
+        if isinstance(children, LazyChildren):
+            block = with_children(block, list(children))
+        elif children:
+            fixed = materialize(children)
+            if any(a is not b for a, b in zip(fixed, children)):
+                block = with_children(block, fixed)
+        out.append(block)
+    return out
+
+
+def without_children(block: JSONDict) -> JSONDict:
+    """Shallow copy of *block* with its children removed."""
+    if not get_children(block):
+        return block
+    return with_children(block, ())
+
+
+def iter_tree(blocks: Sequence[JSONDict]) -> Iterator[JSONDict]:
+    """Yield every block of the forest in document (pre-)order."""
+    stack = [iter(blocks)]
+    while stack:
+        block = next(stack[-1], None)
+        if block is None:
+            stack.pop()
+            continue
+        yield block
+        children = get_children(block)
+        if children:
+            stack.append(iter(children))
+
+
+def count_blocks(blocks: Sequence[JSONDict]) -> int:
+    """Total number of blocks in the forest, nested ones included."""
+    return sum(1 for _ in iter_tree(blocks))
+
+
+# ---------------------------------------------------------------------- #
+# Digests                                                                #
+# ---------------------------------------------------------------------- #
+
+def _hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def block_digest(block: JSONDict) -> str:
+    """Stable digest of *block*'s own content (children excluded)."""
+    own = without_children(block)
+    if not isinstance(own, dict):
+        own = own.to_notion()
+    return _hash(json.dumps(own, sort_keys=True, separators=(",", ":"),
+                            ensure_ascii=False).encode("utf8"))
+
+
+@dataclass
+class DigestNode:
+    """Digest of one block plus the digests of its subtree."""
+    own: str
+    tree: str
+    block: JSONDict = field(repr=False)
+    children: List["DigestNode"] = field(default_factory=list)
+
+
+def digest_tree(blocks: Sequence[JSONDict]) -> List[DigestNode]:
+    """Return `DigestNode`s mirroring *blocks* (bottom-up subtree hashing)."""
+    nodes = []
+    for block in blocks:
+        children = digest_tree(get_children(block))
+        own = block_digest(block)
+        tree = _hash("|".join([own, *(c.tree for c in children)]).encode()) \
+            if children else own
+        nodes.append(DigestNode(own, tree, block, children))
+    return nodes
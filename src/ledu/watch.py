@@ -0,0 +1,355 @@
+"""
+watch.py
+========
+
+`ledu watch <file|dir>` — re-sync Markdown to Notion as files are saved.
+
+Pipeline
+--------
+1. **Watcher** – `InotifyWatcher` (Linux, via ctypes; no extra dependency)
+   or `PollingWatcher` (mtime/size snapshots) reports changed `*.md` paths.
+   Directories are watched rather than files, so editors that save by
+   writing a temp file and renaming it are caught too.
+2. **Debounce** – `debounced` merges a burst of saves (auto-save, "save
+   all", formatters) into one batch once the files have been quiet for
+   `delay` seconds.
+3. **Section-level re-conversion** – `SectionCache` parses the whole file
+   (cheap) and splits the token stream into top-level sections using the
+   line ranges markdown-it records in `token.map`.  A section whose source
+   lines are unchanged reuses its previous blocks; only edited sections go
+   through the converters again.
+4. **Sync** – local images are uploaded (deduplicated, see
+   `ledu.notion.assets`) and the blocks go to `PageSync` with the file's manifest (see
+   `ledu.notion.sync`), whose digest diff touches only the blocks that
+   actually changed.
+"""
+from __future__ import annotations
+
+import copy
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import pathlib
+import select
+import struct
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Set
+
+from ledu.builder.page_builder import PageBuilder
+from ledu.utils.typing import JSONDict
+
+_SUFFIX = ".md"
+
+
+# ---------------------------------------------------------------------- #
+# Watchers                                                               #
+# ---------------------------------------------------------------------- #
+
+def _watch_dirs(targets: Iterable[str | os.PathLike]) -> Dict[pathlib.Path, Set[str] | None]:
+    """Directory → file names of interest (`None` = every `*.md`, recursive)."""
+    dirs: Dict[pathlib.Path, Set[str] | None] = {}
+    for target in targets:
+        path = pathlib.Path(target).resolve()
+        if path.is_dir():
+            for d in [path, *(p for p in path.rglob("*") if p.is_dir())]:
+                dirs[d] = None
+        else:
+            names = dirs.setdefault(path.parent, set())
+            if names is not None:
+                names.add(path.name)
+    return dirs
+
+
+class PollingWatcher:
+    """Portable fallback: compare (mtime, size) snapshots every *interval*."""
+
+    def __init__(self, targets: Iterable[str | os.PathLike], *,
+                 interval: float = 0.5) -> None:
+        self.targets = list(targets)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[pathlib.Path, tuple]:
+        snap = {}
+        for directory, names in _watch_dirs(self.targets).items():
+            candidates = (directory / n for n in names) if names else directory.glob("*" + _SUFFIX)
+            for path in candidates:
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                snap[path] = (st.st_mtime_ns, st.st_size)
+        return snap
+
+    def poll(self, timeout: float) -> Set[pathlib.Path]:
+        """Changed paths (possibly empty) after waiting up to *timeout*."""
+        deadline = time.monotonic() + timeout
+        while True:
+            snap = self._scan()
+            changed = {p for p, sig in snap.items() if self._snapshot.get(p) != sig}
+            changed |= set(self._snapshot) - set(snap)
+            self._snapshot = snap
+            if changed or time.monotonic() >= deadline:
+                return changed
+            time.sleep(min(self.interval, max(0.0, deadline - time.monotonic())))
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Linux inotify through libc (`inotify_init1` / `inotify_add_watch`).
+
+    Directories created (or moved in) under a watched tree are watched as
+    they appear, like `PollingWatcher`'s rescans pick them up.
+    """
+
+    IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_TO = 0x2, 0x8, 0x80
+    IN_CREATE, IN_DELETE, IN_NONBLOCK, IN_CLOEXEC = 0x100, 0x200, 0o4000, 0o2000000
+    IN_IGNORED, IN_ISDIR = 0x8000, 0x40000000
+    _MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _HEADER = struct.Struct("iIII")
+
+    def __init__(self, targets: Iterable[str | os.PathLike]) -> None:
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, tuple[pathlib.Path, Set[str] | None]] = {}
+        for directory, names in _watch_dirs(targets).items():
+            if self._add_watch(directory, names) < 0:
+                errno = ctypes.get_errno()
+                self.close()
+                raise OSError(errno, f"cannot watch {directory}")
+
+    def _add_watch(self, directory: pathlib.Path, names: Set[str] | None) -> int:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self._MASK)
+        if wd >= 0:
+            self._dirs[wd] = (directory, names)
+        return wd
+
+    def _add_tree(self, root: pathlib.Path) -> Set[pathlib.Path]:
+        """Watch a new directory tree; `*.md` already in it (saved before the watch)."""
+        found: Set[pathlib.Path] = set()
+        for directory, names in _watch_dirs([root]).items():
+            if self._add_watch(directory, names) >= 0:  # vanished again: nothing to watch
+                found.update(directory.glob("*" + _SUFFIX))
+        return found
+
+    def poll(self, timeout: float) -> Set[pathlib.Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: Set[pathlib.Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = self._HEADER.unpack_from(data, offset)
+            offset += self._HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            if mask & self.IN_IGNORED:  # watched directory deleted
+                self._dirs.pop(wd, None)
+                continue
+            directory, names = self._dirs.get(wd, (None, None))
+            if directory is None or not name:
+                continue
+            if mask & self.IN_ISDIR:
+                if names is None and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    changed |= self._add_tree(directory / name)
+                continue
+            if names is None and name.endswith(_SUFFIX) or names and name in names:
+                changed.add(directory / name)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def open_watcher(targets: Iterable[str | os.PathLike], *, backend: str = "auto",
+                 interval: float = 0.5):
+    """inotify when available (`backend="auto"|"inotify"`), else polling."""
+    targets = list(targets)
+    if backend in ("auto", "inotify"):
+        try:
+            return InotifyWatcher(targets)
+        except (OSError, AttributeError, TypeError):
+            if backend == "inotify":
+                raise
+    return PollingWatcher(targets, interval=interval)
+
+
+def debounced(watcher, delay: float = 0.3, *, stop: Callable[[], bool] = lambda: False,
+              tick: float = 0.5) -> Iterator[Set[pathlib.Path]]:
+    """
+    Yield batches of changed paths, each once *delay* seconds passed
+    without further events.  Ends when *stop()* returns true.
+    """
+    while not stop():
+        batch = watcher.poll(tick)
+        if not batch:
+            continue
+        while True:
+            more = watcher.poll(delay)
+            if not more:
+                break
+            batch |= more
+        yield batch
+
+
+# ---------------------------------------------------------------------- #
+# Section-level re-conversion                                            #
+# ---------------------------------------------------------------------- #
+
+def split_sections(tokens: List) -> List[tuple[int, int, tuple[int, int]]]:
+    """
+    Top-level sections of a token list as `(first, last + 1, (line0, line1))`.
+
+    A section is one level-0 block: a self-contained token (`fence`, `hr`,
+    …) or an `*_open` … matching `*_close` range.
+    """
+    sections = []
+    idx = 0
+    while idx < len(tokens):
+        tok = tokens[idx]
+        start = idx
+        if tok.nesting == 1:
+            depth = 0
+            while True:
+                depth += tokens[idx].nesting
+                idx += 1
+                if depth == 0:
+                    break
+        else:
+            idx += 1
+        lines = tuple(tok.map) if tok.map else (0, 0)
+        sections.append((start, idx, lines))
+    return sections
+
+
+class SectionCache:
+    """Re-convert only the top-level sections whose source text changed."""
+
+    def __init__(self, builder: PageBuilder | None = None) -> None:
+        self.builder = builder or PageBuilder()
+        self._sections: Dict[str, List[JSONDict]] = {}
+        self._refs = ""
+        self.reconverted = self.reused = 0  # counts for the last `convert`
+
+    def convert(self, markdown: str) -> List[JSONDict]:
+        env: dict = {}
+        tokens = self.builder.parser.parse(markdown, env)
+        refs = repr(sorted((k, v.get("href"), v.get("title"))
+                           for k, v in env.get("references", {}).items()))
+        if refs != self._refs:  # link targets may have moved under unchanged text
+            self._sections.clear()
+            self.builder.segmenter.cache_clear()  # memoised runs hold old targets too
+            self._refs = refs
+
+        lines = markdown.splitlines(keepends=True)
+        fresh: Dict[str, List[JSONDict]] = {}
+        blocks: List[JSONDict] = []
+        self.reconverted = self.reused = 0
+        for start, end, (line0, line1) in split_sections(tokens):
+            key = hashlib.blake2b("".join(lines[line0:line1]).encode("utf8")
+                                  + tokens[start].type.encode(), digest_size=16).hexdigest()
+            section = fresh.get(key)
+            if section is not None:  # same text twice in one file: independent copy
+                blocks.extend(copy.deepcopy(section))
+                continue
+            section = self._sections.get(key)
+            if section is None:
+                section = self.builder.convert_tokens(tokens[start:end])
+                self.reconverted += 1
+            else:
+                self.reused += 1
+            fresh[key] = section
+            blocks.extend(section)
+        self._sections = fresh
+        return blocks
+
+
+# ---------------------------------------------------------------------- #
+# Watch loop                                                             #
+# ---------------------------------------------------------------------- #
+
+@dataclass
+class WatchEvent:
+    """What one re-sync of one file did (passed to `on_sync`)."""
+    path: pathlib.Path
+    reconverted: int
+    reused: int
+    report: object = None
+    seconds: float = 0.0
+    error: str | None = None
+
+
+def watch(targets: Iterable[str | os.PathLike], *, parent_id: str | None = None,
+          client=None, debounce: float = 0.3, backend: str = "auto",
+          manifest_dir: str | None = None,
+          on_sync: Callable[[WatchEvent], None] | None = None,
+          stop: Callable[[], bool] = lambda: False, initial: bool = True,
+          assets=None) -> None:
+    """
+    Keep the Notion pages of *targets* in sync until *stop()* is true.
+
+    Each file maps to a page through its manifest (`default_manifest_path`);
+    files without one are created under *parent_id* on their first sync.
+    *assets* defaults to an `AssetUploader` on *client*.
+    """
+    from ledu.batch import collect_sources
+    from ledu.config import settings
+    from ledu.notion.assets import open_uploader
+    from ledu.notion.sync import default_manifest_path, sync_blocks
+    from ledu.notion.validate import preflight
+
+    if client is None:
+        from ledu.notion.client import NotionClient
+        client = NotionClient(settings.notion_api_token)
+    manifest_dir = manifest_dir or settings.manifest_dir
+    own_assets = assets is None
+    if own_assets:
+        assets = open_uploader(client)
+    targets = list(targets)
+    caches: Dict[pathlib.Path, SectionCache] = {}
+
+    def resync(path: pathlib.Path) -> None:
+        start = time.perf_counter()
+        cache = caches.setdefault(path, SectionCache())
+        event = WatchEvent(path, 0, 0)
+        try:
+            blocks = cache.convert(path.read_text(encoding="utf8"))
+            event.reconverted, event.reused = cache.reconverted, cache.reused
+            blocks = assets.resolve(preflight(blocks, local_media=True), path.parent)
+            event.report = sync_blocks(blocks, default_manifest_path(path, manifest_dir),
+                                       parent_id=parent_id, title=path.stem, client=client)
+        except Exception as exc:  # keep watching; report and move on
+            event.error = f"{type(exc).__name__}: {exc}"
+        event.seconds = time.perf_counter() - start
+        if on_sync is not None:
+            on_sync(event)
+
+    watcher = open_watcher(targets, backend=backend)
+    try:
+        if initial:
+            for path in collect_sources(targets):
+                resync(path.resolve())
+        for batch in debounced(watcher, debounce, stop=stop):
+            for path in sorted(batch):
+                if path.is_file():
+                    resync(path)
+    finally:
+        watcher.close()
+        if own_assets:
+            assets.close()
@@ -0,0 +1,19 @@
+"""
+Fixtures shared by several test modules.
+"""
+import pytest
+
+from ledu.blocks.base import BlockConverter
+from ledu.config import BLOCK_REGISTRY
+
+
+class DividerConverter(BlockConverter):
+    """Test-only converter; registered per test via the `dividers` fixture."""
+
+    def to_notion(self, token, tokens, idx, context):
+        return [{"object": "block", "type": "divider", "divider": {}}]
+
+
+@pytest.fixture
+def dividers(monkeypatch):
+    monkeypatch.setitem(BLOCK_REGISTRY, "hr", DividerConverter)
@@ -0,0 +1,64 @@
+"""
+Shared test helpers: block builders, in-memory clients and a fake clock.
+"""
+import itertools
+
+from ledu.notion.ratelimit import RetryPolicy, TokenBucket
+
+
+def para(text: str = "x") -> dict:
+    return {"object": "block", "type": "paragraph",
+            "paragraph": {"rich_text": [{"type": "text", "text": {"content": text}}]}}
+
+
+def toggle(children: list) -> dict:
+    return {"object": "block", "type": "toggle",
+            "toggle": {"rich_text": [], "children": children}}
+
+
+class FakeClient:
+    """Records calls and hands out sequential IDs."""
+
+    def __init__(self) -> None:
+        self.ids = (f"id{i}" for i in itertools.count())
+        self.children: dict[str, list] = {}
+        self.calls: list[str] = []
+
+    def _store(self, parent: str, blocks: list) -> list:
+        created = [{"id": next(self.ids)} for _ in blocks]
+        self.children.setdefault(parent, []).extend(created)
+        return created
+
+    def create_page(self, parent, blocks, *, title=None):
+        self.calls.append("create")
+        page = {"id": next(self.ids)}
+        self._store(page["id"], blocks)
+        return page
+
+    def append_blocks(self, block_id, blocks, *, after=None):
+        self.calls.append(f"append:{block_id}")
+        return {"results": self._store(block_id, blocks)}
+
+    def list_children(self, block_id, *, start_cursor=None, page_size=100):
+        self.calls.append(f"list:{block_id}")
+        return {"results": self.children[block_id][:page_size], "has_more": False}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def fast(clock=None) -> dict:
+    """Client options that never wait: generous rate limit, instant retries."""
+    clock = clock or FakeClock()
+    return {"rate_limiter": TokenBucket(1000.0, clock=clock),
+            "retry": RetryPolicy(base_delay=0.0), "sleep": clock.sleep}
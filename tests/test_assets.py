@@ -0,0 +1,219 @@
+"""
+Local media: conversion to media blocks, deduplicated concurrent upload,
+persistent asset cache, Notion file uploads (against the fake API).
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ledu.batch import sync_files
+from ledu.blocks.media import is_local_src
+from ledu.builder import PageBuilder
+from ledu.cli import main
+from ledu.config import settings
+from ledu.notion import assets as assets_module
+from ledu.notion import client as client_module
+from ledu.notion.assets import AssetCache, AssetError, AssetUploader, open_uploader
+from ledu.notion.fake import FakeNotion
+from ledu.notion.upload import (BatchUploader, UploadJob, upload_markdown,
+                               upload_markdown_async)
+from ledu.notion.validate import PreflightError
+from tests.helpers import fast
+
+
+class CountingUpload:
+    """Upload function that records calls and overlaps them a little."""
+
+    def __init__(self, delay: float = 0.02) -> None:
+        self.calls = []
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, path):
+        with self._lock:
+            self.calls.append(path.name)
+        time.sleep(self.delay)
+        return {"type": "external", "external": {"url": f"https://cdn.test/{path.name}"}}
+
+
+def _assets(tmp_path):
+    img = tmp_path / "img"
+    img.mkdir()
+    (img / "a.png").write_bytes(b"A" * 100)
+    (img / "copy-of-a.png").write_bytes(b"A" * 100)
+    (img / "b.png").write_bytes(b"B" * 50)
+    return img
+
+
+def test_image_paragraphs_become_media_blocks() -> None:
+    blocks = PageBuilder().convert(
+        '![Fig. *1*](./img/a.png "t")\n\n![](https://x.test/v.mp4)\n\ntext ![i](z.png)')
+    assert [b["type"] for b in blocks] == ["image", "video"]
+    assert blocks[0]["image"]["external"]["url"] == "./img/a.png"
+    assert blocks[0]["image"]["caption"][0]["text"]["content"] == "Fig. 1"
+
+
+@pytest.mark.parametrize("src, local", [
+    ("img/a.png", True), ("/abs/a.png", True), ("file:///abs/a.png", True),
+    ("C:\\pics\\a.png", True), ("https://x.test/a.png", False),
+    ("data:image/png;base64,AA", False), ("//cdn.test/a.png", False),
+])
+def test_is_local_src(src, local) -> None:
+    assert is_local_src(src) is local
+
+
+def test_shared_and_identical_assets_upload_once(tmp_path) -> None:
+    _assets(tmp_path)
+    md = "![](img/a.png)\n\n![](img/copy-of-a.png)\n\n![](img/b.png)\n\n![x](img/a.png)\n"
+    blocks = PageBuilder().convert(md)
+    upload = CountingUpload()
+    with AssetUploader(upload, workers=4) as assets:
+        assert assets.prefetch(blocks, tmp_path) == 4
+        resolved = assets.resolve(blocks, tmp_path)
+
+    assert sorted(upload.calls) in (["a.png", "b.png"], ["b.png", "copy-of-a.png"])
+    assert assets.stats.uploaded == 2 and assets.stats.deduped + assets.stats.cached == 1
+    assert resolved[3]["image"] == {"type": "external", "caption": blocks[3]["image"]["caption"],
+                                    "external": {"url": resolved[0]["image"]["external"]["url"]}}
+    assert blocks[0]["image"]["external"]["url"] == "img/a.png"  # input left untouched
+
+
+def test_nested_media_and_untouched_blocks() -> None:
+    para = {"type": "paragraph", "paragraph": {"rich_text": []}}
+    toggle = {"type": "toggle", "toggle": {"rich_text": [], "children": [
+        para, {"type": "image", "image": {"type": "external",
+                                          "external": {"url": "https://x.test/a.png"}}}]}}
+    with AssetUploader(CountingUpload()) as assets:
+        assert assets.resolve([toggle])[0] is toggle
+
+
+def test_persistent_cache_skips_unchanged_assets(tmp_path) -> None:
+    img = _assets(tmp_path)
+    blocks = PageBuilder().convert("![](img/a.png)\n\n![](img/b.png)\n")
+    cache_file = tmp_path / "assets.json"
+
+    first = CountingUpload(0)
+    with AssetUploader(first, AssetCache(cache_file)) as assets:
+        assets.resolve(blocks, tmp_path)
+    second = CountingUpload(0)
+    with AssetUploader(second, AssetCache(cache_file)) as assets:
+        assets.resolve(blocks, tmp_path)
+    assert len(first.calls) == 2 and second.calls == []
+    assert assets.stats.cached == 2
+
+    (img / "b.png").write_bytes(b"changed")
+    third = CountingUpload(0)
+    with AssetUploader(third, AssetCache(cache_file)) as assets:
+        assets.resolve(blocks, tmp_path)
+    assert third.calls == ["b.png"]
+
+
+def test_missing_asset_raises(tmp_path) -> None:
+    blocks = PageBuilder().convert("![](nope.png)")
+    with AssetUploader(CountingUpload()) as assets, pytest.raises(AssetError):
+        assets.resolve(blocks, tmp_path)
+
+
+def test_notion_file_uploads_round_trip(tmp_path, monkeypatch) -> None:
+    _assets(tmp_path)
+    monkeypatch.setattr(client_module, "UPLOAD_PART_BYTES", 60)  # a.png: 2 parts
+    fake = FakeNotion()
+    client = fake.client(**fast())
+    blocks = PageBuilder().convert("![](img/a.png)\n\n![](img/b.png)\n")
+
+    with pytest.raises(Exception):  # Notion rejects relative URLs
+        client.create_page({"page_id": "root"}, blocks)
+    with AssetUploader(client.upload_file) as assets:
+        resolved = assets.resolve(blocks, tmp_path)
+    page = client.create_page({"page_id": "root"}, resolved)["id"]
+
+    assert [b["image"]["type"] for b in fake.tree(page)] == ["file_upload"] * 2
+    assert fake.stats.files_uploaded == 2
+    assert fake.stats.requests["file_uploads.complete"] == 1
+
+
+def test_sync_files_uploads_shared_assets_once(tmp_path) -> None:
+    _assets(tmp_path)
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"p{i}.md"
+        path.write_text("![](img/a.png)\n\n![](img/b.png)\n", encoding="utf8")
+        paths.append(path)
+    fake = FakeNotion()
+    client = fake.client(**fast())
+    assets = AssetUploader(client.upload_file)
+    results = sync_files(paths, parent_id="root", jobs=1, client=client, assets=assets)
+    assets.close()
+    assert all(r.ok for r in results)
+    assert fake.stats.files_uploaded == 2
+
+
+def test_upload_markdown_and_batch_uploader_resolve_local_media(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "asset_cache", "")
+    _assets(tmp_path)
+    md = "![](img/a.png)\n\n![](img/b.png)\n"
+    fake = FakeNotion()
+    client = fake.client(**fast())
+
+    page = upload_markdown(md, "root", client=client, base_dir=tmp_path)
+    assert [b["image"]["type"] for b in fake.tree(page)] == ["file_upload"] * 2
+
+    with BatchUploader(client, concurrency=2) as uploader:
+        results = list(uploader.upload([UploadJob(md, "root", f"p{i}", tmp_path)
+                                        for i in range(3)]))
+    assert all(r.ok for r in results), [r.error for r in results]
+    assert uploader.assets.stats.uploaded == 2  # shared by every job
+    assert all(fake.tree(r.page_id)[0]["image"]["type"] == "file_upload" for r in results)
+
+
+def test_cli_reports_missing_asset_without_traceback(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "asset_cache", "")
+    doc = tmp_path / "doc.md"
+    doc.write_text("![](img/missing.png)\n", encoding="utf8")
+    with pytest.raises(SystemExit) as exc:
+        main([str(doc), "--parent-id", "root"])
+    assert str(exc.value).startswith(f"ledu: {doc}: img/missing.png:")
+
+
+def test_invalid_document_uploads_no_assets(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "asset_cache", "")
+    _assets(tmp_path)
+    md = "![](img/a.png)\n\n| a | b |\n|---|---|\n| " + "**w** w " * 60 + " | 3 |\n"
+    fake = FakeNotion()
+    with pytest.raises(PreflightError):
+        upload_markdown(md, "root", client=fake.client(**fast()), base_dir=tmp_path)
+    assert fake.stats.total_requests == 0
+
+
+@pytest.mark.parametrize("attached", [False, True])
+def test_cached_uploads_expire_unless_attached(tmp_path, monkeypatch, attached) -> None:
+    _assets(tmp_path)
+    cache_file = tmp_path / "assets.json"
+    fake = FakeNotion()
+    client = fake.client(**fast())
+    blocks = PageBuilder().convert("![](img/a.png)\n")
+
+    with open_uploader(client, cache_path=cache_file) as assets:
+        resolved = assets.resolve(blocks, tmp_path)
+    if attached:
+        client.create_page({"page_id": "root"}, resolved)
+    fake.expire_uploads()  # an hour later
+
+    monkeypatch.setattr(assets_module, "TRUST_SECONDS", 0)
+    with open_uploader(client, cache_path=cache_file) as assets:
+        again = assets.resolve(blocks, tmp_path)
+    client.create_page({"page_id": "root"}, again)  # a live upload either way
+    assert fake.stats.files_uploaded == (1 if attached else 2)
+    assert (again == resolved) is attached
+
+
+def test_async_upload_resolves_local_media(tmp_path) -> None:
+    _assets(tmp_path)
+    fake = FakeNotion()
+    with AssetUploader(fake.client(**fast()).upload_file) as assets:
+        page = asyncio.run(upload_markdown_async(
+            "![a](img/a.png)\n", "root", client=fake.async_client(**fast()),
+            base_dir=tmp_path, assets=assets))
+    assert fake.tree(page)[0]["image"]["type"] == "file_upload"
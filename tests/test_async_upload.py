@@ -0,0 +1,103 @@
+"""
+Concurrent plan execution: dependency order, sibling order, concurrency cap.
+"""
+import asyncio
+import itertools
+
+import httpx
+
+from ledu.notion.client import AsyncNotionClient
+from ledu.notion.planner import RequestPlanner
+from ledu.notion.ratelimit import RetryPolicy, TokenBucket
+from ledu.notion.upload import execute_plan_async
+from tests.helpers import para, toggle
+
+
+class FakeAsyncClient:
+    def __init__(self) -> None:
+        self.ids = (f"id{i}" for i in itertools.count())
+        self.children: dict[str, list] = {}
+        self.known: set[str] = set()
+        self.in_flight = 0
+        self.peak = 0
+        self.appends: list[tuple[str, str]] = []
+
+    async def _io(self) -> None:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+
+    def _store(self, parent: str, blocks: list) -> list:
+        created = [{"id": next(self.ids)} for _ in blocks]
+        self.known.update(c["id"] for c in created)
+        self.children.setdefault(parent, []).extend(created)
+        return created
+
+    async def create_page(self, parent, blocks, *, title=None):
+        await self._io()
+        page = {"id": next(self.ids)}
+        self.known.add(page["id"])
+        self._store(page["id"], blocks)
+        return page
+
+    async def append_blocks(self, block_id, blocks):
+        assert block_id in self.known, "parent must exist before append"
+        await self._io()
+        first = blocks[0]
+        label = first["paragraph"]["rich_text"][0]["text"]["content"] \
+            if first["type"] == "paragraph" else ""
+        self.appends.append((block_id, label))
+        return {"results": self._store(block_id, blocks)}
+
+    async def list_children(self, block_id, *, start_cursor=None, page_size=100):
+        await self._io()
+        return {"results": self.children[block_id][:page_size], "has_more": False}
+
+
+def test_sibling_subtrees_upload_concurrently_under_cap() -> None:
+    # each toggle needs its own append; 250 deferred paragraphs → 3 ordered appends
+    blocks = [toggle([toggle([para()])] + [para(str(i)) for i in range(250)])
+              for _ in range(6)]
+    client = FakeAsyncClient()
+    plan = RequestPlanner().plan(blocks)
+    page_id = asyncio.run(execute_plan_async(client, plan, {"page_id": "r"},
+                                             concurrency=3))
+    assert page_id == "id0"
+    assert 1 < client.peak <= 3
+    # append chunks on the same parent stay in document order
+    per_parent: dict[str, list[str]] = {}
+    for parent, first in client.appends:
+        per_parent.setdefault(parent, []).append(first)
+    for firsts in per_parent.values():
+        labelled = [f for f in firsts if f]
+        assert labelled == sorted(labelled, key=int)
+
+
+def test_async_client_retries_rate_limited_append() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"},
+                                  json={"code": "rate_limited", "message": "slow"})
+        return httpx.Response(200, json={"results": [{"id": "b"}]})
+
+    async def no_sleep(_: float) -> None:
+        return None
+
+    async def go() -> dict:
+        client = AsyncNotionClient(
+            "secret",
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            rate_limiter=TokenBucket(1000.0), retry=RetryPolicy(base_delay=0.0),
+            sleep=no_sleep,
+        )
+        try:
+            return await client.append_blocks("p", [para()])
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(go())["results"] == [{"id": "b"}]
+    assert len(calls) == 2
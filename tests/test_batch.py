@@ -0,0 +1,41 @@
+"""
+Multi-file conversion (`ledu sync`): source discovery, pool, upload queue.
+"""
+from ledu.batch import collect_sources, convert_files, sync_files
+from ledu.cli import main
+from tests.helpers import FakeClient
+
+
+def _tree(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in ("a.md", "b.md", "sub/c.md"):
+        (tmp_path / name).write_text(f"# {name}\n\nbody\n", encoding="utf8")
+    (tmp_path / "notes.txt").write_text("skip me", encoding="utf8")
+    return tmp_path
+
+
+def test_collect_sources_expands_dirs_and_globs(tmp_path) -> None:
+    root = _tree(tmp_path)
+    assert [p.name for p in collect_sources([root])] == ["a.md", "b.md", "c.md"]
+    assert [p.name for p in collect_sources([str(root / "*.md")])] == ["a.md", "b.md"]
+
+
+def test_process_pool_converts_every_file(tmp_path) -> None:
+    paths = collect_sources([_tree(tmp_path)])
+    results = list(convert_files(paths, jobs=2))
+    assert sorted(r.path for r in results) == paths
+    assert all(r.ok for r in results)
+
+
+def test_sync_uploads_through_one_shared_client(tmp_path) -> None:
+    client = FakeClient()
+    paths = collect_sources([_tree(tmp_path)])
+    results = sync_files(paths, parent_id="root", jobs=1, client=client)
+    assert client.calls == ["create"] * 3
+    assert all(r.page_id for r in results)
+
+
+def test_cli_sync_prints_summary(tmp_path, capsys) -> None:
+    main(["sync", str(_tree(tmp_path)), "--jobs", "1"])
+    out = capsys.readouterr().out
+    assert "3 files, 0 failed" in out
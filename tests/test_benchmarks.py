@@ -0,0 +1,44 @@
+"""
+Benchmark harness: seeded corpus, result shape, regression gate.
+"""
+import copy
+
+from benchmarks import SHAPES, compare, generate, run_suite
+from ledu.parser import MarkdownParser
+
+
+def test_corpus_is_deterministic_per_seed() -> None:
+    for shape in SHAPES:
+        assert generate(shape, scale=0.01) == generate(shape, scale=0.01)
+    assert generate("equation_prose", seed=1, scale=0.01) != generate(
+        "equation_prose", seed=2, scale=0.01)
+
+
+def test_ten_level_lists_survive_parsing() -> None:
+    tokens = MarkdownParser().parse(generate("nested_lists", scale=0.02))
+    assert sum(t.type == "list_item_open" for t in tokens) == 10
+    assert max(t.level for t in tokens) >= 20
+
+
+def test_suite_reports_every_stage() -> None:
+    report = run_suite(["many_headings"], scale=0.01, repeat=1)
+    stages = report["results"]["many_headings"]["stages"]
+    assert set(stages) == {"parse", "convert", "segment", "serialize"}
+    assert all(m["seconds"] > 0 and m["peak_kib"] >= 0 for m in stages.values())
+
+
+def test_compare_flags_slowdowns_only_beyond_tolerance() -> None:
+    base = {"results": {"s": {"stages": {
+        "parse": {"seconds": 0.10, "peak_kib": 100.0},
+        "serialize": {"seconds": 0.0001, "peak_kib": 1.0},  # below noise floor
+    }}}}
+    cur = copy.deepcopy(base)
+    cur["results"]["s"]["stages"]["parse"]["seconds"] = 0.11
+    cur["results"]["s"]["stages"]["serialize"]["seconds"] = 0.01
+    assert compare(base, cur) == []
+
+    cur["results"]["s"]["stages"]["parse"].update(seconds=0.2, peak_kib=200.0)
+    found = compare(base, cur)
+    assert [(r.stage, r.metric) for r in found] == [("parse", "seconds"),
+                                                    ("parse", "peak_kib")]
+    assert "+100%" in str(found[0])
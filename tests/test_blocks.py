@@ -5,7 +5,10 @@ once implemented.
 Replace with real fixtures as you flesh out the converter.
 """
 import pytest
+from ledu.blocks.base import BlockConverter, ConversionResult
 from ledu.builder import PageBuilder
+from ledu.config import BLOCK_REGISTRY
+from ledu.utils.errors import ConversionFailedError
 
 
 def test_empty_result_before_implementation() -> None:
@@ -13,3 +16,69 @@ def test_empty_result_before_implementation() -> None:
     blocks = PageBuilder().convert(md)
     # ParagraphConverter not yet implemented, so list is empty for now
     assert blocks == []
+
+
+# ---------------------------------------------------------------------- #
+# Single-pass walk contract (test-only converters, registered per test)  #
+# ---------------------------------------------------------------------- #
+
+
+class QuoteConverter(BlockConverter):
+    instances = 0
+
+    def __init__(self) -> None:
+        QuoteConverter.instances += 1
+
+    def to_notion(self, token, tokens, idx, context):
+        context.open_scope({"type": "quote", "quote": {"rich_text": []}}, token)
+        return []
+
+
+class WholeParagraphConverter(BlockConverter):
+    visited: list = []
+
+    def to_notion(self, token, tokens, idx, context):
+        end = idx
+        while tokens[end].type != "paragraph_close":
+            end += 1
+        text = tokens[idx + 1].content
+        return ConversionResult([{"type": "paragraph", "paragraph": {"text": text}}],
+                                end + 1)
+
+
+class InlineSpy(BlockConverter):
+    seen = 0
+
+    def to_notion(self, token, tokens, idx, context):
+        InlineSpy.seen += 1
+        return []
+
+
+@pytest.fixture
+def walk_converters(monkeypatch):
+    monkeypatch.setitem(BLOCK_REGISTRY, "blockquote_open", QuoteConverter)
+    monkeypatch.setitem(BLOCK_REGISTRY, "paragraph_open", WholeParagraphConverter)
+    monkeypatch.setitem(BLOCK_REGISTRY, "inline", InlineSpy)
+    QuoteConverter.instances = InlineSpy.seen = 0
+
+
+def test_scope_stack_nests_containers_in_one_pass(walk_converters) -> None:
+    md = "> outer\n>\n> > inner\n\nafter\n"
+    blocks = PageBuilder().convert(md)
+    assert [b["type"] for b in blocks] == ["quote", "paragraph"]
+    outer = blocks[0]["quote"]["children"]
+    assert outer[0]["paragraph"]["text"] == "outer"
+    assert outer[1]["quote"]["children"][0]["paragraph"]["text"] == "inner"
+    assert QuoteConverter.instances == 1  # converter reused
+    assert InlineSpy.seen == 0            # consumed tokens are never revisited
+
+
+class StuckConverter(BlockConverter):
+    def to_notion(self, token, tokens, idx, context):
+        return ConversionResult([], idx)
+
+
+def test_converter_that_does_not_advance_is_an_error(monkeypatch) -> None:
+    monkeypatch.setitem(BLOCK_REGISTRY, "paragraph_open", StuckConverter)
+    with pytest.raises(ConversionFailedError, match="StuckConverter.*'paragraph_open'"):
+        PageBuilder().convert("Hello world")
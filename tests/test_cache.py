@@ -0,0 +1,58 @@
+"""
+On-disk conversion cache: hits, key invalidation, LRU eviction, CLI.
+"""
+import os
+
+from ledu.builder import PageBuilder
+from ledu.cache import ConversionCache
+from ledu.cli import main
+from ledu.config import settings
+from tests.helpers import para
+
+
+def test_convert_is_served_from_cache(tmp_path, dividers, monkeypatch) -> None:
+    cache = ConversionCache(tmp_path)
+    md = "---\n\n---\n"
+    first = PageBuilder(cache=cache).convert(md)
+
+    builder = PageBuilder(cache=cache)
+    monkeypatch.setattr(builder, "_walk", None)  # must not re-convert
+    assert builder.convert(md) == first
+    assert list(builder.iter_convert(md)) == first
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_key_covers_settings_and_converters(tmp_path, dividers, monkeypatch) -> None:
+    cache = ConversionCache(tmp_path)
+    key = cache.key("# same text")
+    monkeypatch.setattr(settings, "default_color", "blue")
+    assert cache.key("# same text") != key
+    monkeypatch.undo()
+    assert cache.key("# same text") != key  # divider converter no longer registered
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path) -> None:
+    blob = [para(os.urandom(600).hex())]
+    cache = ConversionCache(tmp_path)
+    cache.put("doc 0", blob)
+    cache.max_bytes = cache.stats().bytes * 9 // 2  # room for four entries
+    for i in range(4):
+        cache.put(f"doc {i}", blob)
+        os.utime(cache._path(cache.key(f"doc {i}")), (i, i))
+    assert cache.get("doc 0") == blob  # touch the oldest entry
+    cache.put("doc 4", blob)
+    cache.put("doc 5", blob)
+
+    assert cache.stats().bytes <= cache.max_bytes
+    assert cache.get("doc 0") is not None
+    assert cache.get("doc 1") is None
+
+
+def test_cache_subcommand(tmp_path, capsys) -> None:
+    cache = ConversionCache(tmp_path)
+    cache.put("a", [para()])
+    main(["cache", "stats", "--cache-dir", str(tmp_path)])
+    assert "1 entries" in capsys.readouterr().out
+    main(["cache", "clear", "--cache-dir", str(tmp_path)])
+    assert "removed 1" in capsys.readouterr().out
+    assert cache.stats().entries == 0
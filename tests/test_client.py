@@ -0,0 +1,88 @@
+"""
+Transport-layer tests for NotionClient: throttling & retry (no network).
+"""
+import httpx
+import pytest
+from notion_client.errors import APIResponseError, HTTPResponseError
+
+from ledu.notion.client import NotionClient
+from ledu.notion.ratelimit import RetryPolicy, TokenBucket
+from tests.helpers import FakeClock
+
+
+def _client(handler, clock: FakeClock, **kwargs) -> NotionClient:
+    return NotionClient(
+        "secret",
+        client=httpx.Client(transport=httpx.MockTransport(handler)),
+        rate_limiter=TokenBucket(3.0, clock=clock),
+        retry=RetryPolicy(base_delay=0.0, **kwargs),
+        sleep=clock.sleep,
+    )
+
+
+def test_token_bucket_sustains_configured_rate() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(3.0, clock=clock)
+    for _ in range(9):
+        bucket.acquire(clock.sleep)
+    # first 3 are the burst, the other 6 are spaced 1/3 s apart
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_rate_limited_create_honours_retry_after() -> None:
+    clock = FakeClock()
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(
+                429, headers={"Retry-After": "7"},
+                json={"object": "error", "code": "rate_limited", "message": "slow"},
+            )
+        return httpx.Response(200, json={"object": "page", "id": "p1"})
+
+    page = _client(handler, clock).create_page({"page_id": "root"}, [])
+    assert page["id"] == "p1"
+    assert len(calls) == 2
+    assert 7.0 in clock.sleeps
+
+
+def test_non_idempotent_call_not_retried_on_502() -> None:
+    clock = FakeClock()
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(502, text="bad gateway")
+
+    with pytest.raises(HTTPResponseError):
+        _client(handler, clock).append_blocks("b1", [])
+    assert len(calls) == 1
+
+
+def test_idempotent_call_retried_on_502_until_success() -> None:
+    clock = FakeClock()
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(502, text="bad gateway")
+        return httpx.Response(200, json={"results": [], "has_more": False})
+
+    body = _client(handler, clock).list_children("b1")
+    assert body["has_more"] is False
+    assert len(calls) == 3
+
+
+def test_retries_give_up_after_max_attempts() -> None:
+    clock = FakeClock()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            429, json={"object": "error", "code": "rate_limited", "message": "no"}
+        )
+
+    with pytest.raises(APIResponseError):
+        _client(handler, clock, max_attempts=3).create_page({"page_id": "r"}, [])
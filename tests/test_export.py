@@ -0,0 +1,128 @@
+"""
+Notion → Markdown: renderer, concurrent tree fetch, ordered incremental export.
+"""
+import asyncio
+
+from ledu.notion.export import TreeFetcher, export_page, export_pages, iter_page_markdown
+from ledu.notion.fake import FakeNotion
+from ledu.notion.planner import RequestPlanner
+from ledu.notion.ratelimit import TokenBucket
+from ledu.notion.render import MarkdownRenderer
+from ledu.notion.upload import execute_plan
+from tests.helpers import fast, para, toggle
+
+
+def rt(text, **ann):
+    return [{"type": "text", "text": {"content": text, "link": None}, "annotations": ann}]
+
+
+def item(kind, text, children=()):
+    block = {"object": "block", "type": kind, kind: {"rich_text": rt(text)}}
+    if children:
+        block[kind]["children"] = list(children)
+    return block
+
+
+def test_renderer_covers_inline_marks_lists_and_code() -> None:
+    blocks = [
+        {"type": "heading_2", "heading_2": {"rich_text": rt("Policy ") + [
+            {"type": "equation", "equation": {"expression": r"\pi"}}]}},
+        {"type": "paragraph", "paragraph": {"rich_text": rt("bold ", bold=True)
+                                            + rt("a*b", italic=True)}},
+        item("numbered_list_item", "one", [item("bulleted_list_item", "sub")]),
+        item("numbered_list_item", "two"),
+        {"type": "code", "code": {"rich_text": rt("x = 1"), "language": "python"}},
+    ]
+    assert MarkdownRenderer().render(blocks) == (
+        "## Policy $\\pi$\n\n"
+        "**bold** *a\\*b*\n\n"
+        "1. one\n   - sub\n2. two\n\n"
+        "```python\nx = 1\n```\n"
+    )
+    chunks = list(MarkdownRenderer().iter_render(blocks))
+    assert len(chunks) == 6 and "".join(chunks) == MarkdownRenderer().render(blocks)
+
+
+def _workspace():
+    fake = FakeNotion(latency=0.002)
+    blocks = ([item("paragraph", f"p{i}") for i in range(230)]
+              + [toggle([toggle([item("bulleted_list_item", "deep")])])
+                 for _ in range(5)])
+    page = execute_plan(fake.client(**fast()), RequestPlanner().plan(blocks),
+                        {"page_id": "root"}, title="Big page")
+    child = fake.client(**fast()).create_page({"page_id": page}, [para("child body")],
+                                               title="Child")
+    return fake, page, child["id"]
+
+
+class InFlight:
+    """Async client proxy that records the peak number of concurrent calls."""
+
+    def __init__(self, client) -> None:
+        self.client, self.now, self.peak = client, 0, 0
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    async def list_children(self, *args, **kwargs):
+        self.now += 1
+        self.peak = max(self.peak, self.now)
+        try:
+            return await self.client.list_children(*args, **kwargs)
+        finally:
+            self.now -= 1
+
+
+def test_page_export_is_ordered_paginated_and_bounded(tmp_path) -> None:
+    fake, page, _ = _workspace()
+
+    async def run():
+        client = InFlight(fake.async_client(rate_limiter=TokenBucket(1e6)))
+        fetcher = TreeFetcher(client, concurrency=3)
+        result = await export_page(client, page, tmp_path / "page.md", fetcher=fetcher)
+        await client.aclose()
+        return result, client.peak, fetcher.requests
+
+    result, peak, requests = asyncio.run(run())
+    text = (tmp_path / "page.md").read_text(encoding="utf8")
+    assert result.ok and result.title == "Big page"
+    assert text.startswith("# Big page\n\np0\n\np1\n")
+    assert text.index("p229") < text.index("<details>") < text.rindex("**Child**")
+    assert text.count("- deep") == 5
+    assert 1 < peak <= 3
+    assert requests == 3 + 5 * 2  # 3 root pages + 2 levels under each toggle
+    assert result.block_count == 230 + 5 * 3 + 1
+
+
+def test_markdown_stream_yields_before_tree_is_complete() -> None:
+    fake, page, _ = _workspace()
+
+    async def run():
+        client = fake.async_client(rate_limiter=TokenBucket(1e6))
+        fetcher = TreeFetcher(client, concurrency=2)
+        first = None
+        async for chunk in iter_page_markdown(client, page, fetcher=fetcher):
+            first = first or fetcher.requests
+        await client.aclose()
+        return first, fetcher.requests
+
+    first, total = asyncio.run(run())
+    assert first < total
+
+
+def test_recursive_export_links_child_pages(tmp_path) -> None:
+    fake, page, child = _workspace()
+
+    async def run():
+        client = fake.async_client(rate_limiter=TokenBucket(1e6))
+        try:
+            return await export_pages(client, [page], tmp_path, jobs=2, recursive=True)
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(run())
+    assert sorted(r.title for r in results) == ["Big page", "Child"]
+    child_file = next(r.path for r in results if r.page_id == child)
+    parent_text = next(r.path for r in results if r.page_id == page).read_text()
+    assert f"[Child]({child_file.name})" in parent_text
+    assert child_file.read_text() == "# Child\n\nchild body\n"
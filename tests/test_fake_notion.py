@@ -0,0 +1,96 @@
+"""
+Fake Notion API: endpoints, enforced limits, load shaping, localhost server.
+"""
+import asyncio
+
+import pytest
+from notion_client.errors import APIResponseError
+
+from ledu.notion.fake import FakeNotion
+from ledu.notion.planner import RequestPlanner
+from ledu.notion.ratelimit import TokenBucket
+from ledu.notion.upload import execute_plan, execute_plan_async
+from tests.helpers import FakeClock, fast, para, toggle
+
+
+def test_planned_upload_round_trips_through_fake() -> None:
+    fake = FakeNotion()
+    blocks = [para(str(i)) for i in range(250)] + [toggle([toggle([toggle([para()])])])]
+    page = execute_plan(fake.client(**fast()), RequestPlanner().plan(blocks),
+                        {"page_id": "root"}, title="Doc")
+
+    tree = fake.tree(page)
+    assert len(tree) == 251
+    assert tree[250]["toggle"]["children"][0]["toggle"]["children"][0]["type"] == "toggle"
+    assert fake.stats.requests["pages.create"] == 1
+    assert fake.stats.blocks_created == 254
+    assert fake.stats.bytes_in > 0 and fake.stats.bytes_out > 0
+
+
+def test_limits_are_enforced_like_notion() -> None:
+    fake = FakeNotion()
+    client = fake.client(**fast())
+    page = client.create_page({"page_id": "root"}, [para()])["id"]
+    for bad in ([para()] * 101,
+                [toggle([toggle([para()])])],
+                [para("x" * 2001)]):
+        with pytest.raises(APIResponseError) as err:
+            client.append_blocks(page, bad)
+        assert err.value.code == "validation_error"
+    assert fake.stats.rejected == 3
+
+
+def test_pagination_update_delete_and_after() -> None:
+    fake = FakeNotion()
+    client = fake.client(**fast())
+    page = client.create_page({"page_id": "root"}, [para(str(i)) for i in range(100)])["id"]
+    first = client.list_children(page, page_size=60)
+    assert first["has_more"] and len(first["results"]) == 60
+    rest = client.list_children(page, start_cursor=first["next_cursor"])
+    assert not rest["has_more"] and len(rest["results"]) == 40
+
+    target = first["results"][0]["id"]
+    client.update_block(target, para("changed"))
+    client.delete_block(first["results"][1]["id"])
+    client.append_blocks(page, [para("inserted")], after=target)
+    texts = [b["paragraph"]["rich_text"][0]["text"]["content"] for b in fake.tree(page)]
+    assert texts[:3] == ["changed", "inserted", "2"]
+
+
+def test_injected_and_quota_429s_are_retried() -> None:
+    clock = FakeClock()
+    fake = FakeNotion(rate=3.0, clock=clock)
+    fake.inject_429(2, retry_after=2)
+    client = fake.client(**fast(clock))
+    for _ in range(6):
+        client.create_page({"page_id": "root"}, [para()])
+    assert fake.stats.requests["pages.create"] > 6
+    assert fake.stats.throttled == fake.stats.requests["pages.create"] - 6
+    assert clock.now >= 2  # waited for Retry-After / the quota to refill
+
+
+def test_async_client_with_latency() -> None:
+    fake = FakeNotion(latency=0.01)
+    blocks = [toggle([toggle([para()])]) for _ in range(8)]
+
+    async def run():
+        client = fake.async_client(rate_limiter=TokenBucket(1000.0))
+        try:
+            return await execute_plan_async(client, RequestPlanner().plan(blocks),
+                                            {"page_id": "root"}, concurrency=8)
+        finally:
+            await client.aclose()
+
+    page = asyncio.run(run())
+    assert len(fake.tree(page)) == 8
+
+
+def test_localhost_server() -> None:
+    from ledu.notion.client import NotionClient
+
+    fake = FakeNotion()
+    with fake.serve() as url:
+        client = NotionClient("t", base_url=url, **fast())
+        page = client.create_page({"page_id": "root"}, [para("over http")])
+        assert client.list_children(page["id"])["results"][0]["type"] == "paragraph"
+    assert fake.stats.total_requests == 2
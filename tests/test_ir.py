@@ -0,0 +1,74 @@
+"""
+Typed block IR: lowers to exactly the JSON `convert` returns, compares and
+hashes structurally, is much smaller than the dicts, and uploads as-is.
+"""
+import gc
+import pickle
+import tracemalloc
+
+from ledu.blocks.ir import Media, Paragraph, Table, Toggle, lower
+from ledu.builder.page_builder import PageBuilder
+from ledu.notion.fake import FakeNotion
+from ledu.notion.upload import upload_markdown
+from ledu.parser.rich_text import RichTextSegmenter
+from ledu.utils.tree import block_digest, get_children
+from tests.helpers import fast
+
+
+def figures(count: int) -> str:
+    return "".join(f"![figure {i % 50}](https://x.test/img/{i}.png)\n\n" for i in range(count))
+
+
+FIGURES = figures(2000)
+TABLE = "| n | ok |\n|---|---|\n" + "".join(f"| {i % 7} | yes |\n" for i in range(250))
+
+
+def _allocated(func) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        return tracemalloc.get_traced_memory()[0] if result else 0
+    finally:
+        tracemalloc.stop()
+
+
+def test_lowering_matches_convert() -> None:
+    builder = PageBuilder()
+    ir = builder.convert_ir(figures(5) + TABLE)
+    assert isinstance(ir[0], Media) and isinstance(ir[-1], Table)
+    assert lower(ir) == builder.convert(figures(5) + TABLE)
+    assert repr(ir[-1]) == "Table(2 columns, 251 rows)"
+
+
+def test_value_semantics() -> None:
+    runs = RichTextSegmenter().segment("Hello **world**")
+    a, b = Paragraph(runs), Paragraph(tuple(runs))
+    assert a == b and hash(a) == hash(b) and a != Toggle(runs)
+    nested = Toggle(runs, children=[a, Media("image", "https://x.test/a.png")])
+    assert len({nested, nested.with_children([b, Media("image", "https://x.test/a.png")])}) == 1
+    assert get_children(nested)[0] is a and nested.with_children([]).children == ()
+    assert block_digest(nested) == block_digest(nested.with_children([]))
+    assert pickle.loads(pickle.dumps(nested)) == nested
+
+    first, again = PageBuilder().convert_ir(TABLE)[0], PageBuilder().convert_ir(TABLE)[0]
+    assert first == again and hash(first) == hash(again)
+    assert first.with_children(first.children[:3]) != first
+
+
+def test_ir_is_several_times_smaller_than_dicts() -> None:
+    builder = PageBuilder()
+    builder.convert(FIGURES)  # warm parser and segmenter caches
+    compact = _allocated(lambda: builder.convert_ir(FIGURES))
+    dicts = _allocated(lambda: builder.convert(FIGURES))
+    assert dicts > 3 * compact
+
+
+def test_upload_sends_ir_lowered_per_request() -> None:
+    fake = FakeNotion()
+    client = fake.client(**fast())
+    page = upload_markdown(figures(150) + TABLE, "root", client=client)
+    tree = fake.tree(page)
+    assert [b["type"] for b in tree[:2]] == ["image", "image"]
+    assert tree[0]["image"]["caption"][0]["text"]["content"] == "figure 0"
+    assert len(tree[-1]["table"]["children"]) == 251
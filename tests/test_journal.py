@@ -0,0 +1,114 @@
+"""
+Resumable uploads: a run killed mid-plan continues from its journal without
+duplicating the page or any block (against the fake API).
+"""
+import asyncio
+
+import pytest
+
+from ledu.notion.fake import FakeNotion
+from ledu.notion.journal import JournalError, UploadJournal, content_hash
+from ledu.notion.planner import RequestPlanner
+from ledu.notion.upload import execute_plan, execute_plan_async
+from tests.helpers import fast, para, toggle
+
+BLOCKS = ([para(str(i)) for i in range(250)] + [toggle([para(f"t{i}") for i in range(150)])]
+          + [para(f"end {i}") for i in range(30)])
+HASH = content_hash("source v1")
+PARENT = {"page_id": "root"}
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingClient:
+    """Delegates to *client*; the *at*-th append dies before or after it is sent."""
+
+    def __init__(self, client, at: int, *, landed: bool) -> None:
+        self.client, self.at, self.landed, self.appends = client, at, landed, 0
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def append_blocks(self, block_id, blocks, **kwargs):
+        self.appends += 1
+        if self.appends == self.at and not self.landed:
+            raise Crash("connection reset")
+        result = self.client.append_blocks(block_id, blocks, **kwargs)
+        if self.appends == self.at:
+            raise Crash("timed out reading the response")
+        return result
+
+
+def _text(tree) -> list:
+    out = []
+    for block in tree:
+        data = block[block["type"]]
+        out.append("".join(t["text"]["content"] for t in data["rich_text"]))
+        out.append(_text(data.get("children", [])))
+    return out
+
+
+@pytest.mark.parametrize("landed", [False, True])
+def test_interrupted_upload_resumes_without_duplicates(tmp_path, landed) -> None:
+    fake = FakeNotion()
+    client = fake.client(**fast())
+    plan = RequestPlanner().plan(BLOCKS)
+    path = tmp_path / "doc.jsonl"
+
+    journal = UploadJournal(path)
+    journal.start(plan, content_hash=HASH, parent=PARENT, title="Doc")
+    with pytest.raises(Crash):
+        execute_plan(CrashingClient(client, 3, landed=landed), plan, PARENT,
+                     title="Doc", journal=journal)
+    journal.close()
+
+    journal = UploadJournal(path)
+    assert journal.pending == {2} and not journal.finished
+    journal.start(plan, content_hash=HASH, parent=PARENT, title="Doc", resume=True)
+    journal.reconcile(client, plan)
+    assert journal.pending == set() and (2 in journal.done) == landed
+    page = execute_plan(client, plan, PARENT, title="Doc", journal=journal)
+    journal.finish(page)
+    journal.close()
+
+    assert page == UploadJournal(path).page and UploadJournal(path).finished
+    assert fake.stats.requests["pages.create"] == 1
+    assert _text(fake.tree(page)) == _text(BLOCKS)
+
+
+def test_async_executor_checkpoints_and_skips_done_requests(tmp_path) -> None:
+    fake = FakeNotion()
+    plan = RequestPlanner().plan(BLOCKS)
+    path = tmp_path / "doc.jsonl"
+    with UploadJournal(path) as journal:
+        journal.start(plan, content_hash=HASH, parent=PARENT)
+        with pytest.raises(Crash):
+            execute_plan(CrashingClient(fake.client(**fast()), 2, landed=True), plan,
+                         PARENT, journal=journal)
+
+    fake.reset_stats()
+    with UploadJournal(path) as journal:
+        journal.start(plan, content_hash=HASH, parent=PARENT, resume=True)
+        journal.reconcile(fake.client(**fast()), plan)
+        page = asyncio.run(execute_plan_async(fake.async_client(**fast()), plan, PARENT,
+                                              journal=journal))
+    assert fake.stats.requests["blocks.children.append"] == len(plan) - 2
+    assert _text(fake.tree(page)) == _text(BLOCKS)
+
+
+def test_changed_source_is_not_resumed(tmp_path) -> None:
+    plan = RequestPlanner().plan(BLOCKS)
+    path = tmp_path / "doc.jsonl"
+    with UploadJournal(path) as journal:
+        journal.start(plan, content_hash=HASH, parent=PARENT)
+        journal.started("page-1")
+    with pytest.raises(JournalError, match="page-1"):
+        UploadJournal(path).start(plan, content_hash=content_hash("v2"), parent=PARENT,
+                                  resume=True)
+
+    fresh = UploadJournal(path)  # without resume the journal starts over
+    fresh.start(plan, content_hash=content_hash("v2"), parent=PARENT)
+    fresh.close()
+    assert UploadJournal(path).page is None
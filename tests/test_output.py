@@ -0,0 +1,65 @@
+"""
+Streaming block writers and `ledu --dry --format/--output`.
+"""
+import io
+import json
+
+import pytest
+
+from ledu.cli import main
+from ledu.output import BlockWriter, compact_dumps, write_blocks
+from tests.helpers import para
+
+
+def _blocks(n):
+    return [para(f"é {i}") for i in range(n)]
+
+
+@pytest.mark.parametrize("n", [0, 1, 3])
+def test_formats_match_stdlib_encoding(n) -> None:
+    for fmt, expected in [
+        ("pretty", json.dumps(_blocks(n), indent=2) + "\n"),
+        ("json", None),
+        ("ndjson", None),
+    ]:
+        buf = io.BytesIO()
+        with BlockWriter(buf, fmt, backend="json") as w:
+            w.write_all(iter(_blocks(n)))
+        text = buf.getvalue().decode("utf8")
+        if fmt == "pretty":
+            assert text == expected
+        elif fmt == "json":
+            assert json.loads(text) == _blocks(n)
+        else:
+            assert [json.loads(line) for line in text.splitlines()] == _blocks(n)
+
+
+def test_writer_consumes_generator_lazily() -> None:
+    buf = io.BytesIO()
+    sizes = []
+
+    def gen():
+        for block in _blocks(3):
+            sizes.append(len(buf.getvalue()))
+            yield block
+
+    writer = BlockWriter(buf, "ndjson")
+    writer.write_all(gen())
+    assert sizes[0] == 0 and sizes[1] > 0 and sizes[2] > sizes[1]
+
+
+def test_orjson_backend_is_byte_identical() -> None:
+    pytest.importorskip("orjson")
+    block = _blocks(1)[0]
+    assert compact_dumps("orjson")(block) == compact_dumps("json")(block)
+
+
+def test_dry_run_streams_to_file(tmp_path, dividers) -> None:
+    doc = tmp_path / "doc.md"
+    doc.write_text("---\n\n---\n", encoding="utf8")
+    out = tmp_path / "out.ndjson"
+    main([str(doc), "--dry", "--format", "ndjson", "-o", str(out)])
+    lines = out.read_text(encoding="utf8").splitlines()
+    assert [json.loads(line)["type"] for line in lines] == ["divider", "divider"]
+    assert write_blocks([], tmp_path / "empty.json") == 0
+    assert (tmp_path / "empty.json").read_text() == "[]\n"
@@ -0,0 +1,107 @@
+"""
+Parallel conversion: safe split points, and output identical to the serial
+path on every benchmark corpus shape.
+"""
+import json
+
+import pytest
+
+from benchmarks import SHAPES, generate
+from ledu.builder import PageBuilder
+from ledu.builder.parallel import (convert_parallel, merge_references, split_markdown,
+                                   split_points)
+from ledu.parser import MarkdownParser
+from ledu.utils.tree import materialize
+
+TRICKY = """\
+See [the docs][docs] and [later].
+
+```
+# not a heading
+
+| not | a table |
+```
+
+- loose
+- list
+
+- same list
+
+1. first
+
+1. second
+
+Between.
+
+3) other list
+
+<!-- a comment
+
+with a blank line -->
+
+::: note
+
+inside a container
+
+:::
+
+    indented code
+
+    still code
+
+| a | b |
+|---|---|
+| 1 | 2 |
+
+[docs]: https://docs.test "Docs"
+
+~~~~
+~~~
+[later]: https://fenced.test
+~~~~
+
+[later]: https://later.test
+[docs]: https://ignored.test
+"""
+
+
+def _shape(token):
+    return (token.type, token.tag, token.nesting, token.level, token.content,
+            token.markup, token.info, token.attrs, token.hidden,
+            [_shape(c) for c in token.children or ()])
+
+
+def _chunked_tokens(chunks):
+    parser = MarkdownParser()
+    refs = merge_references([parser.references(c) for c in chunks])
+    return [_shape(t) for c in chunks for t in parser.parse(c, {"references": dict(refs)})]
+
+
+def test_split_points_avoid_open_blocks() -> None:
+    lines = [TRICKY[p:].split("\n", 1)[0] for p in split_points(TRICKY)]
+    assert lines == ["```", "- loose", "Between.", "3) other list", "<!-- a comment",
+                     "::: note", "| a | b |", "[docs]: https://docs.test \"Docs\"",
+                     "~~~~", "[later]: https://later.test"]
+
+
+def test_unclear_fence_in_list_stops_splitting() -> None:
+    md = "- a\n\n  ```\n\nx\n  ```\n\ny\n\nz\n"
+    assert split_points(md) == []
+
+
+@pytest.mark.parametrize("shape", [*SHAPES, "tricky"])
+def test_chunked_parse_matches_serial_tokens(shape) -> None:
+    md = TRICKY if shape == "tricky" else generate(shape, scale=0.1)
+    chunks = split_markdown(md, 16, min_chunk_bytes=1)
+    assert "".join(chunks) == md
+    assert len(chunks) > 1 or shape in ("nested_lists", "huge_code")
+    assert _chunked_tokens(chunks) == [_shape(t) for t in MarkdownParser().parse(md)]
+
+
+def test_convert_parallel_is_byte_identical() -> None:
+    md = "\n\n".join(generate(shape, scale=0.1) for shape in SHAPES) + "\n\n" + TRICKY
+    serial = PageBuilder().convert(md)
+    parallel = convert_parallel(md, jobs=2, min_chunk_bytes=4096)
+    assert serial  # tables and links survive, so there is something to compare
+    assert json.dumps(materialize(parallel)) == json.dumps(materialize(serial))
+    assert convert_parallel(md, jobs=1) == serial
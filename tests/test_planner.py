@@ -0,0 +1,53 @@
+"""
+RequestPlanner packing rules and sequential plan execution.
+"""
+from ledu.notion.planner import PAGE, RequestPlanner
+from ledu.notion.upload import execute_plan
+from ledu.utils.tree import count_blocks, get_children
+from tests.helpers import FakeClient, para, toggle
+
+
+def _assert_within_limits(plan) -> None:
+    for req in plan:
+        assert len(req.blocks) <= 100
+        assert count_blocks(req.blocks) <= 1000
+        for block in req.blocks:
+            for child in get_children(block):
+                assert not get_children(child), "max two nesting levels"
+
+
+def test_flat_page_is_chunked_by_100() -> None:
+    plan = RequestPlanner().plan([para(str(i)) for i in range(5000)])
+    assert [r.op for r in plan[:2]] == ["create", "append"]
+    assert len(plan) == 50
+    assert all(r.parent == PAGE for r in plan)
+    assert [r.after for r in plan[1:3]] == [0, 1]
+    _assert_within_limits(plan)
+
+
+def test_leaf_children_travel_inline_up_to_1000_blocks() -> None:
+    blocks = [toggle([para() for _ in range(20)]) for _ in range(100)]
+    plan = RequestPlanner().plan(blocks)
+    # 21 blocks per toggle → 47 toggles fit into 1000
+    assert [len(r.blocks) for r in plan] == [47, 47, 6]
+    assert not any(r.needs_ids for r in plan)
+    _assert_within_limits(plan)
+
+
+def test_deep_children_are_deferred_to_parent_ids() -> None:
+    deep = toggle([toggle([toggle([para("leaf")])])])
+    plan = RequestPlanner().plan([para(), deep])
+    _assert_within_limits(plan)
+    create = plan[0]
+    assert create.refs[0] is None and create.refs[1] is not None
+    child_req = next(r for r in plan if r.parent == create.refs[1])
+    assert child_req.depends_on == 0
+
+
+def test_execute_plan_resolves_parent_ids() -> None:
+    blocks = [toggle([toggle([para()])]) for _ in range(3)]
+    client = FakeClient()
+    page_id = execute_plan(client, RequestPlanner().plan(blocks), {"page_id": "root"})
+    assert page_id == "id0"
+    assert client.calls[:2] == ["create", "list:id0"]
+    assert sorted(client.calls[2:]) == ["append:id1", "append:id2", "append:id3"]
@@ -0,0 +1,67 @@
+"""
+ConversionStats collection, the `on_stats` hook and `ledu --profile`.
+"""
+from ledu.blocks.base import BlockConverter
+from ledu.builder import ConversionStats, PageBuilder
+from ledu.builder.stats import TimedSegmenter
+from ledu.cli import main
+from ledu.config import BLOCK_REGISTRY
+
+
+class SegmentingParagraph(BlockConverter):
+    """Test-only converter that segments through the context."""
+
+    def to_notion(self, token, tokens, idx, context):
+        runs = context.segmenter.segment_inline(tokens[idx + 1])
+        return [{"object": "block", "type": "paragraph",
+                 "paragraph": {"rich_text": [r.to_notion() for r in runs]}}]
+
+
+def test_stats_count_tokens_converters_and_skips(monkeypatch) -> None:
+    monkeypatch.setitem(BLOCK_REGISTRY, "paragraph_open", SegmentingParagraph)
+    stats = ConversionStats()
+    blocks = PageBuilder().convert("one **two**\n\nthree\n\n> quoted", stats=stats)
+
+    assert stats.converters["SegmentingParagraph"].calls == 3
+    assert stats.segment_calls == 3 and stats.segment_seconds > 0
+    assert stats.blocks_emitted == len(blocks) == 3
+    assert stats.tokens["inline"] == 3
+    assert stats.skipped["blockquote_open"] == 1
+    assert stats.total_seconds >= stats.converters["SegmentingParagraph"].seconds
+
+
+def test_disabled_profiling_uses_plain_segmenter(monkeypatch) -> None:
+    seen = []
+
+    class Spy(BlockConverter):
+        def to_notion(self, token, tokens, idx, context):
+            seen.append(context.segmenter)
+            return []
+
+    monkeypatch.setitem(BLOCK_REGISTRY, "paragraph_open", Spy)
+    builder = PageBuilder()
+    builder.convert("x")
+    builder.convert("x", stats=ConversionStats())
+    assert seen[0] is builder.segmenter
+    assert isinstance(seen[1], TimedSegmenter)
+
+
+def test_on_stats_hook_receives_each_conversion() -> None:
+    received = []
+    builder = PageBuilder(on_stats=received.append)
+    builder.convert("# a")
+    list(builder.iter_convert("b"))
+    assert len(received) == 2
+    merged = ConversionStats().merge(received[0]).merge(received[1])
+    assert merged.tokens["inline"] == 2
+    assert merged.to_dict()["converters"]["HeadingConverter"]["calls"] == 1
+
+
+def test_profile_flag_prints_table_to_stderr(tmp_path, capsys) -> None:
+    doc = tmp_path / "doc.md"
+    doc.write_text("# Title\n\ntext\n", encoding="utf8")
+    main([str(doc), "--dry", "--profile"])
+    out, err = capsys.readouterr()
+    assert out.strip() == "[]"
+    assert err.splitlines()[0].startswith("converter")
+    assert "HeadingConverter" in err and "tokens skipped" in err
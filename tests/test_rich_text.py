@@ -0,0 +1,87 @@
+"""
+RichTextSegmenter: inline token walk, equations, fast path, API limits.
+"""
+import pytest
+
+from ledu.builder.page_builder import PageBuilder
+from ledu.parser import RichTextSegmenter
+from ledu.parser.rich_text import MAX_TEXT_LENGTH, Annotations
+
+
+def _shape(runs):
+    return [(r.plain_text, r.annotations["bold"], r.equation is not None) for r in runs]
+
+
+def test_bold_with_inline_equation_splits_into_four_runs() -> None:
+    runs = RichTextSegmenter().segment("**States ($S$):** All possible situations...")
+    assert _shape(runs) == [
+        ("States (", True, False),
+        ("S", True, True),
+        ("):", True, False),
+        (" All possible situations...", False, False),
+    ]
+
+
+def test_code_link_and_strikethrough_annotations() -> None:
+    runs = RichTextSegmenter().segment("Use `pip` via [docs](https://x.io) ~~old~~")
+    assert [r.plain_text for r in runs] == ["Use ", "pip", " via ", "docs", " ", "old"]
+    assert runs[1].annotations["code"]
+    assert runs[3].href == "https://x.io"
+    assert runs[5].annotations["strikethrough"]
+
+
+def test_escaped_and_currency_dollars_stay_text() -> None:
+    seg = RichTextSegmenter()
+    assert [r.equation for r in seg.segment(r"costs \$5")] == [None]
+    assert [r.equation for r in seg.segment("$5 and $6")] == [None]
+
+
+def test_plain_text_takes_fast_path(monkeypatch) -> None:
+    seg = RichTextSegmenter()
+    monkeypatch.setattr(seg.parser, "parse_inline", None)  # must not be called
+    runs = seg.segment("Hello world, nothing to see here.")
+    assert len(runs) == 1 and runs[0].plain_text.startswith("Hello")
+
+
+def test_long_text_split_at_notion_limits() -> None:
+    seg = RichTextSegmenter()
+    runs = seg.segment("a" * (MAX_TEXT_LENGTH * 2 + 5))
+    assert [len(r.plain_text) for r in runs] == [MAX_TEXT_LENGTH, MAX_TEXT_LENGTH, 5]
+    many = seg.segment(" ".join(["**b** x"] * 120))
+    groups = seg.split_runs(many)
+    assert all(len(g) <= 100 for g in groups)
+    assert sum(map(len, groups)) == len(many)
+
+
+def test_annotations_are_interned_immutable_flyweights() -> None:
+    seg = RichTextSegmenter()
+    a = seg.segment("**one** and **two**")
+    assert a[0].annotations is a[2].annotations is Annotations(bold=True)
+    with pytest.raises(AttributeError):
+        a[0].annotations.bold = False
+    assert not hasattr(a[0], "__dict__")
+    assert a[0].to_notion()["annotations"]["bold"] is True
+
+
+def test_memo_cache_counts_hits_and_is_bounded() -> None:
+    seg = RichTextSegmenter(cache_size=2)
+    for cell in ["Yes", "No", "Yes", "Yes", "*N/A*"]:
+        seg.segment(cell)
+    info = seg.cache_info()
+    assert (info.hits, info.misses) == (2, 3)
+    assert info.currsize == 2
+    assert seg.segment("Yes") is not seg.segment("Yes")  # callers get own lists
+
+
+def test_reference_links_do_not_leak_between_documents() -> None:
+    builder = PageBuilder()  # reused, like batch workers and `ledu watch`
+    table = "| a |\n|---|\n| [foo] |\n\n"
+
+    def link(md, b=builder):
+        cell = b.convert(table + md)[0]["table"]["children"][1]["table_row"]["cells"][0]
+        return cell[0]["text"]["link"], cell[0]["text"]["content"]
+
+    assert link("[foo]: https://one.example\n") == ({"url": "https://one.example"}, "foo")
+    assert link("[foo]: https://two.example\n") == ({"url": "https://two.example"}, "foo")
+    assert link("") == link("", PageBuilder()) == (None, "[foo]")
+    assert builder.segmenter.segment("[foo]")[0].href is None
@@ -0,0 +1,86 @@
+"""
+Shared HTTP sessions: keep-alive pool and per-token rate limiters reused by
+every client; `BatchUploader` for many pages.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from ledu.notion import session
+from ledu.notion.client import AsyncNotionClient, NotionClient
+from ledu.notion.fake import FakeNotion
+from ledu.notion.ratelimit import TokenBucket
+from ledu.notion.session import PoolConfig, SessionPool, configure_pool
+from ledu.notion.upload import BatchUploader, UploadJob
+from tests.helpers import fast
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = SessionPool(PoolConfig(max_connections=4))
+    monkeypatch.setattr(session, "_shared", pool)
+    yield pool
+    pool.close()
+
+
+def test_clients_share_connections_and_rate_limits(pool) -> None:
+    fake = FakeNotion()
+    with fake.serve() as url:
+        for _ in range(5):  # a new client per page, as upload_markdown does
+            client = NotionClient("secret", base_url=url, rate_limiter=TokenBucket(1000.0))
+            client.create_page({"page_id": "root"}, [], title="p")
+    assert fake.stats.total_requests == 5
+    assert fake.stats.connections == 1
+
+    a, b, other = NotionClient("secret"), NotionClient("secret"), NotionClient("other")
+    assert a.rate_limiter is b.rate_limiter is pool.rate_limiter("secret")
+    assert other.rate_limiter is not a.rate_limiter
+    assert configure_pool(http2=False).rate_limiter("secret") is a.rate_limiter
+
+
+def test_async_clients_never_close_the_shared_pool(pool) -> None:
+    fake = FakeNotion()
+
+    async def run(url: str) -> None:
+        for _ in range(3):
+            client = AsyncNotionClient("t", base_url=url, rate_limiter=TokenBucket(1000.0))
+            await client.create_page({"page_id": "root"}, [])
+            await client.aclose()  # leaves the shared pool (and its connection) open
+        await pool.aclose()
+
+    with fake.serve() as url:
+        asyncio.run(run(url))
+    assert fake.stats.total_requests == 3 and fake.stats.connections == 1
+
+
+def test_batch_uploader_yields_pages_as_they_finish() -> None:
+    fake = FakeNotion()
+    jobs = [UploadJob(f"| n |\n|---|\n| {i} |\n", "root", f"Page {i}") for i in range(8)]
+    with BatchUploader(fake.client(**fast()), concurrency=3) as uploader:
+        results = list(uploader.upload([*jobs, ("| x |\n|---|\n", "")]))
+        single = uploader.submit("# Title\n", "root", title="one").result()
+
+    assert len(results) == 9 and single.ok
+    failed = [r for r in results if not r.ok]
+    assert [r.job.parent_id for r in failed] == [""] and "parent" in failed[0].error
+    pages = {r.job.title: r.page_id for r in results if r.ok}
+    assert len(set(pages.values())) == 8
+    assert fake.tree(pages["Page 3"])[0]["table"]["children"][1]["table_row"]["cells"][0][0][
+        "text"]["content"] == "3"
+
+
+def test_no_proxy_hosts_bypass_the_environment_proxy(monkeypatch) -> None:
+    monkeypatch.setenv("HTTPS_PROXY", "http://127.0.0.1:9")  # nothing listens there
+    monkeypatch.setenv("HTTP_PROXY", "http://127.0.0.1:9")
+    monkeypatch.setenv("NO_PROXY", "localhost,127.0.0.1")
+    pool = SessionPool()
+    monkeypatch.setattr(session, "_shared", pool)
+    fake = FakeNotion()
+    with fake.serve() as url:
+        NotionClient("secret", base_url=url, **fast()).create_page({"page_id": "root"}, [])
+    assert fake.stats.total_requests == 1
+
+    proxied = pool.http_client()._transport_for_url(httpx.URL("https://api.notion.com"))
+    assert proxied is pool.transport("http://127.0.0.1:9") is not pool.transport()
+    pool.close()
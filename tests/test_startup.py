@@ -0,0 +1,67 @@
+"""
+Startup budget: `ledu --dry` must not import network code or unused
+converters; the converter registry resolves lazily (incl. entry points).
+"""
+import json
+import subprocess
+import sys
+
+from ledu.blocks.registry import ConverterRegistry, LazyConverter
+
+_PROBE = """
+import json, sys
+from ledu.cli import main
+imported = set(sys.modules)
+main([sys.argv[1], "--dry"])
+print(json.dumps({"import": sorted(imported), "dry": sorted(sys.modules)}))
+"""
+
+#: modules `ledu --dry` must never load
+_FORBIDDEN = ("httpx", "notion_client", "asyncio", "rich", "pydantic")
+
+
+def test_dry_run_keeps_network_and_converters_unloaded(tmp_path) -> None:
+    doc = tmp_path / "doc.md"
+    doc.write_text("# Title\n\nplain text\n", encoding="utf8")
+    out = subprocess.run([sys.executable, "-c", _PROBE, str(doc)],
+                         capture_output=True, text=True, check=True).stdout
+    modules = json.loads(out.splitlines()[-1])
+
+    for name in _FORBIDDEN:
+        assert name not in modules["dry"], f"{name} imported by ledu --dry"
+    assert "importlib.metadata" not in modules["import"]  # lazy __version__
+    core = {"ledu.blocks.base", "ledu.blocks.registry"}
+    assert not {m for m in modules["import"] if m.startswith("ledu.blocks.")} - core
+    loaded = {m for m in modules["dry"] if m.startswith("ledu.blocks.")}
+    assert {"ledu.blocks.heading", "ledu.blocks.paragraph"} <= loaded
+    assert "ledu.blocks.table" not in loaded  # no table in the document
+
+
+def test_version_is_resolved_on_access() -> None:
+    import ledu
+    from importlib.metadata import version
+
+    assert ledu.__version__ == version("ledu")
+
+
+def test_entry_point_converters_load_on_first_lookup(tmp_path, monkeypatch) -> None:
+    (tmp_path / "ledu_fake_plugin.py").write_text(
+        "from ledu.blocks.base import BlockConverter\n"
+        "class Hr(BlockConverter):\n"
+        "    def to_notion(self, token, tokens, idx, context):\n"
+        "        return [{'type': 'divider', 'divider': {}}]\n", encoding="utf8")
+    dist = tmp_path / "ledu_fake_plugin-1.0.dist-info"
+    dist.mkdir()
+    (dist / "METADATA").write_text("Name: ledu-fake-plugin\nVersion: 1.0\n")
+    (dist / "entry_points.txt").write_text(
+        "[ledu.converters]\nhr = ledu_fake_plugin:Hr\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry = ConverterRegistry({"fence": "ledu.blocks.code:CodeBlockConverter"})
+    registry.load_plugins()
+    assert isinstance(registry["hr"], LazyConverter)
+    assert "ledu_fake_plugin" not in sys.modules
+    assert registry.resolve("hr").__name__ == "Hr"
+    assert registry.describe() == [("fence", "ledu.blocks.code.CodeBlockConverter"),
+                                   ("hr", "ledu_fake_plugin.Hr")]
+    assert registry.resolve("inline") is None
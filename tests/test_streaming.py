@@ -0,0 +1,58 @@
+"""
+Streaming conversion (`PageBuilder.iter_convert`) and `upload_stream`.
+"""
+import threading
+import time
+import types
+
+import pytest
+
+from ledu.builder import PageBuilder
+from ledu.notion.upload import upload_stream
+from tests.helpers import FakeClient, para
+
+
+def test_iter_convert_is_lazy_and_matches_convert(dividers) -> None:
+    md = "---\n\n" * 5
+    stream = PageBuilder().iter_convert(md)
+    assert isinstance(stream, types.GeneratorType)
+    assert list(stream) == PageBuilder().convert(md)
+    assert len(PageBuilder().convert(md)) == 5
+
+
+def test_upload_starts_before_conversion_finishes() -> None:
+    client = FakeClient()
+    produced = []
+
+    def blocks():
+        for i in range(250):
+            produced.append(len(client.calls))
+            yield para(str(i))
+
+    upload_stream(client, blocks(), {"page_id": "root"}, prefetch=0, validate="off")
+    assert client.calls == ["create", "append:id0", "append:id0"]
+    # block #100 was only produced after the page had been created
+    assert produced[100] == 1
+
+
+def test_prefetching_upload_keeps_order() -> None:
+    client = FakeClient()
+    page = upload_stream(client, (para(str(i)) for i in range(1000)),
+                         {"page_id": "root"}, prefetch=3)
+    assert len(client.children[page]) == 1000
+    assert client.calls.count(f"append:{page}") == 9
+
+
+def test_failed_upload_releases_the_prefetch_thread() -> None:
+    class FailingClient(FakeClient):
+        def append_blocks(self, block_id, blocks, *, after=None):
+            raise RuntimeError("API error after retries")
+
+    before = set(threading.enumerate())
+    with pytest.raises(RuntimeError):
+        upload_stream(FailingClient(), (para(str(i)) for i in range(10_000)),
+                      {"page_id": "root"}, prefetch=2, validate="off")
+    deadline = time.monotonic() + 5
+    while set(threading.enumerate()) - before:
+        assert time.monotonic() < deadline, "prefetch thread still blocked"
+        time.sleep(0.02)
@@ -0,0 +1,120 @@
+"""
+Incremental page sync: manifests and minimal edit scripts.
+"""
+import copy
+import itertools
+
+import pytest
+
+from ledu.cli import main
+from ledu.notion.sync import Manifest, sync_blocks
+from ledu.utils.tree import get_children, with_children, without_children
+from tests.helpers import para, toggle
+
+
+class TreeClient:
+    """In-memory Notion double that keeps a real block tree."""
+
+    def __init__(self) -> None:
+        self.ids = (f"b{i}" for i in itertools.count())
+        self.blocks: dict[str, dict] = {}
+        self.children: dict[str, list[str]] = {}
+        self.calls: list[str] = []
+
+    def _add(self, parent: str, blocks: list, after: str | None = None) -> list:
+        kids = self.children.setdefault(parent, [])
+        pos = kids.index(after) + 1 if after else len(kids)
+        created = []
+        for block in blocks:
+            bid = next(self.ids)
+            self.blocks[bid] = without_children(block)
+            self._add(bid, get_children(block))
+            kids.insert(pos, bid)
+            pos += 1
+            created.append({"id": bid})
+        return created
+
+    def create_page(self, parent, blocks, *, title=None):
+        self.calls.append("create")
+        page = next(self.ids)
+        self._add(page, blocks)
+        return {"id": page}
+
+    def append_blocks(self, block_id, blocks, *, after=None):
+        self.calls.append("append")
+        return {"results": self._add(block_id, blocks, after)}
+
+    def list_children(self, block_id, *, start_cursor=None, page_size=100):
+        self.calls.append("list")
+        ids = self.children.get(block_id, [])[:page_size]
+        return {"results": [{"id": i} for i in ids], "has_more": False}
+
+    def update_block(self, block_id, block):
+        self.calls.append("update")
+        self.blocks[block_id] = without_children(block)
+
+    def delete_block(self, block_id):
+        self.calls.append("delete")
+        for kids in self.children.values():
+            if block_id in kids:
+                kids.remove(block_id)
+
+    def render(self, parent: str) -> list:
+        return [with_children(self.blocks[i], self.render(i))
+                for i in self.children.get(parent, [])]
+
+
+def _doc() -> list:
+    return [para(f"p{i}") for i in range(300)] + [
+        toggle([para("a"), toggle([para("deep")])]),
+    ]
+
+
+def _roundtrip(tmp_path, before: list, after: list) -> TreeClient:
+    client = TreeClient()
+    manifest = tmp_path / "page.json"
+    sync_blocks(before, manifest, parent_id="root", client=client)
+    client.calls.clear()
+    report = sync_blocks(after, manifest, client=client)
+    page_id = Manifest.load(manifest).page_id
+    assert client.render(page_id) == after
+    assert report.calls == len(client.calls)
+    return client
+
+
+def test_single_paragraph_edit_is_one_update(tmp_path) -> None:
+    before = _doc()
+    after = copy.deepcopy(before)
+    after[150] = para("edited")
+    assert _roundtrip(tmp_path, before, after).calls == ["update"]
+
+
+def test_insert_and_delete_in_the_middle(tmp_path) -> None:
+    before = _doc()
+    after = before[:10] + [para("new")] + before[10:200] + before[201:]
+    assert sorted(_roundtrip(tmp_path, before, after).calls) == ["append", "delete"]
+
+
+def test_insert_at_head_recreates_first_block(tmp_path) -> None:
+    before = _doc()
+    client = _roundtrip(tmp_path, before, [para("top")] + before)
+    assert client.calls == ["append", "delete"]
+
+
+def test_nested_edit_recurses_into_children(tmp_path) -> None:
+    before = _doc()
+    after = copy.deepcopy(before)
+    get_children(get_children(after[-1])[1])[0]["paragraph"]["rich_text"][0] \
+        ["text"]["content"] = "changed"
+    client = _roundtrip(tmp_path, before, after)
+    assert client.calls.count("update") == 1
+    assert "append" not in client.calls
+
+
+def test_cli_first_sync_without_parent_is_a_usage_error(tmp_path, capsys) -> None:
+    doc = tmp_path / "doc.md"
+    doc.write_text("hello\n", encoding="utf8")
+    with pytest.raises(SystemExit) as exc:
+        main([str(doc), "--sync", "--manifest", str(tmp_path / "none.json")])
+    assert exc.value.code == 2
+    assert "--parent-id is required for the first --sync" in capsys.readouterr().err
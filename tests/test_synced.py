@@ -0,0 +1,122 @@
+"""
+Synced-block dedupe: repeated sections become references to one original,
+and the registry lets later runs reuse originals (against the fake API).
+"""
+from ledu.batch import sync_files
+from ledu.notion.assets import AssetUploader
+from ledu.notion.fake import FakeNotion
+from ledu.notion.synced import SyncedDeduper, SyncedRegistry, candidates
+from tests.helpers import fast, para, toggle
+
+
+def heading(text: str) -> dict:
+    return {"object": "block", "type": "heading_2",
+            "heading_2": {"rich_text": [{"type": "text", "text": {"content": text}}]}}
+
+
+DISCLAIMER = [heading("Disclaimer")] + [para(f"legal {i}") for i in range(9)]
+NAV = toggle([para(f"link {i}") for i in range(8)])
+
+
+def _pages():
+    return [
+        [heading("A"), para("a"), NAV, *DISCLAIMER],
+        [heading("B"), para("b"), *DISCLAIMER],
+        [heading("C"), NAV, para("c")],
+        [heading("D"), para("d")],
+    ]
+
+
+def test_candidates_are_sections_and_large_subtrees() -> None:
+    found = candidates(_pages()[0], min_blocks=8)
+    assert [(start, stop) for start, stop, _ in found] == [(0, 3), (2, 3), (3, 13)]
+    assert found[2][2] == candidates(_pages()[1], min_blocks=8)[0][2]  # same disclaimer
+
+
+def test_repeats_upload_once_as_synced_originals(tmp_path) -> None:
+    fake = FakeNotion()
+    client = fake.client(**fast())
+    registry = SyncedRegistry(tmp_path / "synced.json")
+    deduper = SyncedDeduper(client, "root", registry)
+    pages = deduper.apply(_pages())
+
+    assert deduper.stats.originals == 2 and deduper.stats.references == 4
+    assert [b["type"] for b in pages[0]] == ["heading_2", "paragraph", "synced_block",
+                                             "synced_block"]
+    assert pages[3] == _pages()[3]
+    ids = [b["synced_block"]["synced_from"]["block_id"] for b in pages[1] + pages[2]
+           if b["type"] == "synced_block"]
+    library = fake.tree(registry.library)
+    assert sorted(ids) == sorted(b["id"] for b in library)
+    assert [len(b["synced_block"]["children"]) for b in library] == [1, 10]  # nav, disclaimer
+
+    page = client.create_page({"page_id": "root"}, pages[1])["id"]  # references resolve
+    assert fake.tree(page)[-1]["synced_block"]["synced_from"]["block_id"] in ids
+    deduper.close()
+
+    again = SyncedDeduper(client, "root", SyncedRegistry(tmp_path / "synced.json"))
+    assert again.apply(_pages()) == pages
+    assert again.stats.originals == 0 and again.stats.reused == 2
+
+    client.delete_block(ids[0])  # a deleted original is uploaded anew
+    third = SyncedDeduper(client, "root", SyncedRegistry(tmp_path / "synced.json"))
+    third.apply(_pages())
+    assert third.stats.originals == 1 and third.stats.reused == 1
+
+
+def test_sync_files_shares_boilerplate(tmp_path) -> None:
+    footer = "| nav | links |\n|---|---|\n" + "".join(f"| {i} | x |\n" for i in range(8))
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"p{i}.md"
+        path.write_text(f"| page |\n|---|\n| {i} |\n\n---\n\n{footer}", encoding="utf8")
+        paths.append(path)
+    fake = FakeNotion()
+    client = fake.client(**fast())
+    deduper = SyncedDeduper(client, "root")
+    results = sync_files(paths, parent_id="root", jobs=1, client=client, synced=deduper)
+
+    assert all(r.ok for r in results)
+    assert deduper.stats.originals == 1 and deduper.stats.references == 3
+    assert [b["type"] for b in fake.tree(results[0].page_id)] == ["table", "synced_block"]
+
+
+def test_missing_asset_fails_only_its_file(tmp_path) -> None:
+    (tmp_path / "good.md").write_text("| a |\n|---|\n| 1 |\n", encoding="utf8")
+    (tmp_path / "bad.md").write_text("![](missing.png)\n", encoding="utf8")
+    fake = FakeNotion()
+    client = fake.client(**fast())
+    results = sync_files(sorted(tmp_path.glob("*.md")), parent_id="root", jobs=1,
+                         client=client, assets=AssetUploader(client.upload_file),
+                         synced=SyncedDeduper(client, "root"))
+
+    by_name = {r.path.name: r for r in results}
+    assert by_name["good.md"].page_id and by_name["good.md"].ok
+    assert "AssetError" in by_name["bad.md"].error and by_name["bad.md"].page_id is None
+
+
+def test_only_a_missing_library_resets_the_registry(tmp_path) -> None:
+    fake = FakeNotion()
+    client = fake.client(**fast())
+    path = tmp_path / "synced.json"
+    first = SyncedDeduper(client, "root", SyncedRegistry(path))
+    first.apply(_pages())
+    first.close()
+    saved = path.read_text()
+
+    class Flaky:
+        def __getattr__(self, name):
+            return getattr(client, name)
+
+        def list_children(self, *args, **kwargs):
+            raise RuntimeError("502 Bad Gateway after retries")
+
+    flaky = SyncedDeduper(Flaky(), "root", SyncedRegistry(path))
+    assert flaky.apply(_pages()) == _pages() and "502" in flaky.stats.error
+    flaky.close()
+    assert path.read_text() == saved and fake.stats.requests["pages.create"] == 1
+
+    client.delete_block(first.registry.library)  # gone for real: start over
+    fresh = SyncedDeduper(client, "root", SyncedRegistry(path))
+    fresh.apply(_pages())
+    assert fresh.stats.originals == 2 and fresh.registry.library != first.registry.library
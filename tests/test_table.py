@@ -0,0 +1,92 @@
+"""
+Tables: Markdown and CSV/TSV → columnar `TableRows`, chunked row uploads.
+"""
+import json
+import pickle
+
+from ledu.blocks.table import TableRows, read_table
+from ledu.builder import PageBuilder
+from ledu.cache import ConversionCache
+from ledu.cli import main
+from ledu.notion.fake import FakeNotion
+from ledu.notion.planner import RequestPlanner
+from ledu.notion.upload import execute_plan
+from ledu.utils.tree import materialize
+from tests.helpers import fast
+
+
+def _cells(block):
+    return [[("".join(t["text"]["content"] for t in cell)) for cell in row["table_row"]["cells"]]
+            for row in block["table"]["children"]]
+
+
+def test_markdown_table_becomes_one_table_block() -> None:
+    md = "| a | b |\n|:-|-:|\n| **x** | `y` |\n| p \\| q |\n\nafter\n"
+    builder = PageBuilder()
+    blocks = builder.convert(md)
+    table = blocks[0]
+    assert table["type"] == "table"
+    assert table["table"]["table_width"] == 2 and table["table"]["has_column_header"]
+    assert _cells(table) == [["a", "b"], ["x", "y"], ["p | q", ""]]
+    bold = table["table"]["children"][1]["table_row"]["cells"][0][0]
+    assert bold["annotations"]["bold"]
+
+
+def test_repeated_cells_share_segmented_runs() -> None:
+    md = "| k | v |\n|---|---|\n" + "".join(f"| {i} | Yes |\n" for i in range(50))
+    rows = PageBuilder().convert(md)[0]["table"]["children"]
+    assert isinstance(rows, TableRows) and len(rows) == 51
+    assert rows.columns[1][1] is rows.columns[1][50]
+    assert rows[-1] == rows[50] and rows[50] is not rows[50]  # fresh dict per access
+
+
+def test_csv_and_markdown_build_the_same_table(tmp_path) -> None:
+    (tmp_path / "t.csv").write_text("name,qty\nfoo,1\n\"a, b\",2\n", encoding="utf8")
+    (tmp_path / "t.tsv").write_text("name\tqty\nfoo\t1\na, b\t2\n", encoding="utf8")
+    builder = PageBuilder()
+    from_md = builder.convert("| name | qty |\n|--|--|\n| foo | 1 |\n| a, b | 2 |\n")
+    for name in ("t.csv", "t.tsv"):
+        block = read_table(tmp_path / name, builder.segmenter)
+        assert materialize([block]) == materialize(from_md)
+
+
+def test_ragged_csv_rows_are_padded(tmp_path) -> None:
+    (tmp_path / "r.csv").write_text("a\nb,c,d\ne,f\n", encoding="utf8")
+    block = read_table(tmp_path / "r.csv", PageBuilder().segmenter, has_column_header=False)
+    assert block["table"]["table_width"] == 3
+    assert _cells(block) == [["a", "", ""], ["b", "c", "d"], ["e", "f", ""]]
+
+
+def test_rows_upload_in_100_row_chunks() -> None:
+    md = "| n |\n|---|\n" + "".join(f"| {i} |\n" for i in range(249))
+    blocks = PageBuilder().convert(md)
+    plan = RequestPlanner().plan(blocks)
+    assert [len(r.blocks) for r in plan] == [1, 100, 50]
+    assert all(isinstance(r.blocks, TableRows) for r in plan[1:])  # never materialized
+    assert [r.after for r in plan] == [None, None, 1]
+
+    fake = FakeNotion()
+    page = execute_plan(fake.client(**fast()), plan, {"page_id": "root"})
+    rows = fake.tree(page)[0]["table"]["children"]
+    assert [r["table_row"]["cells"][0][0]["text"]["content"] for r in rows] == \
+        ["n"] + [str(i) for i in range(249)]
+
+
+def test_lazy_rows_serialize_cache_and_pickle(tmp_path) -> None:
+    md = "| a |\n|---|\n| 1 |\n| 2 |\n"
+    blocks = PageBuilder(cache=ConversionCache(tmp_path)).convert(md)
+    assert PageBuilder(cache=ConversionCache(tmp_path)).convert(md) == blocks
+
+    rows = blocks[0]["table"]["children"]
+    view = pickle.loads(pickle.dumps(rows[1:]))
+    assert list(view) == list(rows)[1:] and len(view.columns[0]) == 2
+
+    out = tmp_path / "t.json"
+    main(["table", str(_write(tmp_path)), "--dry", "--format", "json", "-o", str(out)])
+    assert json.loads(out.read_text())[0]["table"]["children"][1]["table_row"]["cells"]
+
+
+def _write(tmp_path):
+    path = tmp_path / "d.csv"
+    path.write_text("h\nv\n", encoding="utf8")
+    return path
@@ -0,0 +1,99 @@
+"""
+Preflight validation: limit violations found locally with source lines,
+fixed without losing content, and reported before any request is sent.
+"""
+import pytest
+
+from ledu.builder.page_builder import PageBuilder
+from ledu.notion.fake import FakeNotion
+from ledu.notion.planner import RequestPlanner
+from ledu.notion.upload import execute_plan, upload_markdown
+from ledu.notion.validate import PreflightError, check, fix, preflight
+from tests.helpers import fast, para
+
+
+def run(text: str, *, bold: bool = False, url: str | None = None) -> dict:
+    return {"type": "text", "text": {"content": text, "link": url and {"url": url}},
+            "annotations": {"bold": bold}}
+
+
+def block(btype: str, items: list, **payload) -> dict:
+    return {"object": "block", "type": btype, btype: {"rich_text": items, **payload}}
+
+
+def _plain(blocks) -> str:
+    return "".join(r["text"]["content"] for b in blocks for r in b[b["type"]]["rich_text"])
+
+
+def test_check_reports_every_violation_without_changing_anything() -> None:
+    blocks = [
+        block("paragraph", [run("x" * 4500)]),
+        block("code", [run("print()")], language="py"),
+        block("paragraph", [run("a", url="not a url")]),
+        block("code", [run("x")], language="python", children=[para("inside")]),
+        {"object": "block", "type": "image",
+         "image": {"type": "external", "external": {"url": "ftp://host/a.png"}}},
+        block("heading_2", [run("h", bold=i % 2 == 1) for i in range(150)]),
+    ]
+    issues = check(blocks)
+    assert [(i.path, i.code, i.fixed) for i in issues] == [
+        ((0,), "text_too_long", False), ((1,), "bad_language", False),
+        ((2,), "bad_url", False), ((3,), "children_not_allowed", False),
+        ((4,), "bad_url", False), ((5,), "too_many_rich_text", False)]
+    assert "instead was `4500`" in issues[0].message
+    assert blocks[0]["paragraph"]["rich_text"][0]["text"]["content"] == "x" * 4500
+
+
+def test_fix_splits_and_repairs_without_losing_content() -> None:
+    long_para = block("paragraph", [run(f"{i} ", bold=i % 2 == 1) for i in range(250)]
+                      + [run("y" * 4100)])
+    mergeable = block("quote", [run("z") for _ in range(300)])
+    blocks = [long_para, mergeable,
+              block("code", [run("ls")], language="sh", children=[para("after")]),
+              block("paragraph", [run("link", url="::")]), para("untouched")]
+    fixed, issues = fix(blocks)
+
+    assert all(i.fixed for i in issues) and not check(fixed)
+    assert [b["type"] for b in fixed] == ["paragraph"] * 3 + ["quote", "code", "paragraph",
+                                                             "paragraph", "paragraph"]
+    assert _plain(fixed[:3]) == _plain([long_para])
+    assert fixed[3]["quote"]["rich_text"] == [run("z" * 300)]  # merged, not split
+    assert fixed[4]["code"]["language"] == "shell" and "children" not in fixed[4]["code"]
+    assert fixed[5] == para("after") and fixed[-1] is blocks[-1]
+    assert fixed[6]["paragraph"]["rich_text"][0]["text"]["link"] is None
+
+    fake = FakeNotion()
+    client = fake.client(**fast())
+    page = execute_plan(client, RequestPlanner().plan(fixed), {"page_id": "root"})
+    assert len(fake.tree(page)) == len(fixed)
+
+
+def test_issues_carry_markdown_lines() -> None:
+    md = ("![ok](https://x.test/a.png)\n\n"
+          "| a | b |\n|---|---|\n| 1 | 2 |\n| " + "**w** w " * 60 + " | 3 |\n\n"
+          "![bad](ftp://x.test/b.png)\n")
+    lines: list = []
+    blocks = PageBuilder().convert(md, lines=lines)
+    assert lines == [1, 3, 8]
+    issues = check(blocks, lines=lines)
+    assert [(i.line, i.code) for i in issues] == [(6, "too_many_rich_text"), (8, "bad_url")]
+    assert str(issues[1]) == "line 8: Invalid URL for external file: ftp://x.test/b.png"
+    with pytest.raises(PreflightError, match="line 6: cells"):
+        preflight(blocks, lines=lines)
+
+
+def test_invalid_upload_fails_before_any_request() -> None:
+    fake = FakeNotion()
+    with pytest.raises(PreflightError, match="line 3: Invalid URL"):
+        upload_markdown("![a](https://x.test/a.png)\n\n![b](ftp://x.test/b.png)\n", "root",
+                        client=fake.client(**fast()))
+    assert fake.stats.total_requests == 0
+
+
+def test_invalid_last_block_of_a_long_document_sends_nothing() -> None:
+    fake = FakeNotion()
+    md = "".join(f"![{i}](https://x.test/{i}.png)\n\n" for i in range(250))
+    with pytest.raises(PreflightError, match="line 501: Invalid URL"):
+        upload_markdown(md + "![last](ftp://x.test/z.png)\n", "root",
+                        client=fake.client(**fast()))
+    assert fake.stats.total_requests == 0
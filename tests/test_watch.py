@@ -0,0 +1,170 @@
+"""
+`ledu watch`: section-level re-conversion, watchers, debouncing, re-sync.
+"""
+import threading
+import time
+
+import pytest
+
+from ledu.blocks.base import BlockConverter
+from ledu.config import BLOCK_REGISTRY
+from ledu.notion.fake import FakeNotion
+from ledu.notion.sync import Manifest, default_manifest_path
+from ledu.watch import (InotifyWatcher, PollingWatcher, SectionCache, debounced,
+                        split_sections, watch)
+from tests.helpers import fast
+
+
+class CountingParagraph(BlockConverter):
+    """Test-only paragraph converter that counts its calls."""
+    calls = 0
+
+    def to_notion(self, token, tokens, idx, context):
+        CountingParagraph.calls += 1
+        text = tokens[idx + 1].content
+        return [{"object": "block", "type": "paragraph", "paragraph": {
+            "rich_text": [{"type": "text", "text": {"content": text}}]}}]
+
+
+@pytest.fixture
+def counting(monkeypatch):
+    monkeypatch.setitem(BLOCK_REGISTRY, "paragraph_open", CountingParagraph)
+    CountingParagraph.calls = 0
+
+
+def _texts(blocks):
+    return [b["paragraph"]["rich_text"][0]["text"]["content"] for b in blocks]
+
+
+def test_only_edited_sections_are_reconverted(counting) -> None:
+    cache = SectionCache()
+    assert _texts(cache.convert("one\n\ntwo\n\nthree\n")) == ["one", "two", "three"]
+    assert (cache.reconverted, cache.reused) == (3, 0)
+
+    blocks = cache.convert("intro\n\none\n\nTWO\n\nthree\n")
+    assert _texts(blocks) == ["intro", "one", "TWO", "three"]
+    assert (cache.reconverted, cache.reused) == (2, 2)
+    assert CountingParagraph.calls == 5
+
+
+def test_repeated_sections_get_independent_blocks(counting) -> None:
+    blocks = SectionCache().convert("same\n\nsame\n")
+    assert blocks[0] == blocks[1] and blocks[0] is not blocks[1]
+    assert CountingParagraph.calls == 1
+
+
+def test_reference_definition_change_invalidates_sections(counting) -> None:
+    cache = SectionCache()
+    cache.convert("see [x]\n\n[x]: https://a.example\n")
+    cache.convert("see [x]\n\n[x]: https://b.example\n")
+    assert cache.reused == 0
+
+
+def test_reference_definition_change_relinks_table_cells() -> None:
+    cache = SectionCache()
+    table = "| a |\n|---|\n| [foo] |\n\n"
+
+    def href(md):
+        row = cache.convert(table + md)[0]["table"]["children"][1]
+        return row["table_row"]["cells"][0][0]["text"]["link"]
+
+    assert href("[foo]: https://one.example\n") == {"url": "https://one.example"}
+    assert href("[foo]: https://two.example\n") == {"url": "https://two.example"}
+    assert cache.reconverted == 1
+
+
+def test_split_sections_follows_top_level_blocks() -> None:
+    from ledu.parser.markdown_parser import MarkdownParser
+    tokens = MarkdownParser().parse("# h\n\n- a\n- b\n\n```\ncode\n```\n")
+    sections = split_sections(tokens)
+    assert [tokens[s].type for s, _, _ in sections] == [
+        "heading_open", "bullet_list_open", "fence"]
+    assert [lines for _, _, lines in sections] == [(0, 1), (2, 5), (5, 8)]
+    assert sections[-1][1] == len(tokens)
+
+
+def test_polling_watcher_reports_changed_files(tmp_path) -> None:
+    doc = tmp_path / "a.md"
+    doc.write_text("x")
+    (tmp_path / "notes.txt").write_text("x")
+    watcher = PollingWatcher([tmp_path], interval=0.01)
+    assert watcher.poll(0) == set()
+    doc.write_text("xy")
+    (tmp_path / "notes.txt").write_text("xy")
+    assert watcher.poll(1.0) == {doc.resolve()}
+
+
+def test_inotify_watcher_sees_atomic_saves(tmp_path) -> None:
+    doc = tmp_path / "a.md"
+    doc.write_text("x")
+    try:
+        watcher = InotifyWatcher([doc])
+    except OSError:
+        pytest.skip("inotify unavailable")
+    try:
+        tmp = tmp_path / ".a.md.swp"
+        tmp.write_text("new")
+        tmp.replace(doc)  # editor-style save: write temp, rename over
+        assert watcher.poll(1.0) == {doc.resolve()}
+    finally:
+        watcher.close()
+
+
+def test_inotify_watcher_follows_new_directories(tmp_path) -> None:
+    try:
+        watcher = InotifyWatcher([tmp_path])
+    except OSError:
+        pytest.skip("inotify unavailable")
+    try:
+        (tmp_path / "notes").mkdir()
+        early = tmp_path / "notes" / "early.md"  # may land before the new watch
+        early.write_text("x")
+        assert early.resolve() in watcher.poll(1.0) | watcher.poll(0.1)
+        nested = tmp_path / "notes" / "deep" / "later.md"
+        nested.parent.mkdir()
+        watcher.poll(0.2)
+        nested.write_text("y")
+        assert watcher.poll(1.0) == {nested.resolve()}
+    finally:
+        watcher.close()
+
+
+def test_debounce_merges_bursts() -> None:
+    class Scripted:
+        def __init__(self, events):
+            self.events = list(events)
+
+        def poll(self, timeout):
+            return self.events.pop(0) if self.events else set()
+
+    batches = []
+    watcher = Scripted([{"a"}, {"b"}, {"a"}, set(), {"c"}])
+    for batch in debounced(watcher, 0, stop=lambda: len(batches) == 2):
+        batches.append(batch)
+    assert batches == [{"a", "b"}, {"c"}]
+
+
+def test_watch_pushes_only_changed_blocks(tmp_path, counting) -> None:
+    doc = tmp_path / "doc.md"
+    doc.write_text("".join(f"para {i}\n\n" for i in range(20)))
+    fake = FakeNotion()
+    events = []
+
+    def on_sync(event):
+        events.append(event)
+        if len(events) == 1:  # after the initial sync, edit one paragraph
+            threading.Timer(0.05, doc.write_text, args=[
+                doc.read_text().replace("para 7\n", "para seven\n")]).start()
+
+    deadline = time.monotonic() + 10
+    watch([doc], parent_id="root", client=fake.client(**fast()), debounce=0.05,
+          backend="poll", manifest_dir=tmp_path / "manifests", on_sync=on_sync,
+          stop=lambda: len(events) >= 2 or time.monotonic() > deadline)
+
+    first, second = events
+    assert first.error is None and first.report.created
+    assert second.error is None
+    assert (second.reconverted, second.reused) == (1, 19)
+    assert (second.report.updated, second.report.deleted, second.report.inserted) == (1, 0, 0)
+    manifest = Manifest.load(default_manifest_path(doc, tmp_path / "manifests"))
+    assert _texts(fake.tree(manifest.page_id))[7] == "para seven"